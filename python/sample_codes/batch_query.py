@@ -0,0 +1,109 @@
+"""
+Batch Query Engine for LlamaIndex
+Shared helper used by the Unit 6 RAG examples
+
+query_engine.query() embeds, retrieves and synthesizes one question at a
+time, so an evaluation run over thousands of questions is fully serial.
+BatchQueryEngine answers a list of questions in three stages:
+
+1. One batched embedding request for every question (cached ones are free
+   when the embed model is a CachedEmbedding)
+2. One vectorized retrieval over all embeddings, when the vector store
+   offers query_batch() (NumpyVectorStore, FaissVectorStore)
+3. Response synthesis for all questions concurrently, at most
+   max_concurrency LLM calls in flight
+
+Usage:
+    engine = BatchQueryEngine(index, similarity_top_k=2)
+    responses = engine.query_batch(questions)
+"""
+
+import asyncio
+import time
+from typing import List, Optional, Sequence
+
+from llama_index.core import Settings, get_response_synthesizer
+from llama_index.core.base.embeddings.base import Embedding
+from llama_index.core.schema import NodeWithScore, QueryBundle
+
+import config
+from embedding_cache import embed_queries
+
+
+class BatchQueryEngine:
+    """
+    Answers many questions against a VectorStoreIndex at once.
+
+    Responses come back in input order and are the same Response objects
+    index.as_query_engine(similarity_top_k, response_mode).query() returns.
+    timings holds the seconds spent per stage of the last batch.
+    """
+
+    def __init__(self, index, similarity_top_k: int = 2, response_mode: str = "compact",
+                 embed_model=None, synthesizer=None,
+                 max_concurrency: int = config.BATCH_MAX_CONCURRENCY,
+                 retrieval_chunk: int = config.BATCH_RETRIEVAL_CHUNK):
+        self.index = index
+        self.similarity_top_k = similarity_top_k
+        self.embed_model = embed_model or Settings.embed_model
+        self.synthesizer = synthesizer or get_response_synthesizer(response_mode=response_mode)
+        self.max_concurrency = max_concurrency
+        self.retrieval_chunk = retrieval_chunk
+        self.timings: dict = {}
+
+    def embed(self, questions: Sequence[str]) -> List[Embedding]:
+        return embed_queries(self.embed_model, list(questions))
+
+    def retrieve_batch(self, questions: Sequence[str],
+                       embeddings: Optional[Sequence[Embedding]] = None) -> List[List[NodeWithScore]]:
+        """Top similarity_top_k nodes per question, embedding them first if needed."""
+        if embeddings is None:
+            embeddings = self.embed(questions)
+        store = self.index.vector_store
+        if not hasattr(store, "query_batch"):
+            retriever = self.index.as_retriever(similarity_top_k=self.similarity_top_k)
+            return [retriever.retrieve(QueryBundle(query_str=question, embedding=embedding))
+                    for question, embedding in zip(questions, embeddings)]
+
+        results = []
+        # Chunked so the (questions x nodes) score matrix stays bounded
+        for start in range(0, len(embeddings), self.retrieval_chunk):
+            chunk = embeddings[start:start + self.retrieval_chunk]
+            results.extend(store.query_batch(chunk, similarity_top_k=self.similarity_top_k))
+        return [[NodeWithScore(node=node, score=score)
+                 for node, score in zip(result.nodes, result.similarities)]
+                for result in results]
+
+    async def aquery_batch(self, questions: Sequence[str]):
+        questions = list(questions)
+        start = time.perf_counter()
+        embeddings = await asyncio.to_thread(self.embed, questions)
+        embedded = time.perf_counter()
+        nodes = await asyncio.to_thread(self.retrieve_batch, questions, embeddings)
+        retrieved = time.perf_counter()
+
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+
+        async def synthesize(question: str, question_nodes: List[NodeWithScore]):
+            async with semaphore:
+                return await self.synthesizer.asynthesize(question, nodes=question_nodes)
+
+        responses = await asyncio.gather(*(synthesize(q, n) for q, n in zip(questions, nodes)))
+        self.timings = {
+            "questions": len(questions),
+            "embed": embedded - start,
+            "retrieve": retrieved - embedded,
+            "synthesize": time.perf_counter() - retrieved,
+            "total": time.perf_counter() - start,
+        }
+        return list(responses)
+
+    def query_batch(self, questions: Sequence[str]):
+        """
+        Answer every question; see aquery_batch() to call from running event loops.
+
+        Runs on config.run_async()'s long-lived loop rather than a fresh one
+        per call: the LLM's async HTTP client stays bound to the loop it was
+        first used on, so a second asyncio.run() would find it closed.
+        """
+        return config.run_async(self.aquery_batch(questions))
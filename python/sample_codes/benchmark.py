@@ -0,0 +1,274 @@
+"""
+Model Benchmark Harness
+Shared helper used by Unit 1 (model comparison) and Unit 2 (benchmark)
+
+Runs a prompt set against one or more Ollama models with cold and warm
+repetitions at several concurrency levels, and reports per model:
+p50/p95/p99 latency, time-to-first-token, tokens/sec and error rate.
+Results can be written as JSON or CSV for capacity planning.
+
+Usage:
+    python benchmark.py --models llama3.1:8b --repetitions 10 --concurrency 1 4 8 --json out.json
+    python benchmark.py --fake --concurrency 1 8 32   # offline, against fake_ollama.py
+"""
+
+import argparse
+import csv
+import json
+import time
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional, Sequence
+
+import config
+
+DEFAULT_PROMPTS = [
+    "What is 2+2? Answer in one word.",
+    "Explain what an AI agent is in one sentence.",
+    "List three uses of vector databases.",
+]
+
+SUMMARY_FIELDS = [
+    "model", "phase", "concurrency", "requests", "errors", "error_rate",
+    "latency_p50", "latency_p95", "latency_p99", "latency_mean",
+    "ttft_p50", "ttft_p95", "ttft_p99",
+    "tokens_per_second", "throughput_rps",
+]
+
+
+# ============================================================================
+# Single Request
+# ============================================================================
+
+def run_single(model: str, prompt: str, temperature: float = config.BALANCED_TEMPERATURE) -> dict:
+    """
+    Stream one completion and time it.
+
+    Returns a sample with total latency, time-to-first-token, output token
+    count and the response text (or the error if the call failed).
+    """
+    llm = config.get_chat_model(model, temperature)
+    sample = {"model": model, "prompt": prompt, "ok": False, "latency": None,
+              "ttft": None, "tokens": 0, "response": "", "error": None}
+    pieces = []
+    chunks = 0
+    usage_tokens = None
+
+    start = time.perf_counter()
+    try:
+        for chunk in llm.stream(prompt):
+            if chunk.content:
+                if sample["ttft"] is None:
+                    sample["ttft"] = time.perf_counter() - start
+                pieces.append(chunk.content)
+                chunks += 1
+            usage = getattr(chunk, "usage_metadata", None)
+            if usage and usage.get("output_tokens"):
+                usage_tokens = usage["output_tokens"]
+        sample["ok"] = True
+    except Exception as e:
+        sample["error"] = f"{type(e).__name__}: {e}"
+    sample["latency"] = time.perf_counter() - start
+
+    # Prefer the server's token count; fall back to streamed chunks (~1 token each)
+    sample["tokens"] = usage_tokens or chunks
+    sample["response"] = "".join(pieces)
+    return sample
+
+
+def unload_model(model: str) -> None:
+    """Ask Ollama to evict a model from memory so the next call is a cold start."""
+    body = json.dumps({"model": model, "keep_alive": 0}).encode("utf-8")
+    request = urllib.request.Request(
+        f"{config.OLLAMA_BASE_URL}/api/generate",
+        data=body,
+        headers={"Content-Type": "application/json"}
+    )
+    try:
+        urllib.request.urlopen(request, timeout=config.DEFAULT_TIMEOUT).read()
+    except OSError:
+        pass  # Best effort: an unreachable server will surface as errors later
+
+
+# ============================================================================
+# Benchmark Runner
+# ============================================================================
+
+def run_benchmark(models: Sequence[str], prompts: Sequence[str] = DEFAULT_PROMPTS,
+                  repetitions: int = 5, concurrency_levels: Sequence[int] = (1,),
+                  warmup: int = 1, cold_repetitions: int = 0,
+                  temperature: float = config.BALANCED_TEMPERATURE) -> List[dict]:
+    """
+    Benchmark each model and return the raw samples.
+
+    For every model:
+      - cold_repetitions times: unload the model, then send one request
+      - warmup requests (discarded) to load the model
+      - at each concurrency level: repetitions x prompts requests,
+        with at most `concurrency` in flight at once
+    """
+    samples = []
+
+    for model in models:
+        for _ in range(cold_repetitions):
+            unload_model(model)
+            sample = run_single(model, prompts[0], temperature)
+            sample.update(phase="cold", concurrency=1, wall_time=sample["latency"])
+            samples.append(sample)
+
+        for _ in range(warmup):
+            run_single(model, prompts[0], temperature)
+
+        for concurrency in concurrency_levels:
+            jobs = [prompt for _ in range(repetitions) for prompt in prompts]
+            start = time.perf_counter()
+            with ThreadPoolExecutor(max_workers=concurrency) as pool:
+                results = list(pool.map(lambda p: run_single(model, p, temperature), jobs))
+            wall_time = time.perf_counter() - start
+
+            for sample in results:
+                sample.update(phase="warm", concurrency=concurrency, wall_time=wall_time)
+            samples.extend(results)
+
+    return samples
+
+
+# ============================================================================
+# Reporting
+# ============================================================================
+
+def percentile(values: Sequence[float], pct: float) -> Optional[float]:
+    """Linear-interpolated percentile (pct in 0-100); None for no data."""
+    if not values:
+        return None
+    ordered = sorted(values)
+    rank = (len(ordered) - 1) * pct / 100
+    lower = int(rank)
+    upper = min(lower + 1, len(ordered) - 1)
+    return ordered[lower] + (ordered[upper] - ordered[lower]) * (rank - lower)
+
+
+def summarize(samples: Sequence[dict]) -> List[dict]:
+    """Aggregate samples into one row per (model, phase, concurrency)."""
+    groups: Dict[tuple, List[dict]] = {}
+    for sample in samples:
+        key = (sample["model"], sample["phase"], sample["concurrency"])
+        groups.setdefault(key, []).append(sample)
+
+    rows = []
+    for (model, phase, concurrency), group in groups.items():
+        ok = [s for s in group if s["ok"]]
+        latencies = [s["latency"] for s in ok]
+        ttfts = [s["ttft"] for s in ok if s["ttft"] is not None]
+        generation_time = sum(s["latency"] - s["ttft"] for s in ok if s["ttft"] is not None)
+        tokens = sum(s["tokens"] for s in ok if s["ttft"] is not None)
+        # Cold samples are sequential, so their wall time is the sum of latencies
+        wall_time = (sum(s["wall_time"] for s in group) if phase == "cold"
+                     else group[0]["wall_time"])
+
+        rows.append({
+            "model": model,
+            "phase": phase,
+            "concurrency": concurrency,
+            "requests": len(group),
+            "errors": len(group) - len(ok),
+            "error_rate": (len(group) - len(ok)) / len(group),
+            "latency_p50": percentile(latencies, 50),
+            "latency_p95": percentile(latencies, 95),
+            "latency_p99": percentile(latencies, 99),
+            "latency_mean": sum(latencies) / len(latencies) if latencies else None,
+            "ttft_p50": percentile(ttfts, 50),
+            "ttft_p95": percentile(ttfts, 95),
+            "ttft_p99": percentile(ttfts, 99),
+            "tokens_per_second": tokens / generation_time if generation_time > 0 else None,
+            "throughput_rps": len(ok) / wall_time if wall_time else None,
+        })
+    return rows
+
+
+def _fmt(value, unit="s"):
+    return "-" if value is None else f"{value:.2f}{unit}"
+
+
+def print_report(rows: Sequence[dict]) -> None:
+    """Print the summary as a fixed-width table."""
+    header = (f"{'model':24s} {'phase':5s} {'conc':>4s} {'reqs':>5s} {'err%':>5s} "
+              f"{'p50':>8s} {'p95':>8s} {'p99':>8s} {'ttft50':>8s} {'tok/s':>8s} {'req/s':>7s}")
+    print(header)
+    print("-" * len(header))
+    for row in rows:
+        print(f"{row['model'][:24]:24s} {row['phase']:5s} {row['concurrency']:4d} "
+              f"{row['requests']:5d} {row['error_rate'] * 100:4.0f}% "
+              f"{_fmt(row['latency_p50']):>8s} {_fmt(row['latency_p95']):>8s} "
+              f"{_fmt(row['latency_p99']):>8s} {_fmt(row['ttft_p50']):>8s} "
+              f"{_fmt(row['tokens_per_second'], ''):>8s} {_fmt(row['throughput_rps'], ''):>7s}")
+
+
+def write_json(path: str, rows: Sequence[dict], samples: Sequence[dict] = ()) -> None:
+    """Write the summary (and optionally raw samples) as JSON."""
+    with open(path, "w") as f:
+        json.dump({"summary": list(rows), "samples": list(samples)}, f, indent=2)
+
+
+def write_csv(path: str, rows: Sequence[dict]) -> None:
+    """Write the summary as CSV, one row per (model, phase, concurrency)."""
+    with open(path, "w", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=SUMMARY_FIELDS)
+        writer.writeheader()
+        writer.writerows(rows)
+
+
+# ============================================================================
+# Command line
+# ============================================================================
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark Ollama models")
+    parser.add_argument("--models", nargs="+", default=config.get_comparison_models())
+    parser.add_argument("--prompts-file", help="Text file with one prompt per line")
+    parser.add_argument("--repetitions", type=int, default=5)
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1])
+    parser.add_argument("--warmup", type=int, default=1)
+    parser.add_argument("--cold", type=int, default=0, help="Cold-start repetitions per model")
+    parser.add_argument("--temperature", type=float, default=config.BALANCED_TEMPERATURE)
+    parser.add_argument("--json", help="Write summary and samples to this JSON file")
+    parser.add_argument("--csv", help="Write summary to this CSV file")
+    parser.add_argument("--fake", action="store_true",
+                        help="Benchmark against an in-process fake Ollama server (offline, reproducible)")
+    parser.add_argument("--fake-ttft", type=float, default=0.1)
+    parser.add_argument("--fake-tokens-per-second", type=float, default=50.0)
+    args = parser.parse_args()
+
+    fake_server = None
+    if args.fake:
+        from fake_ollama import FakeOllamaServer
+        fake_server = FakeOllamaServer(
+            ttft=args.fake_ttft,
+            tokens_per_second=args.fake_tokens_per_second
+        ).start()
+        config.OLLAMA_BASE_URL = fake_server.url
+        print(f"Using fake Ollama server at {fake_server.url}\n")
+
+    prompts = DEFAULT_PROMPTS
+    if args.prompts_file:
+        with open(args.prompts_file) as f:
+            prompts = [line.strip() for line in f if line.strip()]
+
+    samples = run_benchmark(
+        args.models,
+        prompts,
+        repetitions=args.repetitions,
+        concurrency_levels=args.concurrency,
+        warmup=args.warmup,
+        cold_repetitions=args.cold,
+        temperature=args.temperature
+    )
+    rows = summarize(samples)
+    print_report(rows)
+
+    if args.json:
+        write_json(args.json, rows, samples)
+    if args.csv:
+        write_csv(args.csv, rows)
+    if fake_server is not None:
+        fake_server.stop()
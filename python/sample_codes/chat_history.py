@@ -0,0 +1,445 @@
+"""
+Chat History Backends
+Shared helper used by the memory examples in Unit 3
+
+Drop-in replacements for InMemoryChatMessageHistory that keep the prompt
+sent to the model bounded as a conversation grows:
+
+- TokenWindowChatMessageHistory: keeps only the most recent messages that
+  fit in a token budget. Each message is counted once, when it is added,
+  so trimming costs O(new messages) per turn rather than re-counting the
+  whole transcript.
+- SummarizingChatMessageHistory: once a session passes a token threshold,
+  older messages are condensed into a running summary message by a
+  background worker. Requests never wait on the summarizer; they send
+  whatever history is current, and the next one picks up the summary.
+- SQLiteChatHistoryStore: persistent histories in one SQLite file (WAL
+  mode). Sessions survive restarts, several worker processes can append to
+  them at once, and only the last tail_messages are read per request.
+
+Usage:
+    store = SessionStore(history_factory=TokenWindowChatMessageHistory)
+    store = SessionStore(history_factory=SummarizingChatMessageHistory)
+    store = SQLiteChatHistoryStore(tail_messages=20)
+    conversation = RunnableWithMessageHistory(chain, store.get_session_history, ...)
+"""
+
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Callable, Deque, List, Optional, Sequence
+
+from langchain_core.chat_history import BaseChatMessageHistory
+from langchain_core.messages import (
+    BaseMessage,
+    HumanMessage,
+    SystemMessage,
+    message_to_dict,
+    messages_from_dict
+)
+from pydantic import Field, PrivateAttr
+
+import config
+from session_store import TrackedChatMessageHistory, estimate_message_bytes
+
+# ============================================================================
+# Token Counting
+# ============================================================================
+
+_TOKEN_PATTERN = re.compile(r"\w+|[^\w\s]")
+_MESSAGE_OVERHEAD_TOKENS = 4  # Role markers and separators in the chat template
+
+
+def count_text_tokens(text: str) -> int:
+    """
+    Fast local token estimate for text - not the model's real tokenizer.
+
+    Splits into words and punctuation and charges one token per ~4
+    characters of each word. Ollama has no tokenize endpoint, and loading
+    the model's own tokenizer would mean a new dependency and a download
+    per model, so this approximation stands in for it. It runs in
+    microseconds and errs slightly high for English, so a window sized
+    with it stays within the real budget. Histories take a count_tokens
+    function to plug in an exact tokenizer instead.
+    """
+    return sum(max(1, (len(piece) + 3) // 4) for piece in _TOKEN_PATTERN.findall(text))
+
+
+def count_message_tokens(message: BaseMessage) -> int:
+    """Estimated tokens one message adds to the prompt."""
+    content = message.content
+    if not isinstance(content, str):
+        content = json.dumps(content, default=str)
+    return count_text_tokens(content) + _MESSAGE_OVERHEAD_TOKENS
+
+
+# ============================================================================
+# Token-Budgeted Sliding Window
+# ============================================================================
+
+class TokenWindowChatMessageHistory(TrackedChatMessageHistory):
+    """
+    Chat history that holds at most max_tokens of the most recent messages.
+
+    Token counts (count_tokens, an estimate by default) are cached per
+    message and a running total is kept, so each add only counts the new
+    message and drops whole messages from the front. The window never
+    exceeds max_tokens and always starts on a human message, so the model
+    never sees a reply without the question that prompted it. An exchange
+    too large for the budget on its own is dropped whole, which can leave
+    the window empty.
+    """
+
+    max_tokens: int = config.HISTORY_MAX_TOKENS
+    count_tokens: Callable[[BaseMessage], int] = count_message_tokens
+    total_tokens: int = 0
+    dropped_messages: int = 0
+    token_counts: Deque[int] = Field(default_factory=deque)
+
+    def add_message(self, message: BaseMessage) -> None:
+        super().add_message(message)
+        tokens = self.count_tokens(message)
+        self.token_counts.append(tokens)
+        self.total_tokens += tokens
+        self._trim()
+
+    def _trim(self) -> None:
+        while self.messages and (
+            self.total_tokens > self.max_tokens
+            or not isinstance(self.messages[0], HumanMessage)
+        ):
+            self._drop_oldest()
+
+    def _drop_oldest(self) -> None:
+        message = self.messages.pop(0)
+        self.total_tokens -= self.token_counts.popleft()
+        self._resize(-estimate_message_bytes(message))
+        self.dropped_messages += 1
+
+    def clear(self) -> None:
+        super().clear()
+        self.token_counts.clear()
+        self.total_tokens = 0
+
+
+# ============================================================================
+# Rolling Summary
+# ============================================================================
+
+SUMMARY_PREFIX = "Summary of the earlier conversation: "
+
+def _is_summary_message(message: BaseMessage) -> bool:
+    return (isinstance(message, SystemMessage) and isinstance(message.content, str)
+            and message.content.startswith(SUMMARY_PREFIX))
+
+_summary_executor: Optional[ThreadPoolExecutor] = None
+_summary_executor_lock = threading.Lock()
+
+def _get_summary_executor() -> ThreadPoolExecutor:
+    """Shared worker pool that runs summarization off the request path."""
+    global _summary_executor
+    with _summary_executor_lock:
+        if _summary_executor is None:
+            _summary_executor = ThreadPoolExecutor(
+                max_workers=config.SUMMARY_WORKERS,
+                thread_name_prefix="chat-summary"
+            )
+    return _summary_executor
+
+
+def summarize_messages(previous_summary: str, messages: Sequence[BaseMessage]) -> str:
+    """Default summarizer: fold messages into previous_summary with the local LLM."""
+    llm = config.get_chat_model(config.PRIMARY_LLM_MODEL, config.PRECISE_TEMPERATURE)
+    transcript = "\n".join(f"{message.type}: {message.content}" for message in messages)
+    prompt = (
+        "Condense the conversation below into a short summary. Keep names, facts, "
+        "preferences, decisions and open questions the assistant will need later.\n\n"
+        f"Existing summary:\n{previous_summary or '(none)'}\n\n"
+        f"New messages:\n{transcript}\n\n"
+        "Updated summary:"
+    )
+    return llm.invoke(prompt).content.strip()
+
+
+class SummarizingChatMessageHistory(TrackedChatMessageHistory):
+    """
+    Chat history that keeps recent turns verbatim and older ones as a summary.
+
+    When total_tokens exceeds summarize_after_tokens, everything except the
+    newest keep_recent_tokens is handed to summarize_fn on a background
+    thread. When it finishes, those messages are replaced by one system
+    message holding the running summary. Messages added meanwhile are
+    untouched, and at most one summarization per session runs at a time.
+
+    The summary is swapped in as a new messages list rather than edited in
+    place, so request threads reading messages without the lock always see
+    a consistent transcript. A history rebuilt from its messages (e.g. a
+    SessionStore restoring a spilled session) recognizes its leading
+    summary message and carries on from that summary.
+    """
+
+    summarize_after_tokens: int = config.SUMMARY_TRIGGER_TOKENS
+    keep_recent_tokens: int = config.SUMMARY_KEEP_RECENT_TOKENS
+    summarize_fn: Callable[[str, Sequence[BaseMessage]], str] = summarize_messages
+    summary: str = ""
+    summarized_messages: int = 0
+    total_tokens: int = 0
+    token_counts: List[int] = Field(default_factory=list)
+    last_error: Optional[str] = None
+
+    _lock: threading.RLock = PrivateAttr(default_factory=threading.RLock)
+    _pending: Optional[Future] = PrivateAttr(default=None)
+    _generation: int = PrivateAttr(default=0)
+
+    def add_message(self, message: BaseMessage) -> None:
+        with self._lock:
+            if not self.messages and _is_summary_message(message):
+                self.summary = message.content[len(SUMMARY_PREFIX):]
+            super().add_message(message)
+            tokens = count_message_tokens(message)
+            self.token_counts.append(tokens)
+            self.total_tokens += tokens
+            if self.total_tokens > self.summarize_after_tokens and self._pending is None:
+                self._schedule_summary()
+
+    def _has_summary_message(self) -> bool:
+        return bool(self.summary) and bool(self.messages) and isinstance(self.messages[0], SystemMessage)
+
+    def _split_index(self) -> int:
+        """
+        Index of the first message to keep verbatim.
+
+        Walks back over whole turns (each starting at a human message) while
+        they fit in keep_recent_tokens; the latest turn is always kept.
+        """
+        split = None
+        kept = 0
+        for index in range(len(self.messages) - 1, -1, -1):
+            kept += self.token_counts[index]
+            if isinstance(self.messages[index], HumanMessage):
+                if split is not None and kept > self.keep_recent_tokens:
+                    break
+                split = index
+        return len(self.messages) if split is None else split
+
+    def _schedule_summary(self) -> None:
+        start = 1 if self._has_summary_message() else 0
+        split = self._split_index()
+        if split <= start:
+            return  # Nothing old enough to condense yet
+        to_summarize = list(self.messages[start:split])
+        self._pending = _get_summary_executor().submit(
+            self._summarize, self._generation, self.summary, to_summarize, split
+        )
+
+    def _summarize(self, generation: int, previous_summary: str,
+                   to_summarize: List[BaseMessage], split: int) -> None:
+        try:
+            summary = self.summarize_fn(previous_summary, to_summarize)
+        except Exception as e:
+            with self._lock:
+                self.last_error = f"{type(e).__name__}: {e}"
+                self._pending = None
+            return
+
+        with self._lock:
+            self._pending = None
+            if generation != self._generation:
+                return  # History was cleared while we were summarizing
+            summary_message = SystemMessage(content=SUMMARY_PREFIX + summary)
+            summary_tokens = count_message_tokens(summary_message)
+
+            # Only this method rewrites the prefix, so messages[:split] are
+            # still exactly the summary (if any) plus what was summarized.
+            # Readers do not take the lock: give them a new list, never a half-edited one
+            removed = self.messages[:split]
+            self.messages = [summary_message] + self.messages[split:]
+            self.total_tokens += summary_tokens - sum(self.token_counts[:split])
+            self.token_counts[:split] = [summary_tokens]
+            self._resize(estimate_message_bytes(summary_message) - sum(
+                estimate_message_bytes(message) for message in removed
+            ))
+            self.summary = summary
+            self.summarized_messages += len(to_summarize)
+            self.last_error = None
+
+            # A long burst of turns may already need another pass
+            if self.total_tokens > self.summarize_after_tokens:
+                self._schedule_summary()
+
+    def wait_for_summary(self, timeout: Optional[float] = None) -> None:
+        """Block until any in-flight summarization has finished (for demos and shutdown)."""
+        while True:
+            with self._lock:
+                pending = self._pending
+            if pending is None:
+                return
+            pending.result(timeout=timeout)
+
+    def clear(self) -> None:
+        with self._lock:
+            super().clear()
+            self._generation += 1
+            self.token_counts.clear()
+            self.total_tokens = 0
+            self.summary = ""
+            self.summarized_messages = 0
+
+
+# ============================================================================
+# Persistent History (SQLite)
+# ============================================================================
+
+class SQLiteChatHistoryStore:
+    """
+    Chat histories for many sessions in one SQLite database.
+
+    Messages are appended as rows keyed by (session_id, seq), so a write is
+    a single insert and reading the last K messages is an index range scan
+    regardless of transcript length. WAL mode plus a busy timeout lets
+    several processes on one host share the file: readers never block, and
+    writers queue briefly instead of failing.
+
+    Args:
+        path: SQLite file (config.CHAT_HISTORY_DB by default)
+        tail_messages: messages returned by history.messages (None = all)
+    """
+
+    def __init__(self, path: Optional[str] = None,
+                 tail_messages: Optional[int] = config.CHAT_HISTORY_TAIL_MESSAGES):
+        self.path = path or config.CHAT_HISTORY_DB
+        self.tail_messages = tail_messages
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._conn = None
+        self._pid = None
+        with self._lock:
+            self._connection().execute(
+                """CREATE TABLE IF NOT EXISTS chat_messages (
+                    session_id TEXT NOT NULL,
+                    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+                    message TEXT NOT NULL,
+                    created REAL NOT NULL
+                )"""
+            )
+            self._connection().execute(
+                "CREATE INDEX IF NOT EXISTS chat_messages_session ON chat_messages (session_id, seq)"
+            )
+
+    def _connection(self) -> sqlite3.Connection:
+        """Per-process connection (a connection must not cross a fork)."""
+        if self._conn is None or self._pid != os.getpid():
+            self._conn = sqlite3.connect(self.path, check_same_thread=False,
+                                         isolation_level=None, timeout=config.DEFAULT_TIMEOUT)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._pid = os.getpid()
+        return self._conn
+
+    def get_session_history(self, session_id: str) -> "SQLiteChatMessageHistory":
+        """Factory to pass to RunnableWithMessageHistory."""
+        return SQLiteChatMessageHistory(self, session_id)
+
+    def append(self, session_id: str, messages: Sequence[BaseMessage]) -> None:
+        """Append messages to a session in one transaction."""
+        now = time.time()
+        rows = [(session_id, json.dumps(message_to_dict(m)), now) for m in messages]
+        with self._lock:
+            conn = self._connection()
+            # IMMEDIATE takes the write lock up front so concurrent writers
+            # wait on the busy timeout instead of failing mid-transaction
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                conn.executemany(
+                    "INSERT INTO chat_messages (session_id, message, created) VALUES (?, ?, ?)",
+                    rows
+                )
+                conn.execute("COMMIT")
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+
+    def tail(self, session_id: str, limit: Optional[int] = None) -> List[BaseMessage]:
+        """The last `limit` messages of a session, oldest first (None = all)."""
+        with self._lock:
+            if limit is None:
+                rows = self._connection().execute(
+                    "SELECT message FROM chat_messages WHERE session_id = ? ORDER BY seq",
+                    (session_id,)
+                ).fetchall()
+            else:
+                rows = self._connection().execute(
+                    "SELECT message FROM chat_messages WHERE session_id = ? "
+                    "ORDER BY seq DESC LIMIT ?",
+                    (session_id, limit)
+                ).fetchall()
+                rows.reverse()
+        return messages_from_dict([json.loads(row[0]) for row in rows])
+
+    def count(self, session_id: str) -> int:
+        with self._lock:
+            (count,) = self._connection().execute(
+                "SELECT COUNT(*) FROM chat_messages WHERE session_id = ?", (session_id,)
+            ).fetchone()
+        return count
+
+    def sessions(self) -> List[str]:
+        with self._lock:
+            rows = self._connection().execute(
+                "SELECT DISTINCT session_id FROM chat_messages"
+            ).fetchall()
+        return [row[0] for row in rows]
+
+    def delete(self, session_id: str) -> None:
+        """Forget a session."""
+        with self._lock:
+            self._connection().execute(
+                "DELETE FROM chat_messages WHERE session_id = ?", (session_id,)
+            )
+
+    def close(self) -> None:
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+
+class SQLiteChatMessageHistory(BaseChatMessageHistory):
+    """
+    One session's view of a SQLiteChatHistoryStore.
+
+    Holds no messages itself: every read goes to the database, so all
+    processes see each other's writes. .messages returns only the store's
+    tail_messages most recent messages; use full_history() for the rest.
+    """
+
+    def __init__(self, store: SQLiteChatHistoryStore, session_id: str):
+        self.store = store
+        self.session_id = session_id
+
+    @property
+    def messages(self) -> List[BaseMessage]:
+        return self.store.tail(self.session_id, self.store.tail_messages)
+
+    def tail(self, limit: int) -> List[BaseMessage]:
+        return self.store.tail(self.session_id, limit)
+
+    def full_history(self) -> List[BaseMessage]:
+        return self.store.tail(self.session_id)
+
+    def add_message(self, message: BaseMessage) -> None:
+        self.store.append(self.session_id, [message])
+
+    def add_messages(self, messages: Sequence[BaseMessage]) -> None:
+        self.store.append(self.session_id, list(messages))
+
+    def clear(self) -> None:
+        self.store.delete(self.session_id)
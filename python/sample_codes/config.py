@@ -9,6 +9,9 @@ Ensure the models you specify are already pulled in Ollama:
     ollama pull <model-name>
 """
 
+import os
+import threading
+
 # ============================================================================
 # LLM Models Configuration
 # ============================================================================
@@ -50,6 +53,16 @@ PRECISE_TEMPERATURE = 0.3
 # Temperature for balanced tasks
 BALANCED_TEMPERATURE = 0.5
 
+# ============================================================================
+# Ollama Server
+# ============================================================================
+
+# Base URL of the Ollama server. Set the OLLAMA_BASE_URL environment variable
+# to point every example at another server, e.g. the offline stand-in:
+#     python fake_ollama.py --port 11435
+#     OLLAMA_BASE_URL=http://localhost:11435 python unit_04_langgraph_intro.py
+OLLAMA_BASE_URL = os.environ.get("OLLAMA_BASE_URL", "http://localhost:11434")
+
 # ============================================================================
 # Timeout Settings
 # ============================================================================
@@ -60,6 +73,160 @@ DEFAULT_TIMEOUT = 60.0
 # Extended timeout for complex operations (in seconds)
 EXTENDED_TIMEOUT = 120.0
 
+# ============================================================================
+# Cache Settings
+# ============================================================================
+
+# Directory for on-disk caches shared by the examples (embeddings, indexes, ...)
+CACHE_DIR = os.path.join(os.path.expanduser("~"), ".cache", "agentic-ai-samples")
+
+# Maximum number of embeddings kept in the on-disk embedding cache.
+# Least recently used entries are evicted beyond this.
+EMBEDDING_CACHE_MAX_ENTRIES = 100_000
+
+# Query embeddings kept in memory per process, in front of the SQLite cache
+QUERY_EMBEDDING_CACHE_SIZE = 1024
+
+# Seconds a cached LLM response stays valid (None = never expires)
+LLM_CACHE_TTL = 7 * 24 * 3600
+
+# Maximum number of cached LLM responses (least recently used are evicted)
+LLM_CACHE_MAX_ENTRIES = 10_000
+
+# Minimum cosine similarity for the semantic tier of the LLM cache to reuse
+# a response cached for a different but near-identical prompt
+LLM_CACHE_SIMILARITY_THRESHOLD = 0.95
+
+# ============================================================================
+# Chat Session Settings
+# ============================================================================
+
+# Maximum chat sessions kept in memory (least recently used are evicted)
+SESSION_MAX_SESSIONS = 10_000
+
+# Maximum estimated bytes of chat history kept in memory
+SESSION_MAX_BYTES = 256 * 1024 * 1024
+
+# Seconds a session may sit idle before it expires (None = never)
+SESSION_IDLE_TTL = 3600
+
+# Token budget for the chat history sent with each prompt (sliding window)
+HISTORY_MAX_TOKENS = 1000
+
+# Summarizing memory: once a session's history passes SUMMARY_TRIGGER_TOKENS,
+# everything but the newest SUMMARY_KEEP_RECENT_TOKENS is condensed into a
+# running summary by SUMMARY_WORKERS background threads
+SUMMARY_TRIGGER_TOKENS = 2000
+SUMMARY_KEEP_RECENT_TOKENS = 500
+SUMMARY_WORKERS = 2
+
+# SQLite database for persistent chat histories shared by worker processes
+CHAT_HISTORY_DB = os.path.join(CACHE_DIR, "chat_history.sqlite")
+
+# Most recent messages loaded per request from the persistent history
+# (None = the whole transcript)
+CHAT_HISTORY_TAIL_MESSAGES = 20
+
+# ============================================================================
+# Ingestion Settings
+# ============================================================================
+
+# Worker processes used to parse and chunk documents
+INGEST_PARSE_WORKERS = os.cpu_count() or 1
+
+# Concurrent embedding requests in flight during ingestion
+INGEST_EMBED_CONCURRENCY = 4
+
+# Number of chunks sent per embedding request
+INGEST_EMBED_BATCH_SIZE = 32
+
+# ============================================================================
+# Vector Store Settings
+# ============================================================================
+
+# On-disk dtype of persisted NumPy vector stores: "float32" or "float16" (half the size)
+VECTOR_STORE_DTYPE = "float32"
+
+# Rows upcast per chunk when scoring a float16 matrix
+VECTOR_SCORE_CHUNK_ROWS = 65_536
+
+# FAISS index type for the RAG examples: "flat" (exact), "ivfpq" or "hnsw"
+FAISS_INDEX_TYPE = "flat"
+
+# IVF lists probed per query: higher = better recall, slower queries
+FAISS_NPROBE = 16
+
+# Product-quantization sub-vectors per embedding (reduced to divide the dimension)
+FAISS_PQ_M = 16
+
+# Re-rank IVF-PQ candidates with exact vectors: k * FAISS_REFINE_K_FACTOR
+# candidates are re-scored (better recall, keeps a full-precision copy)
+FAISS_IVFPQ_REFINE = True
+FAISS_REFINE_K_FACTOR = 4
+
+# HNSW graph degree and build/search beam widths (higher = better recall, slower)
+FAISS_HNSW_M = 32
+FAISS_EF_CONSTRUCTION = 200
+FAISS_EF_SEARCH = 64
+
+# Maximum vectors sampled to train an IVF-PQ index
+FAISS_TRAIN_SAMPLE = 50_000
+
+# ============================================================================
+# Hybrid Retrieval Settings
+# ============================================================================
+
+# BM25 term-frequency saturation and document-length normalization
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+# Reciprocal rank fusion constant: higher = flatter weighting of ranks
+RRF_K = 60
+
+# Candidates fetched from each retriever before fusion, per result returned
+HYBRID_CANDIDATE_FACTOR = 4
+
+# "auto" answers identifier lookups from BM25 alone; "hybrid", "keyword" or "vector" to force
+HYBRID_MODE = "auto"
+
+# ============================================================================
+# Extractive Answer Settings
+# ============================================================================
+
+# Minimum share (idf-weighted) of query terms the best sentence must contain
+# to be returned as the answer; below it the LLM synthesizes one
+EXTRACTIVE_MIN_CONFIDENCE = 0.75
+
+# Sentences returned per answer, and how close (as a fraction of the best
+# score) a runner-up must be to be included
+EXTRACTIVE_MAX_SPANS = 2
+EXTRACTIVE_SPAN_RATIO = 0.8
+
+# ============================================================================
+# Batch Execution Settings
+# ============================================================================
+
+# Maximum concurrent LLM calls for chain.batch() style bulk processing
+BATCH_MAX_CONCURRENCY = 8
+
+# Questions retrieved per vectorized query_batch() call in BatchQueryEngine
+BATCH_RETRIEVAL_CHUNK = 256
+
+# Map-reduce synthesis: LLM calls in flight at once, and chunks answered per map call.
+# Ollama runs requests in parallel only up to OLLAMA_NUM_PARALLEL on the server.
+SYNTHESIS_MAX_CONCURRENCY = 8
+SYNTHESIS_CHUNKS_PER_MAP = 2
+
+# ============================================================================
+# Graph Execution Settings
+# ============================================================================
+
+# Maximum graph runs in flight at once when driving graphs concurrently
+GRAPH_MAX_CONCURRENCY = 32
+
+# SQLite database used to checkpoint LangGraph runs so they can resume
+CHECKPOINT_DB = os.path.join(CACHE_DIR, "checkpoints.sqlite")
+
 # ============================================================================
 # Helper Functions
 # ============================================================================
@@ -80,6 +247,128 @@ def get_comparison_models():
     """Get list of models for comparison."""
     return COMPARISON_MODELS
 
+# ============================================================================
+# Shared LLM Client Registry
+# ============================================================================
+
+# Clients are cached per (kind, model, temperature, timeout, base URL) so every node of a
+# graph reuses the same client - and with it the same pooled, keep-alive HTTP
+# connections - instead of building a new one on each invocation.
+_client_registry = {}
+_client_registry_lock = threading.Lock()
+
+def _get_or_create_client(key, factory):
+    """Return the cached client for key, creating it once if needed."""
+    client = _client_registry.get(key)
+    if client is None:
+        with _client_registry_lock:
+            client = _client_registry.get(key)
+            if client is None:
+                client = factory()
+                _client_registry[key] = client
+    return client
+
+def get_chat_model(model=None, temperature=BALANCED_TEMPERATURE, timeout=DEFAULT_TIMEOUT):
+    """
+    Get a shared, connection-pooled ChatOllama client.
+    
+    Repeated calls with the same (model, temperature, timeout) return the
+    same instance, so its underlying HTTP connection pool is reused.
+    """
+    model = model or PRIMARY_LLM_MODEL
+    base_url = OLLAMA_BASE_URL
+    
+    def factory():
+        from langchain_ollama import ChatOllama
+        return ChatOllama(
+            model=model,
+            temperature=temperature,
+            base_url=base_url,
+            client_kwargs={"timeout": timeout}
+        )
+    
+    return _get_or_create_client(("chat", model, temperature, timeout, base_url), factory)
+
+def get_llm(model=None, temperature=BALANCED_TEMPERATURE, timeout=DEFAULT_TIMEOUT):
+    """
+    Get a shared, connection-pooled text-completion Ollama client.
+    
+    Returns an OllamaLLM (string in, string out) cached the same way as
+    get_chat_model().
+    """
+    model = model or PRIMARY_LLM_MODEL
+    base_url = OLLAMA_BASE_URL
+    
+    def factory():
+        from langchain_ollama import OllamaLLM
+        return OllamaLLM(
+            model=model,
+            temperature=temperature,
+            base_url=base_url,
+            client_kwargs={"timeout": timeout}
+        )
+    
+    return _get_or_create_client(("llm", model, temperature, timeout, base_url), factory)
+
+def clear_client_registry():
+    """Drop all cached clients (e.g. after changing models or for tests)."""
+    with _client_registry_lock:
+        _client_registry.clear()
+
+# Cached clients open their async HTTP connections on the event loop that
+# first awaits them, so sync wrappers must not give every call a fresh
+# loop (asyncio.run): the second call would find those connections bound
+# to a closed loop. run_async() reuses one loop, which runs forever in its
+# own daemon thread so callers from any thread can share it concurrently.
+_event_loop = None
+_event_loop_lock = threading.Lock()
+
+def _shared_event_loop():
+    global _event_loop
+    import asyncio
+    with _event_loop_lock:
+        if _event_loop is None:
+            _event_loop = asyncio.new_event_loop()
+            threading.Thread(target=_event_loop.run_forever, name="run-async-loop", daemon=True).start()
+        return _event_loop
+
+def run_async(coro):
+    """
+    Run a coroutine to completion on the shared process-wide event loop.
+
+    Safe to call from several threads at once and from code that already
+    has a running loop (e.g. Jupyter). The coroutine sees the caller's
+    context variables, so LangChain callbacks and tracing carry over. A
+    nested call made from inside the shared loop cannot block it, so it
+    runs on a temporary loop instead.
+    """
+    import asyncio
+    import contextvars
+    from concurrent.futures import Future, ThreadPoolExecutor
+    context = contextvars.copy_context()
+    loop = _shared_event_loop()
+    if threading.current_thread().name == "run-async-loop":
+        with ThreadPoolExecutor(max_workers=1) as pool:
+            return pool.submit(context.run, asyncio.run, coro).result()
+    
+    result = Future()
+    
+    def copy_outcome(task):
+        if task.cancelled():
+            result.cancel()
+        elif task.exception() is not None:
+            result.set_exception(task.exception())
+        else:
+            result.set_result(task.result())
+    
+    def start():
+        # Called in the caller's context, which the new task copies
+        loop.create_task(coro).add_done_callback(copy_outcome)
+    
+    loop.call_soon_threadsafe(start, context=context)
+    return result.result()
+
+
 def print_config():
     """Print current configuration."""
     print("=" * 60)
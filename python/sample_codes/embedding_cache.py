@@ -0,0 +1,327 @@
+"""
+Embedding Cache for LlamaIndex
+Shared helper used by the Unit 6 RAG examples
+
+Wraps any LlamaIndex embedding model so that identical text is only embedded
+once. Vectors are stored in SQLite keyed by a hash of (model, kind, text), so
+the cache survives restarts and can be shared by several processes. Query
+embeddings are also kept in an in-memory LRU, so repeated questions skip
+SQLite too, and many questions can be embedded in one batched request.
+
+Usage:
+    from embedding_cache import CachedEmbedding, get_embedding_cache
+    Settings.embed_model = CachedEmbedding(OllamaEmbedding(...), get_embedding_cache())
+    vectors = Settings.embed_model.get_query_embedding_batch(questions)
+"""
+
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+from array import array
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Sequence
+
+from llama_index.core.base.embeddings.base import BaseEmbedding, Embedding
+from pydantic import PrivateAttr
+
+import config
+
+# ============================================================================
+# SQLite Embedding Store
+# ============================================================================
+
+class EmbeddingCacheStore:
+    """
+    Content-hash keyed embedding store backed by SQLite.
+
+    Keeps at most max_entries vectors; the least recently used ones are
+    evicted first. Hit/miss counters are kept per process.
+    """
+
+    def __init__(self, path: str, max_entries: int = config.EMBEDDING_CACHE_MAX_ENTRIES):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self.path = path
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        # WAL lets readers in other processes proceed while we write
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            """CREATE TABLE IF NOT EXISTS embeddings (
+                key TEXT PRIMARY KEY,
+                vector BLOB NOT NULL,
+                last_used REAL NOT NULL
+            )"""
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS embeddings_last_used ON embeddings (last_used)"
+        )
+
+    @staticmethod
+    def make_key(model_name: str, kind: str, text: str) -> str:
+        """Hash the model, embedding kind (text/query) and content into a key."""
+        digest = hashlib.sha256()
+        digest.update(f"{model_name}\0{kind}\0".encode("utf-8"))
+        digest.update(text.encode("utf-8"))
+        return digest.hexdigest()
+
+    def get_many(self, keys: Sequence[str]) -> Dict[str, List[float]]:
+        """Return the cached vectors for the given keys (missing keys are omitted)."""
+        found = {}
+        unique_keys = list(dict.fromkeys(keys))
+
+        with self._lock:
+            # Stay well below SQLite's bound-parameter limit
+            for start in range(0, len(unique_keys), 500):
+                chunk = unique_keys[start:start + 500]
+                placeholders = ",".join("?" * len(chunk))
+                rows = self._conn.execute(
+                    f"SELECT key, vector FROM embeddings WHERE key IN ({placeholders})",
+                    chunk
+                ).fetchall()
+                for key, blob in rows:
+                    found[key] = array("f", blob).tolist()
+
+            if found:
+                # One write transaction for all hits, not one per row
+                now = time.time()
+                self._conn.execute("BEGIN")
+                try:
+                    self._conn.executemany(
+                        "UPDATE embeddings SET last_used = ? WHERE key = ?",
+                        [(now, key) for key in found]
+                    )
+                except BaseException:
+                    self._conn.execute("ROLLBACK")
+                    raise
+                self._conn.execute("COMMIT")
+
+            self.hits += sum(1 for key in keys if key in found)
+            self.misses += sum(1 for key in keys if key not in found)
+
+        return found
+
+    def put_many(self, items: Dict[str, List[float]]) -> None:
+        """Store vectors and evict least recently used entries over the size bound."""
+        if not items:
+            return
+
+        now = time.time()
+        with self._lock:
+            self._conn.execute("BEGIN")
+            try:
+                self._conn.executemany(
+                    "INSERT OR REPLACE INTO embeddings (key, vector, last_used) VALUES (?, ?, ?)",
+                    [(key, array("f", vector).tobytes(), now) for key, vector in items.items()]
+                )
+                self._evict_locked()
+            except BaseException:
+                # Leave the shared connection usable for the next caller
+                self._conn.execute("ROLLBACK")
+                raise
+            self._conn.execute("COMMIT")
+
+    def _evict_locked(self) -> None:
+        """Drop the oldest entries once the store exceeds max_entries."""
+        (count,) = self._conn.execute("SELECT COUNT(*) FROM embeddings").fetchone()
+        overflow = count - self.max_entries
+        if overflow > 0:
+            self._conn.execute(
+                """DELETE FROM embeddings WHERE key IN (
+                    SELECT key FROM embeddings ORDER BY last_used ASC LIMIT ?
+                )""",
+                (overflow,)
+            )
+            self.evictions += overflow
+
+    def __len__(self) -> int:
+        with self._lock:
+            (count,) = self._conn.execute("SELECT COUNT(*) FROM embeddings").fetchone()
+        return count
+
+    def stats(self) -> dict:
+        """Return hit/miss/eviction counters and the current size."""
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self),
+            "max_entries": self.max_entries,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+        }
+
+    def clear(self) -> None:
+        """Remove every cached vector and reset the counters."""
+        with self._lock:
+            self._conn.execute("DELETE FROM embeddings")
+            self.hits = self.misses = self.evictions = 0
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+_default_store: Optional[EmbeddingCacheStore] = None
+_default_store_lock = threading.Lock()
+
+def get_embedding_cache() -> EmbeddingCacheStore:
+    """Get the process-wide embedding cache stored under config.CACHE_DIR."""
+    global _default_store
+    with _default_store_lock:
+        if _default_store is None:
+            _default_store = EmbeddingCacheStore(
+                os.path.join(config.CACHE_DIR, "embeddings.sqlite"),
+                max_entries=config.EMBEDDING_CACHE_MAX_ENTRIES
+            )
+    return _default_store
+
+
+# ============================================================================
+# LlamaIndex Embedding Wrapper
+# ============================================================================
+
+def embed_queries(embed_model: BaseEmbedding, queries: List[str]) -> List[Embedding]:
+    """
+    Embed several queries, batched into as few requests as the model allows.
+
+    Models with a separate query instruction must embed queries one by
+    one; models that embed queries and documents alike (the same
+    query_instruction and text_instruction, e.g. none) are sent the whole
+    list through the batched text endpoint.
+    """
+    if hasattr(embed_model, "get_query_embedding_batch"):
+        return embed_model.get_query_embedding_batch(queries)
+    if hasattr(embed_model, "query_instruction") and \
+            embed_model.query_instruction == getattr(embed_model, "text_instruction", None):
+        return embed_model.get_text_embedding_batch(queries)
+    return [embed_model.get_query_embedding(query) for query in queries]
+
+
+class CachedEmbedding(BaseEmbedding):
+    """
+    LlamaIndex embedding model that consults an EmbeddingCacheStore first
+    and only forwards cache misses to the wrapped model.
+
+    Query embeddings additionally go through a per-process LRU of
+    query_cache_size entries in front of the store.
+    """
+
+    _embed_model: BaseEmbedding = PrivateAttr()
+    _store: EmbeddingCacheStore = PrivateAttr()
+    _query_cache: "OrderedDict[str, Embedding]" = PrivateAttr(default_factory=OrderedDict)
+    _query_cache_size: int = PrivateAttr()
+    _query_cache_hits: int = PrivateAttr(default=0)
+    _query_cache_lock: Any = PrivateAttr(default_factory=threading.Lock)
+
+    def __init__(self, embed_model: BaseEmbedding, store: EmbeddingCacheStore,
+                 query_cache_size: int = config.QUERY_EMBEDDING_CACHE_SIZE, **kwargs):
+        kwargs.setdefault("model_name", embed_model.model_name)
+        kwargs.setdefault("embed_batch_size", embed_model.embed_batch_size)
+        super().__init__(**kwargs)
+        self._embed_model = embed_model
+        self._store = store
+        self._query_cache_size = query_cache_size
+
+    @classmethod
+    def class_name(cls) -> str:
+        return "CachedEmbedding"
+
+    @property
+    def store(self) -> EmbeddingCacheStore:
+        return self._store
+
+    def _key(self, kind: str, text: str) -> str:
+        return EmbeddingCacheStore.make_key(self.model_name, kind, text)
+
+    def _lookup(self, kind: str, texts: List[str]):
+        """Split texts into cached vectors and the (deduplicated) misses."""
+        keys = [self._key(kind, text) for text in texts]
+        cached = self._store.get_many(keys)
+        missing = list(dict.fromkeys(t for t, k in zip(texts, keys) if k not in cached))
+        return keys, cached, missing
+
+    def _merge(self, kind, keys, cached, missing, vectors) -> List[Embedding]:
+        """Store freshly computed vectors and return results in input order."""
+        fresh = {self._key(kind, text): vector for text, vector in zip(missing, vectors)}
+        self._store.put_many(fresh)
+        cached.update(fresh)
+        return [cached[key] for key in keys]
+
+    def query_cache_stats(self) -> dict:
+        """Size and hit count of the in-memory query LRU."""
+        with self._query_cache_lock:
+            return {"entries": len(self._query_cache), "max_entries": self._query_cache_size,
+                    "hits": self._query_cache_hits}
+
+    def _remember_queries(self, vectors: Dict[str, Embedding]) -> None:
+        with self._query_cache_lock:
+            for key, vector in vectors.items():
+                self._query_cache[key] = vector
+                self._query_cache.move_to_end(key)
+            while len(self._query_cache) > self._query_cache_size:
+                self._query_cache.popitem(last=False)
+
+    def _lookup_queries(self, queries: List[str]):
+        """Like _lookup(), checking the query LRU before the store."""
+        keys = [self._key("query", query) for query in queries]
+        cached = {}
+        with self._query_cache_lock:
+            for key in keys:
+                if key in self._query_cache:
+                    self._query_cache.move_to_end(key)
+                    cached[key] = self._query_cache[key]
+                    self._query_cache_hits += 1
+        uncached = [key for key in dict.fromkeys(keys) if key not in cached]
+        if uncached:
+            stored = self._store.get_many(uncached)
+            self._remember_queries(stored)
+            cached.update(stored)
+        missing = list(dict.fromkeys(q for q, k in zip(queries, keys) if k not in cached))
+        return keys, cached, missing
+
+    def _merge_queries(self, keys, cached, missing, vectors) -> List[Embedding]:
+        self._remember_queries({self._key("query", query): vector for query, vector in zip(missing, vectors)})
+        return self._merge("query", keys, cached, missing, vectors)
+
+    def _get_query_embedding(self, query: str) -> Embedding:
+        keys, cached, missing = self._lookup_queries([query])
+        vectors = [self._embed_model.get_query_embedding(query)] if missing else []
+        return self._merge_queries(keys, cached, missing, vectors)[0]
+
+    async def _aget_query_embedding(self, query: str) -> Embedding:
+        keys, cached, missing = self._lookup_queries([query])
+        vectors = [await self._embed_model.aget_query_embedding(query)] if missing else []
+        return self._merge_queries(keys, cached, missing, vectors)[0]
+
+    def get_query_embedding_batch(self, queries: List[str]) -> List[Embedding]:
+        """Embed many queries: cached ones are free, the rest go out batched (see embed_queries)."""
+        keys, cached, missing = self._lookup_queries(queries)
+        vectors = embed_queries(self._embed_model, missing) if missing else []
+        return self._merge_queries(keys, cached, missing, vectors)
+
+    def _get_text_embedding(self, text: str) -> Embedding:
+        return self._get_text_embeddings([text])[0]
+
+    async def _aget_text_embedding(self, text: str) -> Embedding:
+        return (await self._aget_text_embeddings([text]))[0]
+
+    def _get_text_embeddings(self, texts: List[str]) -> List[Embedding]:
+        keys, cached, missing = self._lookup("text", texts)
+        vectors = self._embed_model.get_text_embedding_batch(missing) if missing else []
+        return self._merge("text", keys, cached, missing, vectors)
+
+    async def _aget_text_embeddings(self, texts: List[str]) -> List[Embedding]:
+        keys, cached, missing = self._lookup("text", texts)
+        vectors = await self._embed_model.aget_text_embedding_batch(missing) if missing else []
+        return self._merge("text", keys, cached, missing, vectors)
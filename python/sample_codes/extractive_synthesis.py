@@ -0,0 +1,217 @@
+"""
+Extractive Answers for LlamaIndex Query Engines
+Shared helper used by the Unit 6 RAG examples
+
+Lookup-style questions ("Where is the Eiffel Tower?") are usually answered
+verbatim by one sentence of the top retrieved node, yet every query still
+pays for an LLM synthesis call. ExtractiveSynthesizer scores the sentences
+of the retrieved nodes against the query and returns the best spans with
+their scores. Only when the best sentence covers too little of the query
+(confidence below a threshold), or the query asks for an explanation
+("Why ...?", "How does ...?") rather than a fact, does it fall back to LLM
+synthesis.
+
+Scoring is lexical: the idf-weighted share of the query's content words
+found in a sentence, so it needs neither the LLM nor an embedding call.
+
+Usage:
+    query_engine = index.as_query_engine(
+        similarity_top_k=2,
+        response_synthesizer=ExtractiveSynthesizer(min_confidence=0.75)
+    )
+    response = query_engine.query("Where is the Eiffel Tower located?")
+    response.metadata["answer_mode"]   # "extractive" or "llm"
+    response.metadata["spans"]         # [{"text", "score", "node_id", "start", "end"}, ...]
+"""
+
+import math
+import re
+from typing import Any, Dict, List, Optional, Sequence
+
+from llama_index.core import get_response_synthesizer
+from llama_index.core.base.response.schema import Response
+from llama_index.core.response_synthesizers import BaseSynthesizer
+from llama_index.core.schema import MetadataMode, NodeWithScore, QueryBundle, TextNode
+from llama_index.core.types import RESPONSE_TEXT_TYPE
+
+import config
+from hybrid_retrieval import tokenize
+
+# A sentence runs to terminal punctuation followed by whitespace (so "3.14"
+# and "v1.2" stay whole), a line break or the end of the text
+_SENTENCE_RE = re.compile(r"\S.*?(?:[.!?]+(?=\s|$)|(?=\n)|$)", re.S)
+
+_STOPWORDS = frozenset("""
+a an and are as at be by can did do does for from had has have how i in is it its
+me my of on or that the their there these this to was were what when where which
+who whom whose why will with you your about tell please give explain describe
+""".split())
+
+# "how" followed by one of these asks for a quantity, which a sentence can state
+_HOW_LOOKUPS = frozenset("many much long old far big large tall often".split())
+
+
+def split_sentences(text: str) -> List[tuple]:
+    """(sentence, start, end) character spans of text."""
+    return [(m.group().strip(), m.start(), m.start() + len(m.group().rstrip()))
+            for m in _SENTENCE_RE.finditer(text) if m.group().strip()]
+
+
+def needs_reasoning(query: str) -> bool:
+    """
+    Whether a query asks for an explanation rather than a fact.
+
+    Interrogatives are stopwords, so "Why is the Eiffel Tower in Paris?"
+    would otherwise be fully covered by the sentence stating where it is.
+    """
+    tokens = tokenize(query)
+    for i, token in enumerate(tokens):
+        if token == "why":
+            return True
+        if token == "how" and (i + 1 == len(tokens) or tokens[i + 1] not in _HOW_LOOKUPS):
+            return True
+    return False
+
+
+def query_terms(query: str) -> List[str]:
+    """Content words of a query (all words if it has nothing but stopwords)."""
+    terms = list(dict.fromkeys(tokenize(query)))
+    content = [term for term in terms if term not in _STOPWORDS]
+    return content or terms
+
+
+def extract_spans(query: str, nodes: Sequence[NodeWithScore],
+                  max_spans: int = config.EXTRACTIVE_MAX_SPANS) -> List[Dict[str, Any]]:
+    """
+    Best-matching sentences of nodes for query, best first.
+
+    A sentence's score is the idf-weighted fraction of query terms it
+    contains (1.0 = every term). idf is computed over all candidate
+    sentences, so terms found everywhere count for little; terms found
+    nowhere count fully against every sentence. Ties go to the node
+    retrieved first.
+    """
+    terms = query_terms(query)
+    candidates = []
+    for rank, node in enumerate(nodes):
+        text = node.node.get_content(metadata_mode=MetadataMode.NONE)
+        for sentence, start, end in split_sentences(text):
+            candidates.append((rank, node.node.node_id, sentence, start, end, set(tokenize(sentence))))
+    if not terms or not candidates:
+        return []
+
+    num_sentences = len(candidates)
+    weights = {term: math.log(1 + (num_sentences + 1) / (sum(term in c[5] for c in candidates) + 0.5))
+               for term in terms}
+    total = sum(weights.values())
+
+    spans = []
+    for rank, node_id, sentence, start, end, tokens in candidates:
+        score = sum(weight for term, weight in weights.items() if term in tokens) / total
+        if score > 0:
+            spans.append({"text": sentence, "score": score, "node_id": node_id,
+                          "start": start, "end": end, "_rank": rank})
+    spans.sort(key=lambda span: (-span["score"], span["_rank"], span["start"]))
+    for span in spans:
+        del span["_rank"]
+    return spans[:max_spans]
+
+
+class ExtractiveSynthesizer(BaseSynthesizer):
+    """
+    Response synthesizer that answers with source sentences when it can.
+
+    Returns a Response like compact mode, with source_nodes and in
+    metadata: answer_mode ("extractive" or "llm"), confidence (best span
+    score) and spans. Spans within span_ratio of the best score are
+    joined into the answer. Below min_confidence, or when the query asks
+    why/how (see needs_reasoning), it goes to fallback (compact synthesis
+    by default, built on first use).
+    mode_counts records how many answers took each path.
+    """
+
+    def __init__(self, fallback: Optional[BaseSynthesizer] = None,
+                 min_confidence: float = config.EXTRACTIVE_MIN_CONFIDENCE,
+                 max_spans: int = config.EXTRACTIVE_MAX_SPANS,
+                 span_ratio: float = config.EXTRACTIVE_SPAN_RATIO, **kwargs):
+        super().__init__(**kwargs)
+        self._fallback = fallback
+        self.min_confidence = min_confidence
+        self.max_spans = max_spans
+        self.span_ratio = span_ratio
+        self.mode_counts = {"extractive": 0, "llm": 0}
+
+    @property
+    def fallback(self) -> BaseSynthesizer:
+        if self._fallback is None:
+            self._fallback = get_response_synthesizer(llm=self._llm, response_mode="compact")
+        return self._fallback
+
+    def _get_prompts(self) -> dict:
+        return {}
+
+    def _update_prompts(self, prompts: dict) -> None:
+        pass
+
+    def _get_prompt_modules(self) -> dict:
+        return {} if self._fallback is None else {"fallback": self._fallback}
+
+    def _extract(self, query_str: str, nodes: Sequence[NodeWithScore]):
+        """(answer text or None if not confident, confidence, spans)."""
+        spans = extract_spans(query_str, nodes, self.max_spans)
+        confidence = spans[0]["score"] if spans else 0.0
+        if confidence < self.min_confidence or needs_reasoning(query_str):
+            return None, confidence, spans
+        spans = [span for span in spans if span["score"] >= confidence * self.span_ratio]
+        return " ".join(span["text"] for span in spans), confidence, spans
+
+    def _with_metadata(self, response, answer_mode: str, confidence: float, spans: list):
+        self.mode_counts[answer_mode] += 1
+        metadata = {"answer_mode": answer_mode, "confidence": confidence, "spans": spans}
+        response.metadata = {**(response.metadata or {}), **metadata}
+        return response
+
+    def synthesize(self, query, nodes: List[NodeWithScore],
+                   additional_source_nodes: Optional[Sequence[NodeWithScore]] = None,
+                   **response_kwargs: Any):
+        query_str = query.query_str if isinstance(query, QueryBundle) else query
+        answer, confidence, spans = self._extract(query_str, nodes)
+        if answer is None:
+            response = self.fallback.synthesize(query, nodes, additional_source_nodes, **response_kwargs)
+            return self._with_metadata(response, "llm", confidence, spans)
+        source_nodes = list(nodes) + list(additional_source_nodes or [])
+        return self._with_metadata(Response(response=answer, source_nodes=source_nodes),
+                                   "extractive", confidence, spans)
+
+    async def asynthesize(self, query, nodes: List[NodeWithScore],
+                          additional_source_nodes: Optional[Sequence[NodeWithScore]] = None,
+                          **response_kwargs: Any):
+        query_str = query.query_str if isinstance(query, QueryBundle) else query
+        answer, confidence, spans = self._extract(query_str, nodes)
+        if answer is None:
+            response = await self.fallback.asynthesize(query, nodes, additional_source_nodes,
+                                                       **response_kwargs)
+            return self._with_metadata(response, "llm", confidence, spans)
+        source_nodes = list(nodes) + list(additional_source_nodes or [])
+        return self._with_metadata(Response(response=answer, source_nodes=source_nodes),
+                                   "extractive", confidence, spans)
+
+    # Plain-text entry points (no nodes to cite), used by callers of get_response()
+
+    def get_response(self, query_str: str, text_chunks: Sequence[str],
+                     **response_kwargs: Any) -> RESPONSE_TEXT_TYPE:
+        answer, _, _ = self._extract(query_str, _text_nodes(text_chunks))
+        if answer is None:
+            return self.fallback.get_response(query_str, text_chunks, **response_kwargs)
+        return answer
+
+    async def aget_response(self, query_str: str, text_chunks: Sequence[str],
+                            **response_kwargs: Any) -> RESPONSE_TEXT_TYPE:
+        answer, _, _ = self._extract(query_str, _text_nodes(text_chunks))
+        if answer is None:
+            return await self.fallback.aget_response(query_str, text_chunks, **response_kwargs)
+        return answer
+
+
+def _text_nodes(text_chunks: Sequence[str]) -> List[NodeWithScore]:
+    return [NodeWithScore(node=TextNode(text=chunk)) for chunk in text_chunks]
@@ -0,0 +1,430 @@
+"""
+FAISS Vector Store for LlamaIndex
+Shared helper used by the Unit 6 RAG examples
+
+Brute-force scoring (including numpy_vector_store.py) costs O(nodes) per
+query. FAISS adds approximate indexes that answer in sub-linear time:
+
+- flat:  exact inner-product search (the baseline)
+- ivfpq: inverted lists + product quantization; trained on a sample,
+         tuned at query time with nprobe. PQ scores are approximate, so by
+         default the best k * refine_k_factor candidates are re-ranked
+         with exact vectors (costs the memory of a flat copy)
+- hnsw:  graph search; no training, tuned at query time with ef_search
+
+Vectors are L2-normalized, so inner product equals cosine similarity.
+recall_latency_report() measures what each setting trades in recall
+against exact search for its speed.
+
+Usage:
+    store = FaissVectorStore(index_type="hnsw", ef_search=64)
+    index = VectorStoreIndex(nodes, storage_context=StorageContext.from_defaults(vector_store=store))
+    store.persist("storage/faiss")
+    store = FaissVectorStore.from_persist_dir("storage/faiss")
+"""
+
+import json
+import math
+import os
+import threading
+import time
+from typing import Any, Dict, List, Optional, Sequence
+
+import numpy as np
+from llama_index.core.schema import BaseNode
+from llama_index.core.vector_stores.types import (
+    BasePydanticVectorStore,
+    MetadataFilters,
+    VectorStoreQuery,
+    VectorStoreQueryMode,
+    VectorStoreQueryResult
+)
+from llama_index.core.vector_stores.utils import metadata_dict_to_node, node_to_metadata_dict
+from pydantic import PrivateAttr
+
+import config
+from metadata_index import MetadataIndex
+from numpy_vector_store import NodeTable, normalize_rows
+
+INDEX_TYPES = ("flat", "ivfpq", "hnsw")
+
+_PQ_BITS = 8  # Bits per PQ code; training needs at least 2**bits vectors
+
+# ============================================================================
+# Index Construction
+# ============================================================================
+
+def default_nlist(num_vectors: int) -> int:
+    """Rule-of-thumb IVF list count: ~4 * sqrt(n), with >= 39 training points per list."""
+    return max(1, min(int(4 * math.sqrt(num_vectors)), num_vectors // 39))
+
+
+def create_faiss_index(dim: int, index_type: str = config.FAISS_INDEX_TYPE,
+                       nlist: Optional[int] = None, num_vectors: int = 0,
+                       pq_m: int = config.FAISS_PQ_M, refine: bool = config.FAISS_IVFPQ_REFINE,
+                       hnsw_m: int = config.FAISS_HNSW_M,
+                       ef_construction: int = config.FAISS_EF_CONSTRUCTION):
+    """Create an empty inner-product FAISS index of the given type."""
+    import faiss
+
+    if index_type == "flat":
+        return faiss.IndexFlatIP(dim)
+    if index_type == "ivfpq":
+        nlist = nlist or default_nlist(num_vectors)
+        # PQ splits vectors into pq_m equal sub-vectors, so it must divide dim
+        while dim % pq_m:
+            pq_m -= 1
+        quantizer = faiss.IndexFlatIP(dim)
+        index = faiss.IndexIVFPQ(quantizer, dim, nlist, pq_m, _PQ_BITS, faiss.METRIC_INNER_PRODUCT)
+        return faiss.IndexRefineFlat(index) if refine else index
+    if index_type == "hnsw":
+        index = faiss.IndexHNSWFlat(dim, hnsw_m, faiss.METRIC_INNER_PRODUCT)
+        index.hnsw.efConstruction = ef_construction
+        return index
+    raise ValueError(f"Unknown FAISS index type {index_type!r}; expected one of {INDEX_TYPES}")
+
+
+def _base_index(index):
+    """The index a refine wrapper re-ranks for (or index itself)."""
+    import faiss
+
+    if isinstance(index, faiss.IndexRefine):
+        return faiss.downcast_index(index.base_index)
+    return index
+
+
+def min_training_vectors(index) -> int:
+    """Vectors needed to train index (0 if it needs no training)."""
+    import faiss
+
+    index = _base_index(index)
+    if isinstance(index, faiss.IndexIVF):
+        return max(index.nlist, 2 ** _PQ_BITS)
+    return 0
+
+
+def train_on_sample(index, vectors: np.ndarray, sample_size: int = config.FAISS_TRAIN_SAMPLE,
+                    seed: int = 0) -> None:
+    """Train index on a random sample of (normalized) vectors."""
+    if index.is_trained:
+        return
+    needed = min_training_vectors(index)
+    if len(vectors) < needed:
+        raise ValueError(f"Training this index needs at least {needed} vectors, got {len(vectors)}; "
+                         "train on a larger sample or use index_type='flat'")
+    if len(vectors) > sample_size:
+        rows = np.random.default_rng(seed).choice(len(vectors), sample_size, replace=False)
+        vectors = vectors[rows]
+    index.train(np.ascontiguousarray(vectors, dtype=np.float32))
+
+
+def search_parameters(index, nprobe: int, ef_search: int, selector=None,
+                      refine_k_factor: int = config.FAISS_REFINE_K_FACTOR):
+    """Per-query FAISS search parameters (thread-safe, unlike setting them on the index)."""
+    import faiss
+
+    if isinstance(index, faiss.IndexRefine):
+        return faiss.IndexRefineSearchParameters(
+            k_factor=refine_k_factor,
+            base_index_params=search_parameters(_base_index(index), nprobe, ef_search, selector)
+        )
+    if isinstance(index, faiss.IndexIVF):
+        return faiss.SearchParametersIVF(sel=selector, nprobe=nprobe)
+    if isinstance(index, faiss.IndexHNSW):
+        return faiss.SearchParametersHNSW(sel=selector, efSearch=ef_search)
+    if selector is not None:
+        return faiss.SearchParameters(sel=selector)
+    return None
+
+
+# ============================================================================
+# Vector Store
+# ============================================================================
+
+class FaissVectorStore(BasePydanticVectorStore):
+    """
+    LlamaIndex vector store backed by a FAISS index.
+
+    Rows are numbered in insertion order and double as FAISS ids. Deleted
+    rows are excluded at search time with an id selector rather than
+    removed, because removal renumbers some index types. An untrained
+    IVF-PQ index is trained on a sample of the first add() (or call
+    train() with a representative sample first). Metadata filters are
+    resolved from a postings index (metadata_index.py) into the selector.
+
+    nprobe / ef_search can also be passed per call:
+        index.as_retriever(vector_store_kwargs={"nprobe": 32})
+    """
+
+    stores_text: bool = True
+    index_type: str = config.FAISS_INDEX_TYPE
+    nlist: Optional[int] = None
+    nprobe: int = config.FAISS_NPROBE
+    ef_search: int = config.FAISS_EF_SEARCH
+    refine_k_factor: int = config.FAISS_REFINE_K_FACTOR
+    train_sample: int = config.FAISS_TRAIN_SAMPLE
+
+    _index: Any = PrivateAttr(default=None)
+    _table: NodeTable = PrivateAttr(default_factory=NodeTable)
+    _metadata: MetadataIndex = PrivateAttr(default_factory=MetadataIndex)
+    _deleted: set = PrivateAttr(default_factory=set)
+    _lock: Any = PrivateAttr(default_factory=threading.RLock)
+
+    @classmethod
+    def class_name(cls) -> str:
+        return "FaissVectorStore"
+
+    @property
+    def client(self):
+        """The underlying faiss.Index (None until the first add or train)."""
+        return self._index
+
+    @property
+    def num_vectors(self) -> int:
+        return 0 if self._index is None else self._index.ntotal - len(self._deleted)
+
+    def _ensure_index(self, dim: int, num_vectors: int) -> None:
+        if self._index is None:
+            self._index = create_faiss_index(dim, self.index_type, nlist=self.nlist,
+                                             num_vectors=min(num_vectors, self.train_sample))
+        elif self._index.d != dim:
+            raise ValueError(f"Embedding dimension {dim} does not match index dimension {self._index.d}")
+
+    def train(self, vectors: Sequence[Sequence[float]]) -> None:
+        """Train the index on a sample of embeddings (IVF-PQ only; no-op otherwise)."""
+        vectors = normalize_rows(np.array(vectors, dtype=np.float32, ndmin=2))
+        with self._lock:
+            self._ensure_index(vectors.shape[1], len(vectors))
+            train_on_sample(self._index, vectors, self.train_sample)
+
+    def add(self, nodes: Sequence[BaseNode], **add_kwargs: Any) -> List[str]:
+        if not nodes:
+            return []
+        vectors = normalize_rows(np.array([node.get_embedding() for node in nodes], dtype=np.float32))
+        with self._lock:
+            self._ensure_index(vectors.shape[1], len(vectors))
+            train_on_sample(self._index, vectors, self.train_sample)
+            self._index.add(vectors)
+            self._table.append(nodes)
+            self._metadata.add(nodes)
+        return [node.node_id for node in nodes]
+
+    def _remove_rows(self, rows: Sequence[int]) -> None:
+        self._deleted.update(rows)
+        self._table.remove(rows)
+
+    def delete(self, ref_doc_id: str, **delete_kwargs: Any) -> None:
+        with self._lock:
+            self._remove_rows(self._table.rows_for_ref_docs([ref_doc_id]))
+
+    def delete_nodes(self, node_ids: Optional[List[str]] = None,
+                     filters: Optional[MetadataFilters] = None, **delete_kwargs: Any) -> None:
+        """Delete nodes matching node_ids and/or filters (both must match if both are given)."""
+        with self._lock:
+            if filters is None:
+                self._remove_rows(self._table.rows_for_node_ids(node_ids or []))
+                return
+            mask = self._metadata.mask(filters, len(self._table.nodes))
+            if node_ids is not None:
+                mask &= self._rows_mask(self._table.rows_for_node_ids(node_ids))
+            self._remove_rows([int(row) for row in np.flatnonzero(mask) if row not in self._deleted])
+
+    def clear(self) -> None:
+        with self._lock:
+            self._index = None
+            self._table = NodeTable()
+            self._metadata = MetadataIndex()
+            self._deleted = set()
+
+    # ------------------------------------------------------------------
+    # Queries
+    # ------------------------------------------------------------------
+
+    def _rows_mask(self, rows: Sequence[int]) -> np.ndarray:
+        mask = np.zeros(len(self._table.nodes), dtype=bool)
+        mask[np.asarray(rows, dtype=np.int64)] = True
+        return mask
+
+    def _selector(self, query: Optional[VectorStoreQuery]):
+        """
+        FAISS id selector for the rows a query may return (None for all).
+
+        node_ids, doc_ids and metadata filters are resolved to rows the
+        same way NumpyVectorStore does, with the shared postings index.
+        """
+        import faiss
+
+        masks = []
+        if query is not None and query.node_ids:
+            masks.append(self._rows_mask(self._table.rows_for_node_ids(query.node_ids)))
+        if query is not None and query.doc_ids:
+            masks.append(self._rows_mask(self._table.rows_for_ref_docs(query.doc_ids)))
+        if query is not None and query.filters is not None:
+            masks.append(self._metadata.mask(query.filters, len(self._table.nodes)))
+        if masks:
+            rows = np.flatnonzero(np.logical_and.reduce(masks))
+            if self._deleted:
+                rows = rows[~np.isin(rows, list(self._deleted))]
+            return faiss.IDSelectorBatch(rows.astype(np.int64))
+        if self._deleted:
+            deleted = np.fromiter(self._deleted, dtype=np.int64, count=len(self._deleted))
+            return faiss.IDSelectorNot(faiss.IDSelectorBatch(deleted))
+        return None
+
+    def _search(self, embeddings: Sequence[Sequence[float]], similarity_top_k: int,
+                query: Optional[VectorStoreQuery] = None, nprobe: Optional[int] = None,
+                ef_search: Optional[int] = None) -> List[VectorStoreQueryResult]:
+        if len(embeddings) == 0:
+            return []
+        with self._lock:
+            if self.num_vectors == 0:
+                return [VectorStoreQueryResult(nodes=[], similarities=[], ids=[]) for _ in embeddings]
+            index, table = self._index, self._table
+            selector = self._selector(query)
+
+        queries = normalize_rows(np.array(embeddings, dtype=np.float32, ndmin=2))
+        params = search_parameters(index, nprobe or self.nprobe, ef_search or self.ef_search,
+                                   selector, self.refine_k_factor)
+        scores, rows = index.search(queries, similarity_top_k, params=params)
+
+        results = []
+        for query_scores, query_rows in zip(scores, rows):
+            hits = [(float(score), int(row)) for score, row in zip(query_scores, query_rows)
+                    if row >= 0 and table.get(int(row)) is not None]
+            nodes = [table.get(row) for _, row in hits]
+            results.append(VectorStoreQueryResult(
+                nodes=nodes,
+                similarities=[score for score, _ in hits],
+                ids=[node.node_id for node in nodes]
+            ))
+        return results
+
+    def query(self, query: VectorStoreQuery, **kwargs: Any) -> VectorStoreQueryResult:
+        """Top similarity_top_k nodes; accepts nprobe / ef_search overrides as kwargs."""
+        if query.mode != VectorStoreQueryMode.DEFAULT:
+            raise ValueError(f"FaissVectorStore supports only the default query mode, not {query.mode}")
+        if query.query_embedding is None:
+            raise ValueError("FaissVectorStore needs a query embedding")
+        return self._search([query.query_embedding], query.similarity_top_k, query,
+                            nprobe=kwargs.get("nprobe"), ef_search=kwargs.get("ef_search"))[0]
+
+    def query_batch(self, query_embeddings: Sequence[Sequence[float]], similarity_top_k: int = 2,
+                    nprobe: Optional[int] = None,
+                    ef_search: Optional[int] = None) -> List[VectorStoreQueryResult]:
+        """Search many queries in one FAISS call; results in input order."""
+        return self._search(query_embeddings, similarity_top_k, nprobe=nprobe, ef_search=ef_search)
+
+    # ------------------------------------------------------------------
+    # Persistence
+    # ------------------------------------------------------------------
+
+    def persist(self, persist_path: str, fs=None) -> None:
+        """
+        Write the index to a directory: index.faiss, nodes.jsonl, store.json.
+
+        Deleted rows are kept (as null) so FAISS ids still line up.
+        """
+        import faiss
+
+        os.makedirs(persist_path, exist_ok=True)
+        with self._lock:
+            if self._index is not None:
+                faiss.write_index(self._index, os.path.join(persist_path, "index.faiss"))
+            with open(os.path.join(persist_path, "nodes.jsonl"), "w") as f:
+                for node in self._table.nodes:
+                    record = None if node is None else node_to_metadata_dict(
+                        node, remove_text=False, flat_metadata=False
+                    )
+                    f.write(json.dumps(record) + "\n")
+            settings = self.model_dump(include={"index_type", "nlist", "nprobe", "ef_search",
+                                              "refine_k_factor", "train_sample"})
+            with open(os.path.join(persist_path, "store.json"), "w") as f:
+                json.dump({**settings, "deleted": sorted(self._deleted)}, f)
+
+    @classmethod
+    def from_persist_dir(cls, persist_dir: str) -> "FaissVectorStore":
+        import faiss
+
+        with open(os.path.join(persist_dir, "store.json")) as f:
+            settings = json.load(f)
+        deleted = settings.pop("deleted")
+        store = cls(**settings)
+
+        index_path = os.path.join(persist_dir, "index.faiss")
+        if os.path.exists(index_path):
+            store._index = faiss.read_index(index_path)
+        with open(os.path.join(persist_dir, "nodes.jsonl")) as f:
+            store._table.append([
+                None if record is None else metadata_dict_to_node(record)
+                for record in map(json.loads, f)
+            ])
+        store._metadata.add(store._table.nodes)
+        store._deleted = set(deleted)
+        return store
+
+
+# ============================================================================
+# Recall vs. Latency
+# ============================================================================
+
+DEFAULT_REPORT_SETTINGS = [
+    {"index_type": "ivfpq", "nprobe": [1, 4, 16, 64]},
+    {"index_type": "hnsw", "ef_search": [16, 32, 64, 128]},
+]
+
+
+def recall_latency_report(vectors: np.ndarray, queries: np.ndarray, k: int = 10,
+                          settings: Sequence[dict] = DEFAULT_REPORT_SETTINGS) -> List[Dict[str, Any]]:
+    """
+    Build each index over vectors and measure recall@k against exact search.
+
+    settings: dicts with index_type and one list of values to sweep
+    ("nprobe" for ivfpq, "ef_search" for hnsw); other keys (nlist, pq_m,
+    hnsw_m, ...) are passed to create_faiss_index(). Returns one row per
+    (index_type, parameter value) with build time, latency and recall.
+    """
+    vectors = normalize_rows(np.array(vectors, dtype=np.float32))
+    queries = normalize_rows(np.array(queries, dtype=np.float32, ndmin=2))
+    dim = vectors.shape[1]
+
+    def timed_search(index, params=None):
+        start = time.perf_counter()
+        _, rows = index.search(queries, k, params=params)
+        return rows, (time.perf_counter() - start) / len(queries)
+
+    start = time.perf_counter()
+    exact = create_faiss_index(dim, "flat")
+    exact.add(vectors)
+    exact_build = time.perf_counter() - start
+    truth, latency = timed_search(exact)
+    report = [{"index_type": "flat", "parameter": "exact", "build_seconds": exact_build,
+               "ms_per_query": latency * 1000, "recall": 1.0}]
+
+    for setting in settings:
+        setting = dict(setting)
+        index_type = setting.pop("index_type")
+        sweep_key = "nprobe" if index_type == "ivfpq" else "ef_search"
+        sweep = setting.pop(sweep_key, [config.FAISS_NPROBE if sweep_key == "nprobe" else config.FAISS_EF_SEARCH])
+
+        start = time.perf_counter()
+        index = create_faiss_index(dim, index_type, num_vectors=len(vectors), **setting)
+        train_on_sample(index, vectors)
+        index.add(vectors)
+        build = time.perf_counter() - start
+
+        for value in sweep:
+            params = search_parameters(index, nprobe=value, ef_search=value)
+            rows, latency = timed_search(index, params)
+            hits = sum(len(set(found) & set(expected)) for found, expected in zip(rows, truth))
+            report.append({"index_type": index_type, "parameter": f"{sweep_key}={value}",
+                           "build_seconds": build, "ms_per_query": latency * 1000,
+                           "recall": hits / (k * len(queries))})
+    return report
+
+
+def print_recall_report(report: Sequence[Dict[str, Any]], k: int = 10) -> None:
+    """Print recall_latency_report() rows as a table."""
+    print(f"{'index':6s} {'parameter':14s} {'build':>8s} {'ms/query':>9s} {f'recall@{k}':>10s}")
+    for row in report:
+        print(f"{row['index_type']:6s} {row['parameter']:14s} {row['build_seconds']:7.2f}s "
+              f"{row['ms_per_query']:9.3f} {row['recall']:10.3f}")
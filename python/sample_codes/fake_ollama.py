@@ -0,0 +1,401 @@
+"""
+Fake Ollama Server
+Offline stand-in for the Ollama HTTP API
+
+Implements the endpoints the sample code uses - /api/tags, /api/generate,
+/api/chat, /api/embeddings and /api/embed - with configurable
+time-to-first-token distributions, token rates and deterministic output.
+Responses and embeddings depend only on the request (and seed), so runs are
+reproducible and framework overhead can be measured apart from inference.
+
+Usage (separate process):
+    python fake_ollama.py --port 11435 --ttft 0.2 --tokens-per-second 50
+    OLLAMA_BASE_URL=http://localhost:11435 python unit_04_langgraph_intro.py
+
+Usage (in process):
+    with FakeOllamaServer(ttft=0.05) as server:
+        config.OLLAMA_BASE_URL = server.url
+        ...
+"""
+
+import argparse
+import hashlib
+import json
+import math
+import random
+import struct
+import threading
+import time
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import config
+
+_VOCABULARY = (
+    "the agent model data graph state node tool memory answer question plan "
+    "result context vector index query response language system step task "
+    "information learning retrieval document search user value process output"
+).split()
+
+
+# ============================================================================
+# Latency Model
+# ============================================================================
+
+class LatencyModel:
+    """
+    Distribution of time-to-first-token in seconds.
+
+    kind is one of:
+      - "fixed":     always mean
+      - "uniform":   uniform in [mean - jitter, mean + jitter]
+      - "normal":    gaussian(mean, jitter), clipped at 0
+      - "lognormal": median mean, sigma jitter (long right tail)
+    """
+
+    KINDS = ("fixed", "uniform", "normal", "lognormal")
+
+    def __init__(self, kind: str = "fixed", mean: float = 0.0, jitter: float = 0.0):
+        if kind not in self.KINDS:
+            raise ValueError(f"Unknown latency distribution {kind!r}; expected one of {self.KINDS}")
+        self.kind = kind
+        self.mean = mean
+        self.jitter = jitter
+
+    def sample(self, rng: random.Random) -> float:
+        if self.kind == "fixed" or self.mean <= 0:
+            return max(self.mean, 0.0)
+        if self.kind == "uniform":
+            return max(rng.uniform(self.mean - self.jitter, self.mean + self.jitter), 0.0)
+        if self.kind == "normal":
+            return max(rng.gauss(self.mean, self.jitter), 0.0)
+        return rng.lognormvariate(math.log(self.mean), self.jitter)
+
+
+# ============================================================================
+# Deterministic Content
+# ============================================================================
+
+def deterministic_embedding(text: str, dimension: int, model: str = "") -> list:
+    """Unit-length pseudo-random vector derived from (model, text)."""
+    values = []
+    counter = 0
+    while len(values) < dimension:
+        block = hashlib.sha256(f"{model}\0{counter}\0{text}".encode("utf-8")).digest()
+        # 8 signed 32-bit ints per digest, scaled to [-1, 1)
+        values.extend(v / 2**31 for v in struct.unpack("<8i", block))
+        counter += 1
+    values = values[:dimension]
+    norm = math.sqrt(sum(v * v for v in values)) or 1.0
+    return [v / norm for v in values]
+
+
+def _now() -> str:
+    return datetime.now(timezone.utc).isoformat()
+
+
+def _count_tokens(text: str) -> int:
+    return max(len(text.split()), 1)
+
+
+# ============================================================================
+# HTTP Handler
+# ============================================================================
+
+class _FakeOllamaHandler(BaseHTTPRequestHandler):
+    server_version = "FakeOllama/1.0"
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):
+        if self.server.settings["verbose"]:
+            super().log_message(format, *args)
+
+    # -- helpers -------------------------------------------------------------
+
+    def _read_json(self) -> dict:
+        length = int(self.headers.get("Content-Length") or 0)
+        return json.loads(self.rfile.read(length) or b"{}")
+
+    def _send_json(self, payload: dict, status: int = 200) -> None:
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _start_stream(self) -> None:
+        self.send_response(200)
+        self.send_header("Content-Type", "application/x-ndjson")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+
+    def _write_chunk(self, payload: dict) -> None:
+        data = json.dumps(payload).encode("utf-8") + b"\n"
+        self.wfile.write(f"{len(data):X}\r\n".encode("ascii") + data + b"\r\n")
+        self.wfile.flush()
+
+    def _end_stream(self) -> None:
+        self.wfile.write(b"0\r\n\r\n")
+        self.wfile.flush()
+
+    # -- routing -------------------------------------------------------------
+
+    def do_GET(self):
+        if self.path.rstrip("/") == "/api/tags":
+            self._send_json({"models": [self._model_info(name) for name in self.server.settings["models"]]})
+        elif self.path.rstrip("/") in ("", "/"):
+            body = b"Ollama is running"
+            self.send_response(200)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+        else:
+            self._send_json({"error": f"not found: {self.path}"}, status=404)
+
+    def do_HEAD(self):
+        self.send_response(200)
+        self.send_header("Content-Length", "0")
+        self.end_headers()
+
+    def do_POST(self):
+        routes = {
+            "/api/generate": self._handle_generate,
+            "/api/chat": self._handle_chat,
+            "/api/embeddings": self._handle_embeddings,
+            "/api/embed": self._handle_embed,
+            "/api/show": self._handle_show,
+        }
+        handler = routes.get(self.path.rstrip("/"))
+        if handler is None:
+            self._send_json({"error": f"not found: {self.path}"}, status=404)
+            return
+        try:
+            handler(self._read_json())
+        except (BrokenPipeError, ConnectionResetError):
+            pass  # Client went away mid-stream
+
+    # -- endpoints -----------------------------------------------------------
+
+    def _model_info(self, name: str) -> dict:
+        return {
+            "name": name,
+            "model": name,
+            "modified_at": _now(),
+            "size": 4 * 1024 ** 3,
+            "digest": hashlib.sha256(name.encode("utf-8")).hexdigest(),
+            "details": {"format": "gguf", "family": "fake", "parameter_size": "8B",
+                        "quantization_level": "Q4_0"},
+        }
+
+    def _handle_show(self, request: dict) -> None:
+        name = request.get("model") or request.get("name", "")
+        self._send_json({"modelfile": "", "parameters": "", "template": "",
+                         "details": self._model_info(name)["details"], "model_info": {}})
+
+    def _handle_generate(self, request: dict) -> None:
+        self._complete(request, request.get("prompt", ""), chat=False)
+
+    def _handle_chat(self, request: dict) -> None:
+        prompt = "\n".join(str(m.get("content", "")) for m in request.get("messages", []))
+        self._complete(request, prompt, chat=True)
+
+    def _handle_embeddings(self, request: dict) -> None:
+        model = request.get("model", "")
+        text = request.get("prompt", "")
+        self._send_json({"embedding": self.server.embed(model, text)})
+
+    def _handle_embed(self, request: dict) -> None:
+        model = request.get("model", "")
+        inputs = request.get("input", "")
+        inputs = [inputs] if isinstance(inputs, str) else inputs
+        self._send_json({
+            "model": model,
+            "embeddings": [self.server.embed(model, text) for text in inputs],
+            "prompt_eval_count": sum(_count_tokens(text) for text in inputs),
+        })
+
+    def _complete(self, request: dict, prompt: str, chat: bool) -> None:
+        """Generate a deterministic response, streamed token by token by default."""
+        settings = self.server.settings
+        model = request.get("model", "")
+        options = request.get("options") or {}
+        stream = request.get("stream", True)
+
+        # keep_alive=0 with no prompt is how clients unload a model
+        if not prompt and request.get("keep_alive") in (0, "0"):
+            self._send_json({"model": model, "created_at": _now(), "response": "",
+                             "done": True, "done_reason": "unload"})
+            return
+
+        rng = self.server.request_rng(model, prompt)
+        ttft = settings["latency"].sample(rng)
+        num_tokens = int(options.get("num_predict") or 0)
+        if num_tokens <= 0:
+            num_tokens = settings["response_tokens"]
+        tokens = [rng.choice(_VOCABULARY) + " " for _ in range(num_tokens)]
+        token_interval = 1.0 / settings["tokens_per_second"] if settings["tokens_per_second"] > 0 else 0.0
+
+        def message(content):
+            if chat:
+                return {"message": {"role": "assistant", "content": content}}
+            return {"response": content}
+
+        start = time.perf_counter()
+        time.sleep(ttft)
+
+        if stream:
+            self._start_stream()
+            for i, token in enumerate(tokens):
+                if i:
+                    time.sleep(token_interval)
+                self._write_chunk({"model": model, "created_at": _now(), **message(token), "done": False})
+        else:
+            time.sleep(token_interval * max(num_tokens - 1, 0))
+
+        total = time.perf_counter() - start
+        final = {
+            "model": model,
+            "created_at": _now(),
+            **message("" if stream else "".join(tokens)),
+            "done": True,
+            "done_reason": "stop",
+            "total_duration": int(total * 1e9),
+            "load_duration": 0,
+            "prompt_eval_count": _count_tokens(prompt),
+            "prompt_eval_duration": int(ttft * 1e9),
+            "eval_count": num_tokens,
+            "eval_duration": int((total - ttft) * 1e9),
+        }
+        if not chat:
+            final["context"] = []
+
+        if stream:
+            self._write_chunk(final)
+            self._end_stream()
+        else:
+            self._send_json(final)
+
+
+# ============================================================================
+# Server
+# ============================================================================
+
+class FakeOllamaServer(ThreadingHTTPServer):
+    """
+    Threaded fake Ollama server. Use start()/stop() or as a context manager.
+
+    Args:
+        host, port: bind address (port 0 picks a free port)
+        ttft: mean time-to-first-token in seconds
+        ttft_jitter: spread of the distribution (see LatencyModel)
+        distribution: "fixed", "uniform", "normal" or "lognormal"
+        tokens_per_second: generation speed after the first token (0 = instant)
+        response_tokens: tokens per response unless options.num_predict is set
+        embedding_dim: length of returned embedding vectors
+        models: names reported by /api/tags
+        seed: changes every latency sample and generated response
+    """
+
+    daemon_threads = True
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0, ttft: float = 0.0,
+                 ttft_jitter: float = 0.0, distribution: str = "fixed",
+                 tokens_per_second: float = 0.0, response_tokens: int = 32,
+                 embedding_dim: int = 768, models=None, seed: int = 0,
+                 verbose: bool = False):
+        super().__init__((host, port), _FakeOllamaHandler)
+        self.settings = {
+            "latency": LatencyModel(distribution, ttft, ttft_jitter),
+            "tokens_per_second": tokens_per_second,
+            "response_tokens": response_tokens,
+            "embedding_dim": embedding_dim,
+            "models": list(models or [config.PRIMARY_LLM_MODEL, config.ALTERNATIVE_LLM_MODEL,
+                                      config.EMBEDDING_MODEL] + config.COMPARISON_MODELS),
+            "seed": seed,
+            "verbose": verbose,
+        }
+        self._counts = {}
+        self._counts_lock = threading.Lock()
+        self._thread = None
+
+    @property
+    def url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def request_rng(self, model: str, prompt: str) -> random.Random:
+        """
+        RNG for one request, seeded by (seed, model, prompt, occurrence).
+
+        Repeating a prompt gives a new - but reproducible - sample each time.
+        """
+        key = (model, prompt)
+        with self._counts_lock:
+            occurrence = self._counts.get(key, 0)
+            self._counts[key] = occurrence + 1
+        digest = hashlib.sha256(
+            f"{self.settings['seed']}\0{model}\0{occurrence}\0{prompt}".encode("utf-8")
+        ).digest()
+        return random.Random(int.from_bytes(digest[:8], "little"))
+
+    def embed(self, model: str, text: str) -> list:
+        return deterministic_embedding(text, self.settings["embedding_dim"], model)
+
+    def start(self) -> "FakeOllamaServer":
+        """Serve on a background thread."""
+        self._thread = threading.Thread(target=self.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self.shutdown()
+        self.server_close()
+        if self._thread is not None:
+            self._thread.join()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+# ============================================================================
+# Command line
+# ============================================================================
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run a fake Ollama server for offline runs")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=11435)
+    parser.add_argument("--ttft", type=float, default=0.1, help="Mean time-to-first-token (s)")
+    parser.add_argument("--ttft-jitter", type=float, default=0.0)
+    parser.add_argument("--distribution", choices=LatencyModel.KINDS, default="fixed")
+    parser.add_argument("--tokens-per-second", type=float, default=50.0)
+    parser.add_argument("--response-tokens", type=int, default=32)
+    parser.add_argument("--embedding-dim", type=int, default=768)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--verbose", action="store_true")
+    args = parser.parse_args()
+
+    server = FakeOllamaServer(
+        host=args.host,
+        port=args.port,
+        ttft=args.ttft,
+        ttft_jitter=args.ttft_jitter,
+        distribution=args.distribution,
+        tokens_per_second=args.tokens_per_second,
+        response_tokens=args.response_tokens,
+        embedding_dim=args.embedding_dim,
+        seed=args.seed,
+        verbose=args.verbose
+    )
+    print(f"Fake Ollama listening on {server.url}")
+    print(f"Run examples with: OLLAMA_BASE_URL={server.url} python <unit file>")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
@@ -0,0 +1,374 @@
+"""
+LangGraph Utilities
+Shared helpers used by the Unit 4 and Unit 5 examples
+
+- Concurrent execution: runs many inputs through a compiled graph at once.
+  Nodes written as async functions (awaiting llm.ainvoke) release the event
+  loop while they wait on the LLM, so one process can keep hundreds of graph
+  runs in flight instead of serving one request at a time. @graph_node lets
+  the same async node also run under a plain app.invoke().
+- Checkpointing: persists each node's output so an interrupted or crashed
+  run resumes from the last completed node instead of starting over.
+- Profiling: a callback handler that records, per node execution, wall
+  time, LLM calls, prompt/completion tokens and state size, and prints a
+  flame-graph-style breakdown of where a run spent its time.
+
+Usage:
+    @graph_node
+    async def answer_node(state):
+        return {"answer": (await llm.ainvoke(state["question"])).content}
+
+    results = run_graphs(app, inputs, max_concurrency=50)
+
+    with get_checkpointer() as checkpointer:
+        app = workflow.compile(checkpointer=checkpointer)
+        result = run_resumable(app, graph_input, thread_id="job-42")
+
+    profiler = GraphProfiler()
+    result = profiler.attach(app).invoke(graph_input)
+    profiler.print_report()
+"""
+
+import asyncio
+import json
+import os
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+from uuid import UUID
+
+from langchain_core.callbacks import BaseCallbackHandler
+from langchain_core.runnables import RunnableLambda
+
+import config
+
+# ============================================================================
+# Concurrent Graph Execution
+# ============================================================================
+
+def graph_node(afunc) -> RunnableLambda:
+    """
+    Decorator making an async node usable from both app.invoke() and app.ainvoke().
+
+    Each node is written once, awaiting llm.ainvoke(). Under ainvoke()
+    (e.g. run_graphs) it is awaited on the caller's loop; under invoke()
+    it runs on config.run_async()'s shared loop. Call a decorated node
+    directly with node.invoke(state) or await node.ainvoke(state).
+    """
+    def run_sync(state):
+        return config.run_async(afunc(state))
+
+    return RunnableLambda(run_sync, afunc=afunc, name=afunc.__name__)
+
+
+async def run_graphs_concurrently(app, inputs: Sequence[dict],
+                                  max_concurrency: int = config.GRAPH_MAX_CONCURRENCY,
+                                  run_configs: Optional[Sequence[dict]] = None,
+                                  return_exceptions: bool = True) -> List[Any]:
+    """
+    Run app.ainvoke() over every input with at most max_concurrency in flight.
+
+    Results come back in input order. With return_exceptions=True a failed
+    run yields its exception instead of cancelling the others.
+    """
+    semaphore = asyncio.Semaphore(max_concurrency)
+
+    async def run_one(index: int, graph_input: dict):
+        run_config = run_configs[index] if run_configs else None
+        async with semaphore:
+            return await app.ainvoke(graph_input, config=run_config)
+
+    return await asyncio.gather(
+        *(run_one(i, graph_input) for i, graph_input in enumerate(inputs)),
+        return_exceptions=return_exceptions
+    )
+
+
+def run_graphs(app, inputs: Sequence[dict],
+               max_concurrency: int = config.GRAPH_MAX_CONCURRENCY,
+               run_configs: Optional[Sequence[dict]] = None,
+               return_exceptions: bool = True) -> List[Any]:
+    """
+    Synchronous entry point for run_graphs_concurrently().
+
+    Runs on config.run_async()'s shared event loop rather than a new one
+    per call, so nodes using the registry's cached clients keep working
+    across repeated calls in the same process.
+    """
+    return config.run_async(run_graphs_concurrently(
+        app,
+        inputs,
+        max_concurrency=max_concurrency,
+        run_configs=run_configs,
+        return_exceptions=return_exceptions
+    ))
+
+
+# ============================================================================
+# Checkpointing and Resumable Runs
+# ============================================================================
+
+@contextmanager
+def get_checkpointer(kind: str = "sqlite", path: Optional[str] = None):
+    """
+    Context manager yielding a checkpointer for workflow.compile(checkpointer=...).
+
+    kind="sqlite" (default) persists to path (config.CHECKPOINT_DB by
+    default) and survives process restarts; its connection is closed when
+    the block exits. kind="memory" keeps checkpoints for the lifetime of
+    the checkpointer only. Any other LangGraph checkpoint saver can be
+    passed to compile() directly.
+    """
+    if kind == "memory":
+        from langgraph.checkpoint.memory import MemorySaver
+        yield MemorySaver()
+        return
+    if kind != "sqlite":
+        raise ValueError(f"Unknown checkpointer kind {kind!r}; expected 'sqlite' or 'memory'")
+
+    from langgraph.checkpoint.sqlite import SqliteSaver
+
+    path = path or config.CHECKPOINT_DB
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    conn = sqlite3.connect(path, check_same_thread=False)
+    try:
+        yield SqliteSaver(conn)
+    finally:
+        conn.close()
+
+
+def run_resumable(app, graph_input: dict, thread_id: str, cleanup: bool = False):
+    """
+    Invoke a checkpointed graph, resuming thread_id if it did not finish.
+
+    If the last checkpoint for thread_id still has nodes to run (the process
+    crashed, a node raised, or the run was interrupted), execution continues
+    from there and completed nodes are not re-run. Otherwise graph_input
+    starts a fresh run on the thread. With cleanup=True the thread's
+    checkpoints are deleted once the run completes, so a fixed thread_id
+    can be reused without the checkpoint database growing.
+    """
+    run_config = {"configurable": {"thread_id": thread_id}}
+    snapshot = app.get_state(run_config)
+    result = app.invoke(None if snapshot.next else graph_input, config=run_config)
+    if cleanup:
+        app.checkpointer.delete_thread(thread_id)
+    return result
+
+
+# ============================================================================
+# Per-Node Profiling
+# ============================================================================
+
+def _state_bytes(state: Any) -> int:
+    """Size of a state (or state update) serialized as JSON."""
+    try:
+        return len(json.dumps(state, default=str).encode("utf-8"))
+    except (TypeError, ValueError):
+        return len(repr(state).encode("utf-8"))
+
+
+def _token_usage(response) -> Tuple[int, int]:
+    """(prompt, completion) tokens from an LLMResult, chat or completion model."""
+    prompt_tokens = completion_tokens = 0
+    for generations in response.generations:
+        for generation in generations:
+            usage = getattr(getattr(generation, "message", None), "usage_metadata", None)
+            if usage:
+                prompt_tokens += usage.get("input_tokens") or 0
+                completion_tokens += usage.get("output_tokens") or 0
+                continue
+            # OllamaLLM reports Ollama's own counters in generation_info
+            info = generation.generation_info or {}
+            prompt_tokens += info.get("prompt_eval_count") or 0
+            completion_tokens += info.get("eval_count") or 0
+    return prompt_tokens, completion_tokens
+
+
+class GraphProfiler(BaseCallbackHandler):
+    """
+    Callback handler that profiles every node execution of a compiled graph.
+
+    Attach it with profiler.attach(app) or pass it in
+    config={"callbacks": [profiler]}. LLM calls made inside a node are
+    attributed to that node through the callback run tree, so no node code
+    has to change. Works for sync and async runs, including parallel
+    branches. Each finished node execution is appended to self.steps:
+
+        node, step, wall_time, llm_calls, llm_time, prompt_tokens,
+        completion_tokens, state_bytes (state passed in), update_bytes
+        (what the node returned), started_at (perf_counter), error
+    """
+
+    run_inline = True  # Record timestamps on the calling thread, not an executor
+
+    def __init__(self):
+        self.steps: List[dict] = []
+        self.graph_time = 0.0
+        self.unattributed = {"llm_calls": 0, "llm_time": 0.0,
+                             "prompt_tokens": 0, "completion_tokens": 0}
+        self._lock = threading.Lock()
+        self._parents: Dict[UUID, UUID] = {}
+        self._graph_runs: Dict[UUID, float] = {}
+        self._node_runs: Dict[UUID, dict] = {}
+        self._llm_runs: Dict[UUID, Tuple[Optional[dict], float]] = {}
+
+    def attach(self, app):
+        """Return app bound to this profiler; invoke/stream it as usual."""
+        return app.with_config(callbacks=[self])
+
+    def reset(self) -> None:
+        with self._lock:
+            self.steps.clear()
+            self.graph_time = 0.0
+            for key in self.unattributed:
+                self.unattributed[key] = 0
+
+    # ------------------------------------------------------------------
+    # Callbacks
+    # ------------------------------------------------------------------
+
+    def on_chain_start(self, serialized, inputs, *, run_id: UUID,
+                       parent_run_id: Optional[UUID] = None, metadata: Optional[dict] = None,
+                       **kwargs: Any) -> None:
+        now = time.perf_counter()
+        metadata = metadata or {}
+        node = metadata.get("langgraph_node")
+        with self._lock:
+            if parent_run_id is None:
+                self._graph_runs[run_id] = now
+                return
+            self._parents[run_id] = parent_run_id
+            # Runnables inside a node share its metadata; the node run itself carries its name
+            if node is not None and kwargs.get("name") == node:
+                self._node_runs[run_id] = {
+                    "node": node,
+                    "step": metadata.get("langgraph_step"),
+                    "start": now,
+                    "llm_calls": 0,
+                    "llm_time": 0.0,
+                    "prompt_tokens": 0,
+                    "completion_tokens": 0,
+                    "state_bytes": _state_bytes(inputs),
+                }
+
+    def _finish_chain(self, run_id: UUID, outputs: Any = None, error: Optional[str] = None) -> None:
+        now = time.perf_counter()
+        with self._lock:
+            self._parents.pop(run_id, None)
+            start = self._graph_runs.pop(run_id, None)
+            if start is not None:
+                self.graph_time += now - start
+                return
+            record = self._node_runs.pop(run_id, None)
+            if record is None:
+                return
+            start = record.pop("start")
+            record["wall_time"] = now - start
+            record["started_at"] = start
+            record["update_bytes"] = _state_bytes(outputs) if outputs is not None else 0
+            record["error"] = error
+            self.steps.append(record)
+
+    def on_chain_end(self, outputs, *, run_id: UUID, **kwargs: Any) -> None:
+        self._finish_chain(run_id, outputs=outputs)
+
+    def on_chain_error(self, error: BaseException, *, run_id: UUID, **kwargs: Any) -> None:
+        self._finish_chain(run_id, error=f"{type(error).__name__}: {error}")
+
+    def _node_for(self, run_id: Optional[UUID]) -> Optional[dict]:
+        """Walk up the run tree to the enclosing node execution."""
+        while run_id is not None:
+            record = self._node_runs.get(run_id)
+            if record is not None:
+                return record
+            run_id = self._parents.get(run_id)
+        return None
+
+    def _start_llm(self, run_id: UUID, parent_run_id: Optional[UUID]) -> None:
+        with self._lock:
+            self._llm_runs[run_id] = (self._node_for(parent_run_id), time.perf_counter())
+
+    def on_llm_start(self, serialized, prompts, *, run_id: UUID,
+                     parent_run_id: Optional[UUID] = None, **kwargs: Any) -> None:
+        self._start_llm(run_id, parent_run_id)
+
+    def on_chat_model_start(self, serialized, messages, *, run_id: UUID,
+                            parent_run_id: Optional[UUID] = None, **kwargs: Any) -> None:
+        self._start_llm(run_id, parent_run_id)
+
+    def _finish_llm(self, run_id: UUID, response=None) -> None:
+        now = time.perf_counter()
+        prompt_tokens, completion_tokens = _token_usage(response) if response is not None else (0, 0)
+        with self._lock:
+            entry = self._llm_runs.pop(run_id, None)
+            if entry is None:
+                return
+            record, start = entry
+            target = record if record is not None else self.unattributed
+            target["llm_calls"] += 1
+            target["llm_time"] += now - start
+            target["prompt_tokens"] += prompt_tokens
+            target["completion_tokens"] += completion_tokens
+
+    def on_llm_end(self, response, *, run_id: UUID, **kwargs: Any) -> None:
+        self._finish_llm(run_id, response)
+
+    def on_llm_error(self, error: BaseException, *, run_id: UUID, **kwargs: Any) -> None:
+        self._finish_llm(run_id)
+
+    # ------------------------------------------------------------------
+    # Reporting
+    # ------------------------------------------------------------------
+
+    def summary(self) -> List[dict]:
+        """One row per node (in first-run order) aggregated over its executions."""
+        with self._lock:
+            steps = sorted(self.steps, key=lambda record: record["started_at"])
+        rows: Dict[str, dict] = {}
+        for record in steps:
+            row = rows.setdefault(record["node"], {
+                "node": record["node"], "runs": 0, "errors": 0, "wall_time": 0.0,
+                "llm_calls": 0, "llm_time": 0.0, "prompt_tokens": 0,
+                "completion_tokens": 0, "max_state_bytes": 0, "update_bytes": 0,
+            })
+            row["runs"] += 1
+            row["errors"] += record["error"] is not None
+            for key in ("wall_time", "llm_calls", "llm_time", "prompt_tokens",
+                        "completion_tokens", "update_bytes"):
+                row[key] += record[key]
+            row["max_state_bytes"] = max(row["max_state_bytes"], record["state_bytes"])
+        return list(rows.values())
+
+    def print_report(self, width: int = 30) -> None:
+        """
+        Flame-graph-style breakdown: the run, each node, and the LLM share of it.
+
+        Bar lengths are proportional to total graph time; parallel branches
+        overlap, so node times can add up to more than 100%.
+        """
+        rows = self.summary()
+        total = self.graph_time or sum(row["wall_time"] for row in rows) or 1.0
+
+        def bar(seconds: float) -> str:
+            return "█" * max(1, round(width * seconds / total)) if seconds > 0 else ""
+
+        print(f"{'frame':28s} {'runs':>4s} {'time':>8s} {'share':>6s}  "
+              f"{'llm':>3s} {'tok in/out':>11s} {'state':>8s}")
+        print(f"{'graph':28s} {'':>4s} {total:7.2f}s {100.0:5.1f}%  {'':3s} {'':11s} {'':8s} {bar(total)}")
+        for row in rows:
+            tokens = f"{row['prompt_tokens']}/{row['completion_tokens']}"
+            print(f"  {row['node'][:26]:26s} {row['runs']:4d} {row['wall_time']:7.2f}s "
+                  f"{100 * row['wall_time'] / total:5.1f}%  {row['llm_calls']:3d} {tokens:>11s} "
+                  f"{row['max_state_bytes']:7d}B {bar(row['wall_time'])}")
+            if row["llm_calls"]:
+                print(f"    {'llm':24s} {row['llm_calls']:4d} {row['llm_time']:7.2f}s "
+                      f"{100 * row['llm_time'] / total:5.1f}%  {'':3s} {'':11s} {'':8s} "
+                      f"{bar(row['llm_time'])}")
+        if self.unattributed["llm_calls"]:
+            print(f"  {'(llm outside nodes)':26s} {self.unattributed['llm_calls']:4d} "
+                  f"{self.unattributed['llm_time']:7.2f}s")
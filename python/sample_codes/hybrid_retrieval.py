@@ -0,0 +1,335 @@
+"""
+Hybrid BM25 + Vector Retrieval
+Shared helper used by the Unit 6 RAG examples
+
+Dense retrieval needs an embedding call for every query and is weak at
+exact identifiers (error codes, SKUs, function names). BM25Index is an
+in-process inverted index over node text, built once at index time and
+persisted with its postings. HybridRetriever fuses its results with the
+vector retriever's by reciprocal rank fusion (RRF), and answers queries
+that name an indexed identifier from the keyword index alone, without
+touching the embedding model.
+
+Usage:
+    index = VectorStoreIndex.from_documents(documents)
+    bm25 = BM25Index.from_nodes(index.docstore.docs.values())
+    bm25.persist("storage/bm25.json")
+
+    retriever = HybridRetriever.from_index(index, bm25, similarity_top_k=2)
+    query_engine = RetrieverQueryEngine.from_args(retriever, response_mode="compact")
+"""
+
+import json
+import math
+import os
+import re
+import threading
+from collections import Counter
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+from llama_index.core.retrievers import BaseRetriever
+from llama_index.core.schema import BaseNode, NodeWithScore, QueryBundle
+from llama_index.core.vector_stores.types import MetadataFilters
+from llama_index.core.vector_stores.utils import metadata_dict_to_node, node_to_metadata_dict
+
+import config
+from metadata_index import MetadataIndex
+from numpy_vector_store import NodeTable, top_k_rows
+
+_FORMAT_VERSION = 1
+_TOKEN_RE = re.compile(r"\w+(?:[-./:]\w+)*")
+_SEPARATOR_RE = re.compile(r"[-./:_]")
+_PATH_SEPARATOR_RE = re.compile(r"[.:]+")
+RETRIEVAL_MODES = ("auto", "hybrid", "keyword", "vector")
+
+
+def tokenize(text: str) -> List[str]:
+    """
+    Lower-cased word tokens for BM25.
+
+    Compound identifiers are kept whole and also split into their parts,
+    so "ERR-4012" matches queries for "err-4012" as well as "4012".
+    """
+    tokens = []
+    for token in _TOKEN_RE.findall(text.lower()):
+        tokens.append(token)
+        parts = [part for part in _SEPARATOR_RE.split(token) if part]
+        if len(parts) > 1:
+            tokens.extend(parts)
+    return tokens
+
+
+def is_identifier(token: str) -> bool:
+    """
+    Whether a token looks like a code/ID rather than a word.
+
+    That means letters mixed with digits ("err-4012", "v2"), or a code
+    shape: an underscore ("max_retries") or a dotted path whose parts are
+    at least two characters ("config.py", "os.path"). Hyphens and slashes
+    alone are ordinary prose ("real-time", "and/or"), as is "e.g".
+    """
+    if any(c.isdigit() for c in token) and any(c.isalpha() for c in token):
+        return True
+    if "_" in token and any(c.isalnum() for c in token):
+        return True
+    parts = _PATH_SEPARATOR_RE.split(token)
+    return len(parts) > 1 and all(len(part) >= 2 for part in parts)
+
+
+# ============================================================================
+# BM25 Inverted Index
+# ============================================================================
+
+class BM25Index:
+    """
+    Okapi BM25 over node text with per-term postings.
+
+    A query touches only the postings of its own terms, accumulated into
+    one score array with NumPy. Removed nodes are masked, not re-indexed.
+    Metadata filters restrict the rows scored, as in NumpyVectorStore.
+    """
+
+    def __init__(self, k1: float = config.BM25_K1, b: float = config.BM25_B):
+        self.k1 = k1
+        self.b = b
+        self.postings: Dict[str, Tuple[List[int], List[int]]] = {}  # term -> (rows, term counts)
+        self.doc_lengths: List[int] = []
+        self._table = NodeTable()
+        self._metadata = MetadataIndex()
+        self._total_length = 0
+        self._arrays: Dict[str, Tuple[np.ndarray, np.ndarray]] = {}
+        self._length_array: Optional[np.ndarray] = None
+        self._alive_array: Optional[np.ndarray] = None
+        self._lock = threading.RLock()
+
+    @classmethod
+    def from_nodes(cls, nodes: Iterable[BaseNode], **kwargs) -> "BM25Index":
+        index = cls(**kwargs)
+        index.add(list(nodes))
+        return index
+
+    @property
+    def num_nodes(self) -> int:
+        return len(self._table.row_by_id)
+
+    def has_term(self, term: str) -> bool:
+        return term in self.postings
+
+    def _invalidate(self, terms: Iterable[str] = ()) -> None:
+        for term in terms:
+            self._arrays.pop(term, None)
+        self._length_array = self._alive_array = None
+
+    def add(self, nodes: Sequence[BaseNode]) -> None:
+        """Index nodes; a node whose id is already indexed is replaced."""
+        with self._lock:
+            self.remove([node.node_id for node in nodes])
+            touched = set()
+            for node in nodes:
+                row = len(self.doc_lengths)
+                counts = Counter(tokenize(node.get_content()))
+                for term, count in counts.items():
+                    rows, tfs = self.postings.setdefault(term, ([], []))
+                    rows.append(row)
+                    tfs.append(count)
+                touched.update(counts)
+                length = sum(counts.values())
+                self.doc_lengths.append(length)
+                self._total_length += length
+                self._table.append([node])
+            self._metadata.add(nodes)
+            self._invalidate(touched)
+
+    def remove(self, node_ids: Sequence[str]) -> None:
+        with self._lock:
+            rows = self._table.rows_for_node_ids(node_ids)
+            if not rows:
+                return
+            self._table.remove(rows)
+            for row in rows:
+                self._total_length -= self.doc_lengths[row]
+            self._invalidate()
+
+    def _term_arrays(self, term: str) -> Tuple[np.ndarray, np.ndarray]:
+        arrays = self._arrays.get(term)
+        if arrays is None:
+            rows, tfs = self.postings[term]
+            arrays = (np.array(rows, dtype=np.int64), np.array(tfs, dtype=np.float32))
+            self._arrays[term] = arrays
+        return arrays
+
+    def search(self, query: str, top_k: int,
+               filters: Optional[MetadataFilters] = None) -> List[Tuple[BaseNode, float]]:
+        """Top top_k (node, score) pairs with a positive BM25 score, best first."""
+        query_terms = Counter(term for term in tokenize(query) if term in self.postings)
+        with self._lock:
+            num_nodes = self.num_nodes
+            if not query_terms or num_nodes == 0:
+                return []
+            if self._length_array is None:
+                self._length_array = np.array(self.doc_lengths, dtype=np.float32)
+                self._alive_array = np.array([node is not None for node in self._table.nodes])
+            lengths, alive = self._length_array, self._alive_array
+            allowed = None if filters is None else alive & self._metadata.mask(filters, len(lengths))
+            postings = [(self._term_arrays(term), count) for term, count in query_terms.items()]
+            table = self._table
+            average_length = self._total_length / num_nodes
+
+        scores = np.zeros(len(lengths), dtype=np.float32)
+        norms = self.k1 * (1 - self.b + self.b * lengths / max(average_length, 1e-9))
+        for (rows, tfs), query_count in postings:
+            keep = alive[rows]
+            rows, tfs = rows[keep], tfs[keep]
+            # idf comes from the whole index; filters only decide which rows are scored
+            idf = math.log(1 + (num_nodes - len(rows) + 0.5) / (len(rows) + 0.5))
+            if allowed is not None:
+                keep = allowed[rows]
+                rows, tfs = rows[keep], tfs[keep]
+            if len(rows) == 0:
+                continue
+            scores[rows] += query_count * idf * tfs * (self.k1 + 1) / (tfs + norms[rows])
+
+        top = top_k_rows(scores[None, :], top_k)[0]
+        return [(table.get(row), float(scores[row])) for row in top if scores[row] > 0]
+
+    # ------------------------------------------------------------------
+    # Persistence
+    # ------------------------------------------------------------------
+
+    def persist(self, path: str) -> None:
+        """Write nodes and postings to one JSON file (atomically replaced)."""
+        with self._lock:
+            data = {
+                "format_version": _FORMAT_VERSION,
+                "k1": self.k1,
+                "b": self.b,
+                "doc_lengths": self.doc_lengths,
+                "postings": self.postings,
+                "nodes": [None if node is None else node_to_metadata_dict(
+                    node, remove_text=False, flat_metadata=False
+                ) for node in self._table.nodes],
+            }
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+            tmp_path = f"{path}.{os.getpid()}.tmp"
+            with open(tmp_path, "w") as f:
+                json.dump(data, f)
+            os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path: str) -> "BM25Index":
+        """Load a persisted index without re-tokenizing any text."""
+        with open(path) as f:
+            data = json.load(f)
+        if data.get("format_version") != _FORMAT_VERSION:
+            raise ValueError(f"Unsupported BM25 index format in {path}: {data.get('format_version')}")
+        index = cls(k1=data["k1"], b=data["b"])
+        index.doc_lengths = data["doc_lengths"]
+        index.postings = {term: (rows, tfs) for term, (rows, tfs) in data["postings"].items()}
+        index._table.append([None if record is None else metadata_dict_to_node(record)
+                             for record in data["nodes"]])
+        index._metadata.add(index._table.nodes)
+        index._total_length = sum(length for length, node in zip(index.doc_lengths, index._table.nodes)
+                                  if node is not None)
+        return index
+
+
+# ============================================================================
+# Fusion
+# ============================================================================
+
+def reciprocal_rank_fusion(result_lists: Sequence[Sequence[NodeWithScore]], k: int = config.RRF_K,
+                           top_n: Optional[int] = None) -> List[NodeWithScore]:
+    """
+    Merge ranked lists by RRF: each node scores sum(1 / (k + rank)).
+
+    Only ranks matter, so BM25 and cosine scores need no calibration.
+    """
+    scores: Dict[str, float] = {}
+    nodes: Dict[str, BaseNode] = {}
+    for results in result_lists:
+        for rank, result in enumerate(results, 1):
+            node_id = result.node.node_id
+            scores[node_id] = scores.get(node_id, 0.0) + 1.0 / (k + rank)
+            nodes.setdefault(node_id, result.node)
+    ranked = sorted(scores, key=scores.get, reverse=True)[:top_n]
+    return [NodeWithScore(node=nodes[node_id], score=scores[node_id]) for node_id in ranked]
+
+
+# ============================================================================
+# Retriever
+# ============================================================================
+
+class HybridRetriever(BaseRetriever):
+    """
+    Retriever fusing BM25 and vector results.
+
+    Modes:
+        hybrid:  both retrievers, fused with RRF
+        keyword: BM25 only (no embedding call)
+        vector:  vector retriever only
+        auto:    keyword when the query contains an identifier present in
+                 the index and BM25 finds it, hybrid otherwise
+
+    filters (MetadataFilters) restrict the BM25 side; from_index() passes
+    them to the vector retriever too. mode_counts records which path
+    answered each query.
+    """
+
+    def __init__(self, vector_retriever: BaseRetriever, bm25_index: BM25Index,
+                 similarity_top_k: int = 2, mode: str = config.HYBRID_MODE,
+                 candidate_k: Optional[int] = None, rrf_k: int = config.RRF_K,
+                 filters: Optional[MetadataFilters] = None, **kwargs):
+        if mode not in RETRIEVAL_MODES:
+            raise ValueError(f"mode must be one of {RETRIEVAL_MODES}, not {mode!r}")
+        super().__init__(**kwargs)
+        self.vector_retriever = vector_retriever
+        self.bm25_index = bm25_index
+        self.similarity_top_k = similarity_top_k
+        self.mode = mode
+        self.candidate_k = candidate_k or similarity_top_k * config.HYBRID_CANDIDATE_FACTOR
+        self.rrf_k = rrf_k
+        self.filters = filters
+        self.mode_counts: Dict[str, int] = {"keyword": 0, "hybrid": 0, "vector": 0}
+
+    @classmethod
+    def from_index(cls, index, bm25_index: Optional[BM25Index] = None, similarity_top_k: int = 2,
+                   **kwargs) -> "HybridRetriever":
+        """Hybrid retriever over a VectorStoreIndex (BM25 built from its docstore if not given)."""
+        if bm25_index is None:
+            bm25_index = BM25Index.from_nodes(index.docstore.docs.values())
+        candidate_k = kwargs.pop("candidate_k", None) or similarity_top_k * config.HYBRID_CANDIDATE_FACTOR
+        filters = kwargs.pop("filters", None)
+        return cls(index.as_retriever(similarity_top_k=candidate_k, filters=filters), bm25_index,
+                   similarity_top_k=similarity_top_k, candidate_k=candidate_k, filters=filters, **kwargs)
+
+    def _keyword(self, query_str: str, top_k: int) -> List[NodeWithScore]:
+        return [NodeWithScore(node=node, score=score)
+                for node, score in self.bm25_index.search(query_str, top_k, self.filters)]
+
+    def _is_exact_lookup(self, query_str: str) -> bool:
+        return any(is_identifier(term) and self.bm25_index.has_term(term)
+                   for term in tokenize(query_str))
+
+    def _retrieve(self, query_bundle: QueryBundle) -> List[NodeWithScore]:
+        query_str = query_bundle.query_str
+        mode = self.mode
+        if mode == "auto":
+            mode = "keyword" if self._is_exact_lookup(query_str) else "hybrid"
+
+        if mode == "keyword":
+            results = self._keyword(query_str, self.similarity_top_k)
+            # A keyword miss in auto mode falls through to the full hybrid search
+            if results or self.mode == "keyword":
+                self.mode_counts["keyword"] += 1
+                return results
+            mode = "hybrid"
+
+        self.mode_counts[mode] += 1
+        vector_results = self.vector_retriever.retrieve(query_bundle)
+        if mode == "vector":
+            return vector_results[:self.similarity_top_k]
+        return reciprocal_rank_fusion(
+            [self._keyword(query_str, self.candidate_k), vector_results],
+            k=self.rrf_k, top_n=self.similarity_top_k
+        )
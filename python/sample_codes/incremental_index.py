@@ -0,0 +1,182 @@
+"""
+Incremental Directory Index for LlamaIndex
+Shared helper used by the Unit 6 RAG examples
+
+Persists a VectorStoreIndex built from a directory and keeps it in sync on
+later runs: only files whose size/mtime (and then content hash) changed are
+re-read, re-chunked and re-embedded, and nodes of deleted files are removed.
+
+Usage:
+    indexer = IncrementalDirectoryIndex("docs/", "storage/")
+    stats = indexer.refresh()
+    query_engine = indexer.index.as_query_engine()
+"""
+
+import hashlib
+import json
+import os
+from typing import Dict, List, Optional
+
+from llama_index.core import (
+    Settings,
+    SimpleDirectoryReader,
+    StorageContext,
+    VectorStoreIndex,
+    load_index_from_storage
+)
+from llama_index.core.ingestion import run_transformations
+
+MANIFEST_FILE = "manifest.json"
+
+
+def _file_sha256(path: str) -> str:
+    """Hash a file's content in 1 MiB blocks."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+class IncrementalDirectoryIndex:
+    """
+    A persisted VectorStoreIndex over a directory that refreshes incrementally.
+
+    A manifest next to the index records, per file, its size, mtime, content
+    hash and the ids of the documents it produced. refresh() compares the
+    directory against the manifest and touches only what changed.
+    """
+
+    def __init__(self, input_dir: str, persist_dir: str, recursive: bool = True,
+                 required_exts: Optional[List[str]] = None):
+        self.input_dir = os.path.abspath(input_dir)
+        self.persist_dir = persist_dir
+        self.recursive = recursive
+        self.required_exts = [ext.lower() for ext in required_exts] if required_exts else None
+        self.index: Optional[VectorStoreIndex] = None
+        self._manifest: Dict[str, dict] = {}
+
+    # ------------------------------------------------------------------
+    # Persistence
+    # ------------------------------------------------------------------
+
+    @property
+    def _manifest_path(self) -> str:
+        return os.path.join(self.persist_dir, MANIFEST_FILE)
+
+    def _load(self) -> None:
+        """Load the persisted index and manifest, or start empty."""
+        if os.path.exists(self._manifest_path):
+            storage_context = StorageContext.from_defaults(persist_dir=self.persist_dir)
+            self.index = load_index_from_storage(storage_context)
+            with open(self._manifest_path) as f:
+                self._manifest = json.load(f)
+        else:
+            self.index = VectorStoreIndex([], storage_context=StorageContext.from_defaults())
+            self._manifest = {}
+
+    def _persist(self) -> None:
+        """Write the index, then atomically replace the manifest."""
+        os.makedirs(self.persist_dir, exist_ok=True)
+        self.index.storage_context.persist(persist_dir=self.persist_dir)
+        tmp_path = self._manifest_path + ".tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(self._manifest, f)
+        os.replace(tmp_path, self._manifest_path)
+
+    # ------------------------------------------------------------------
+    # Directory scanning
+    # ------------------------------------------------------------------
+
+    def _scan(self) -> Dict[str, os.stat_result]:
+        """Return {path: stat} for every indexable file in input_dir."""
+        files = {}
+        for root, dirs, names in os.walk(self.input_dir):
+            # Match SimpleDirectoryReader: skip hidden files and directories
+            dirs[:] = [d for d in dirs if not d.startswith(".")]
+            for name in names:
+                if name.startswith("."):
+                    continue
+                if self.required_exts and os.path.splitext(name)[1].lower() not in self.required_exts:
+                    continue
+                path = os.path.join(root, name)
+                files[path] = os.stat(path)
+            if not self.recursive:
+                break
+        return files
+
+    # ------------------------------------------------------------------
+    # Refresh
+    # ------------------------------------------------------------------
+
+    def _delete_file(self, path: str) -> None:
+        """Remove every node that came from path."""
+        for doc_id in self._manifest.pop(path, {}).get("doc_ids", []):
+            self.index.delete_ref_doc(doc_id, delete_from_docstore=True)
+
+    def refresh(self) -> dict:
+        """
+        Bring the index in line with the directory and persist it.
+
+        Changed files are chunked together and inserted in one call, so the
+        embed model sees them as batches rather than one request per file.
+        Nothing is written when the directory has not changed.
+
+        Returns counts of added, updated, deleted and unchanged files.
+        """
+        if self.index is None:
+            self._load()
+
+        current = self._scan()
+        stats = {"added": 0, "updated": 0, "deleted": 0, "unchanged": 0}
+        to_read = {}
+        touched = False  # Manifest mtimes refreshed for files with unchanged content
+
+        for path, stat in current.items():
+            entry = self._manifest.get(path)
+            if entry and entry["size"] == stat.st_size and entry["mtime"] == stat.st_mtime:
+                stats["unchanged"] += 1
+                continue
+
+            # Size/mtime changed: fall back to the content hash before re-embedding
+            sha256 = _file_sha256(path)
+            if entry and entry["sha256"] == sha256:
+                entry["mtime"] = stat.st_mtime
+                touched = True
+                stats["unchanged"] += 1
+                continue
+
+            stats["updated" if entry else "added"] += 1
+            to_read[path] = {"size": stat.st_size, "mtime": stat.st_mtime, "sha256": sha256}
+
+        for path in set(self._manifest) - set(current):
+            self._delete_file(path)
+            stats["deleted"] += 1
+
+        if to_read:
+            for path in to_read:
+                self._delete_file(path)
+
+            documents = SimpleDirectoryReader(
+                input_files=list(to_read),
+                filename_as_id=True
+            ).load_data()
+
+            doc_ids = {path: [] for path in to_read}
+            for document in documents:
+                source = os.path.abspath(document.metadata.get("file_path", ""))
+                if source in doc_ids:
+                    doc_ids[source].append(document.doc_id)
+
+            # What index.insert() does per document, for all of them at once
+            self.index.insert_nodes(run_transformations(documents, Settings.transformations))
+            for document in documents:
+                self.index.docstore.set_document_hash(document.doc_id, document.hash)
+
+            for path, entry in to_read.items():
+                entry["doc_ids"] = doc_ids[path]
+                self._manifest[path] = entry
+
+        if to_read or stats["deleted"] or touched:
+            self._persist()
+        return stats
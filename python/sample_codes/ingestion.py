@@ -0,0 +1,172 @@
+"""
+Parallel Document Ingestion for LlamaIndex
+Shared helper used by the Unit 6 RAG examples
+
+VectorStoreIndex.from_documents() reads, splits and embeds documents one
+after another on a single thread. This pipeline instead:
+
+1. Parses and chunks files in a process pool (CPU-bound work scales with cores)
+2. Streams the resulting nodes through a bounded asyncio queue
+3. Batches nodes into embedding requests sent concurrently to Ollama
+4. Builds the index from pre-embedded nodes (no second embedding pass)
+
+Usage:
+    index, stats = build_index_parallel("docs/", parse_workers=8, embed_batch_size=64)
+"""
+
+import asyncio
+import itertools
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Optional, Tuple
+
+from llama_index.core import Settings, SimpleDirectoryReader, VectorStoreIndex
+from llama_index.core.node_parser import SentenceSplitter
+from llama_index.core.schema import BaseNode
+
+import config
+
+_DONE = object()  # Queue sentinel telling embedding workers to stop
+
+
+# ============================================================================
+# Stage 1: Parse and chunk (runs in worker processes)
+# ============================================================================
+
+def load_and_chunk_file(path: str, chunk_size: int, chunk_overlap: int) -> List[BaseNode]:
+    """Read one file and split it into nodes. Must stay top-level to be picklable."""
+    documents = SimpleDirectoryReader(input_files=[path], filename_as_id=True).load_data()
+    splitter = SentenceSplitter(chunk_size=chunk_size, chunk_overlap=chunk_overlap)
+    return splitter.get_nodes_from_documents(documents)
+
+
+# ============================================================================
+# Stage 2: Batched embedding (runs on the event loop)
+# ============================================================================
+
+async def _embed_worker(queue: asyncio.Queue, embed_model, batch_size: int,
+                        batch_timeout: float, out: List[BaseNode]) -> None:
+    """Pull nodes off the queue, embed them in batches and append to out."""
+    done = False
+    while not done:
+        batch = [await queue.get()]
+        if batch[0] is _DONE:
+            break
+
+        # Fill the batch with whatever arrives within batch_timeout
+        deadline = time.monotonic() + batch_timeout
+        while len(batch) < batch_size:
+            remaining = deadline - time.monotonic()
+            try:
+                item = queue.get_nowait() if remaining <= 0 else await asyncio.wait_for(queue.get(), remaining)
+            except (asyncio.QueueEmpty, asyncio.TimeoutError):
+                break
+            if item is _DONE:
+                done = True
+                break
+            batch.append(item)
+
+        texts = [node.get_content(metadata_mode="embed") for node in batch]
+        embeddings = await embed_model.aget_text_embedding_batch(texts)
+        for node, embedding in zip(batch, embeddings):
+            node.embedding = embedding
+        out.extend(batch)
+
+
+# ============================================================================
+# Pipeline
+# ============================================================================
+
+async def ingest_directory_async(input_dir: str, recursive: bool = True,
+                                 parse_workers: Optional[int] = None,
+                                 embed_concurrency: int = config.INGEST_EMBED_CONCURRENCY,
+                                 embed_batch_size: int = config.INGEST_EMBED_BATCH_SIZE,
+                                 batch_timeout: float = 0.05,
+                                 queue_size: int = 1024,
+                                 chunk_size: int = 1024,
+                                 chunk_overlap: int = 20,
+                                 embed_model=None) -> Tuple[List[BaseNode], dict]:
+    """
+    Parse, chunk and embed every file under input_dir concurrently.
+
+    Returns the embedded nodes and throughput stats. The queue is bounded and
+    at most parse_workers * 2 files are parsed or waiting to be queued at
+    once, so parsing can never run arbitrarily far ahead of embedding.
+    """
+    embed_model = embed_model or Settings.embed_model
+    parse_workers = parse_workers or config.INGEST_PARSE_WORKERS
+    parse_window = parse_workers * 2
+    files = [str(path) for path in SimpleDirectoryReader(input_dir, recursive=recursive).input_files]
+
+    start = time.perf_counter()
+    loop = asyncio.get_running_loop()
+    queue: asyncio.Queue = asyncio.Queue(maxsize=queue_size)
+    nodes: List[BaseNode] = []
+
+    workers = [
+        asyncio.create_task(_embed_worker(queue, embed_model, embed_batch_size, batch_timeout, nodes))
+        for _ in range(embed_concurrency)
+    ]
+
+    async def produce() -> None:
+        # A sliding window of parse jobs: a new file is submitted only after a
+        # finished one has been fed to the queue, so a full queue stops parsing
+        paths = iter(files)
+        pending = set()
+        with ProcessPoolExecutor(max_workers=parse_workers) as pool:
+            def submit(count: int) -> None:
+                for path in itertools.islice(paths, count):
+                    pending.add(loop.run_in_executor(pool, load_and_chunk_file, path, chunk_size, chunk_overlap))
+
+            submit(parse_window)
+            try:
+                # Feed nodes to the embedders as soon as any file finishes parsing
+                while pending:
+                    finished, _ = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                    for future in finished:
+                        pending.discard(future)
+                        for node in future.result():
+                            await queue.put(node)
+                        submit(1)
+            finally:
+                for future in pending:
+                    future.cancel()  # Files not parsed yet when we are cancelled
+        for _ in workers:
+            await queue.put(_DONE)
+
+    # If the embedders die (e.g. Ollama is down) nobody drains the queue, so
+    # the producer would block on a full queue forever: the first failure on
+    # either side cancels everything else and is re-raised
+    tasks = [asyncio.create_task(produce()), *workers]
+    try:
+        done, _ = await asyncio.wait(tasks, return_when=asyncio.FIRST_EXCEPTION)
+        for task in done:
+            task.result()
+    finally:
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    elapsed = time.perf_counter() - start
+    stats = {
+        "files": len(files),
+        "nodes": len(nodes),
+        "seconds": elapsed,
+        "docs_per_second": len(files) / elapsed if elapsed else 0.0,
+        "nodes_per_second": len(nodes) / elapsed if elapsed else 0.0,
+        "parse_workers": parse_workers,
+        "embed_concurrency": embed_concurrency,
+        "embed_batch_size": embed_batch_size,
+    }
+    return nodes, stats
+
+
+def build_index_parallel(input_dir: str, **kwargs) -> Tuple[VectorStoreIndex, dict]:
+    """
+    Build a VectorStoreIndex from a directory using the parallel pipeline.
+
+    Accepts the same keyword arguments as ingest_directory_async(). Nodes
+    arrive already embedded, so the index does not call the embed model again.
+    """
+    nodes, stats = config.run_async(ingest_directory_async(input_dir, **kwargs))
+    return VectorStoreIndex(nodes), stats
@@ -0,0 +1,445 @@
+"""
+LLM Response Cache
+Shared helper for the LangChain (Units 1, 3) and LlamaIndex (Unit 6) examples
+
+Caches LLM responses on disk so repeated prompts return in milliseconds:
+
+1. Exact tier: keyed by (model settings, prompt) - model name, temperature
+   and other parameters are part of the key, so different settings never mix.
+2. Semantic tier (optional): if an embedding function is given, a chat
+   prompt whose final user message is within similarity_threshold of a
+   cached one reuses that response - but only when everything before it
+   (system prompt, few-shot examples, history) and the model settings are
+   identical. Only the variable input is embedded, so a long shared prefix
+   cannot make different inputs look alike. Plain-text prompts use the
+   exact tier only.
+
+Entries expire after ttl seconds and the least recently used are evicted
+beyond max_entries.
+
+Usage (LangChain - every ChatOllama/OllamaLLM call goes through the cache):
+    from llm_cache import enable_langchain_cache
+    enable_langchain_cache()
+
+Usage (LlamaIndex):
+    Settings.llm = CachedOllama(model=..., response_cache=get_response_cache())
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional, Sequence, Set, Tuple
+
+import numpy as np
+from langchain_core.caches import BaseCache
+from langchain_core.globals import set_llm_cache
+from langchain_core.load import dumps, loads
+from llama_index.core.base.llms.types import (
+    ChatMessage,
+    ChatResponse,
+    CompletionResponse,
+    MessageRole
+)
+from llama_index.llms.ollama import Ollama
+from pydantic import PrivateAttr
+
+import config
+
+# ============================================================================
+# SQLite Response Store
+# ============================================================================
+
+class ResponseCache:
+    """
+    Exact + optional semantic LLM response cache backed by SQLite.
+
+    The semantic tier keeps the prompt embeddings of each llm_string in
+    memory as one NumPy matrix (loaded from SQLite on first use), so a
+    lookup is a single matrix-vector product, scored outside the lock.
+    Entries written by other processes are picked up when this process
+    next loads that llm_string; entries they delete are noticed on a hit.
+
+    Args:
+        path: SQLite file
+        ttl: seconds an entry stays valid (None = forever)
+        max_entries: size bound; least recently used entries are evicted
+        embed_fn: text -> vector; enables the semantic tier when given
+        similarity_threshold: minimum cosine similarity for a semantic hit
+    """
+
+    def __init__(self, path: str, ttl: Optional[float] = config.LLM_CACHE_TTL,
+                 max_entries: int = config.LLM_CACHE_MAX_ENTRIES,
+                 embed_fn: Optional[Callable[[str], Sequence[float]]] = None,
+                 similarity_threshold: float = config.LLM_CACHE_SIMILARITY_THRESHOLD):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self.path = path
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.embed_fn = embed_fn
+        self.similarity_threshold = similarity_threshold
+        self.exact_hits = 0
+        self.semantic_hits = 0
+        self.misses = 0
+
+        self._lock = threading.Lock()
+        # llm_string -> (keys, unit embeddings, created); replaced, never modified in place
+        self._semantic: Dict[str, Tuple[Tuple[str, ...], np.ndarray, np.ndarray]] = {}
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            """CREATE TABLE IF NOT EXISTS responses (
+                key TEXT PRIMARY KEY,
+                llm_string TEXT NOT NULL,
+                prompt TEXT NOT NULL,
+                response TEXT NOT NULL,
+                embedding BLOB,
+                created REAL NOT NULL,
+                last_used REAL NOT NULL
+            )"""
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS responses_llm ON responses (llm_string)")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS responses_last_used ON responses (last_used)")
+
+    @staticmethod
+    def make_key(llm_string: str, prompt: str) -> str:
+        return hashlib.sha256(f"{llm_string}\0{prompt}".encode("utf-8")).hexdigest()
+
+    @staticmethod
+    def _normalize(vector: Sequence[float]) -> np.ndarray:
+        vector = np.asarray(vector, dtype=np.float32)
+        return vector / (np.linalg.norm(vector) or 1.0)
+
+    def _expired(self, created: float, now: float) -> bool:
+        return self.ttl is not None and now - created > self.ttl
+
+    # ------------------------------------------------------------------
+    # In-memory embedding matrices (call with the lock held)
+    # ------------------------------------------------------------------
+
+    def _semantic_index(self, llm_string: str):
+        """(keys, unit embeddings, created) for llm_string, loaded on first use."""
+        index = self._semantic.get(llm_string)
+        if index is None:
+            rows = self._conn.execute(
+                "SELECT key, embedding, created FROM responses "
+                "WHERE llm_string = ? AND embedding IS NOT NULL ORDER BY created",
+                (llm_string,)
+            ).fetchall()
+            vectors = [np.frombuffer(blob, dtype=np.float32) for _, blob, _ in rows]
+            # Only the newest embedding size can match queries (older rows may predate a model change)
+            dim = len(vectors[-1]) if vectors else 0
+            keep = [i for i, vector in enumerate(vectors) if len(vector) == dim]
+            index = (tuple(rows[i][0] for i in keep),
+                     np.array([vectors[i] for i in keep], dtype=np.float32).reshape(len(keep), dim),
+                     np.array([rows[i][2] for i in keep], dtype=np.float64))
+            self._semantic[llm_string] = index
+        return index
+
+    def _remember(self, llm_string: str, key: str, vector: np.ndarray, created: float) -> None:
+        if llm_string not in self._semantic:
+            return  # Loaded with this entry on first lookup
+        self._forget({key})
+        keys, matrix, created_at = self._semantic[llm_string]
+        if matrix.shape[1] != len(vector):
+            keys, matrix, created_at = (), np.empty((0, len(vector)), dtype=np.float32), np.empty(0)
+        self._semantic[llm_string] = (keys + (key,), np.vstack([matrix, vector[None, :]]),
+                                      np.append(created_at, created))
+
+    def _forget(self, keys: Set[str]) -> None:
+        if not keys:
+            return
+        for llm_string, (index_keys, matrix, created) in list(self._semantic.items()):
+            keep = np.array([key not in keys for key in index_keys], dtype=bool)
+            if not keep.all():
+                self._semantic[llm_string] = (tuple(k for k, kept in zip(index_keys, keep) if kept),
+                                              matrix[keep], created[keep])
+
+    # ------------------------------------------------------------------
+    # Lookup / update
+    # ------------------------------------------------------------------
+
+    def lookup(self, llm_string: str, prompt: str, embed_text: Optional[str] = None) -> Optional[str]:
+        """
+        Return the cached response for (llm_string, prompt), or None.
+
+        embed_text is what the semantic tier compares (None: exact tier only).
+        """
+        now = time.time()
+        key = self.make_key(llm_string, prompt)
+
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT response, created FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+            if row and not self._expired(row[1], now):
+                self._conn.execute("UPDATE responses SET last_used = ? WHERE key = ?", (now, key))
+                self.exact_hits += 1
+                return row[0]
+            if row:
+                self._conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+                self._forget({key})
+
+        if self.embed_fn is not None and embed_text is not None:
+            response = self._semantic_lookup(llm_string, embed_text, now)
+            if response is not None:
+                return response
+
+        with self._lock:
+            self.misses += 1
+        return None
+
+    def _semantic_lookup(self, llm_string: str, text: str, now: float) -> Optional[str]:
+        """Best cached response for the same settings whose prompt is similar enough."""
+        query = self._normalize(self.embed_fn(text))
+        with self._lock:
+            keys, matrix, created = self._semantic_index(llm_string)
+        if not keys or matrix.shape[1] != len(query):
+            return None
+
+        scores = matrix @ query
+        if self.ttl is not None:
+            scores[now - created > self.ttl] = -np.inf
+        candidates = np.flatnonzero(scores >= self.similarity_threshold)
+
+        for i in candidates[np.argsort(-scores[candidates], kind="stable")]:
+            with self._lock:
+                row = self._conn.execute(
+                    "SELECT response FROM responses WHERE key = ?", (keys[i],)
+                ).fetchone()
+                if row is None:  # Evicted since it was loaded (possibly by another process)
+                    self._forget({keys[i]})
+                    continue
+                self._conn.execute("UPDATE responses SET last_used = ? WHERE key = ?", (now, keys[i]))
+                self.semantic_hits += 1
+            return row[0]
+        return None
+
+    def update(self, llm_string: str, prompt: str, response: str,
+               embed_text: Optional[str] = None) -> None:
+        """Store a response (embedding embed_text for the semantic tier), then enforce the size bound."""
+        now = time.time()
+        key = self.make_key(llm_string, prompt)
+        vector = None
+        if self.embed_fn is not None and embed_text is not None:
+            vector = self._normalize(self.embed_fn(embed_text))
+
+        with self._lock:
+            self._conn.execute("BEGIN")
+            try:
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO responses "
+                    "(key, llm_string, prompt, response, embedding, created, last_used) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    (key, llm_string, prompt, response,
+                     vector.tobytes() if vector is not None else None, now, now)
+                )
+                removed = self._evict_locked(now)
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+            self._conn.execute("COMMIT")
+            self._forget(removed)
+            if vector is not None:
+                self._remember(llm_string, key, vector, now)
+
+    def _evict_locked(self, now: float) -> Set[str]:
+        """Delete expired entries and the least recently used beyond max_entries; return their keys."""
+        removed = set()
+        if self.ttl is not None:
+            expired = self._conn.execute(
+                "SELECT key FROM responses WHERE created < ?", (now - self.ttl,)
+            ).fetchall()
+            self._conn.executemany("DELETE FROM responses WHERE key = ?", expired)
+            removed.update(key for (key,) in expired)
+        (count,) = self._conn.execute("SELECT COUNT(*) FROM responses").fetchone()
+        if count > self.max_entries:
+            oldest = self._conn.execute(
+                "SELECT key FROM responses ORDER BY last_used ASC LIMIT ?",
+                (count - self.max_entries,)
+            ).fetchall()
+            self._conn.executemany("DELETE FROM responses WHERE key = ?", oldest)
+            removed.update(key for (key,) in oldest)
+        return removed
+
+    def clear(self) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM responses")
+            self._semantic.clear()
+            self.exact_hits = self.semantic_hits = self.misses = 0
+
+    def stats(self) -> dict:
+        with self._lock:
+            (entries,) = self._conn.execute("SELECT COUNT(*) FROM responses").fetchone()
+        lookups = self.exact_hits + self.semantic_hits + self.misses
+        return {
+            "entries": entries,
+            "exact_hits": self.exact_hits,
+            "semantic_hits": self.semantic_hits,
+            "misses": self.misses,
+            "hit_rate": (self.exact_hits + self.semantic_hits) / lookups if lookups else 0.0,
+        }
+
+
+_default_cache: Optional[ResponseCache] = None
+_default_cache_lock = threading.Lock()
+
+def get_response_cache(embed_fn: Optional[Callable[[str], Sequence[float]]] = None) -> ResponseCache:
+    """
+    Get the process-wide response cache stored under config.CACHE_DIR.
+
+    embed_fn enables the semantic tier and is bound when the cache is
+    created: every holder shares it, and vectors from another model could
+    not be compared with the stored ones. Later calls may omit it, but
+    passing a different one raises ValueError.
+    """
+    global _default_cache
+    with _default_cache_lock:
+        if _default_cache is None:
+            _default_cache = ResponseCache(os.path.join(config.CACHE_DIR, "llm_responses.sqlite"),
+                                           embed_fn=embed_fn)
+        elif embed_fn is not None and embed_fn != _default_cache.embed_fn:
+            raise ValueError("The shared response cache was already created with another embed_fn; "
+                             "build a separate ResponseCache for a different embedding model")
+    return _default_cache
+
+
+# ============================================================================
+# LangChain Adapter
+# ============================================================================
+
+def semantic_scope(llm_string: str, context: str) -> str:
+    """
+    Partition key for the semantic tier: model settings plus the exact
+    text surrounding the user's message (hashed).
+    """
+    return f"{llm_string}\0{hashlib.sha256(context.encode('utf-8')).hexdigest()}"
+
+
+def _split_chat_prompt(prompt: str) -> Optional[Tuple[str, str]]:
+    """
+    (context, last human message) of LangChain's serialized chat prompt.
+
+    None for plain-text prompts, or chats without a text human message.
+    """
+    try:
+        messages = json.loads(prompt)
+    except ValueError:
+        return None
+    if not isinstance(messages, list):
+        return None
+    for i in range(len(messages) - 1, -1, -1):
+        message = messages[i] if isinstance(messages[i], dict) else {}
+        kwargs = message.get("kwargs") or {}
+        if kwargs.get("type") == "human" or (message.get("id") or [""])[-1] == "HumanMessage":
+            content = kwargs.get("content")
+            if not isinstance(content, str):
+                return None
+            return json.dumps(messages[:i] + messages[i + 1:], sort_keys=True), content
+    return None
+
+
+class LangChainResponseCache(BaseCache):
+    """LangChain BaseCache backed by a ResponseCache (set with set_llm_cache)."""
+
+    def __init__(self, cache: ResponseCache):
+        self.cache = cache
+
+    def _scope(self, prompt: str, llm_string: str) -> Tuple[str, Optional[str]]:
+        """(llm_string to cache under, text for the semantic tier or None)."""
+        split = _split_chat_prompt(prompt)
+        if split is None:
+            return llm_string, None
+        context, question = split
+        return semantic_scope(llm_string, context), question
+
+    def lookup(self, prompt: str, llm_string: str) -> Optional[List[Any]]:
+        scope, embed_text = self._scope(prompt, llm_string)
+        cached = self.cache.lookup(scope, prompt, embed_text=embed_text)
+        if cached is None:
+            return None
+        return [loads(generation) for generation in json.loads(cached)]
+
+    def update(self, prompt: str, llm_string: str, return_val: Sequence[Any]) -> None:
+        scope, embed_text = self._scope(prompt, llm_string)
+        payload = json.dumps([dumps(generation) for generation in return_val])
+        self.cache.update(scope, prompt, payload, embed_text=embed_text)
+
+    def clear(self, **kwargs: Any) -> None:
+        self.cache.clear()
+
+
+def enable_langchain_cache(cache: Optional[ResponseCache] = None) -> LangChainResponseCache:
+    """Route every LangChain LLM/chat model call through the response cache."""
+    adapter = LangChainResponseCache(cache or get_response_cache())
+    set_llm_cache(adapter)
+    return adapter
+
+
+# ============================================================================
+# LlamaIndex Adapter
+# ============================================================================
+
+class CachedOllama(Ollama):
+    """
+    LlamaIndex Ollama LLM whose complete() and chat() consult a ResponseCache.
+
+    Streaming calls bypass the cache.
+    """
+
+    _response_cache: ResponseCache = PrivateAttr()
+
+    def __init__(self, response_cache: Optional[ResponseCache] = None, **kwargs):
+        super().__init__(**kwargs)
+        self._response_cache = response_cache or get_response_cache()
+
+    @classmethod
+    def class_name(cls) -> str:
+        return "CachedOllama"
+
+    @property
+    def response_cache(self) -> ResponseCache:
+        return self._response_cache
+
+    def _llm_string(self, kind: str, kwargs: dict) -> str:
+        settings = {
+            "kind": kind,
+            "model": self.model,
+            "temperature": self.temperature,
+            "additional_kwargs": self.additional_kwargs,
+            "call_kwargs": kwargs,
+        }
+        return json.dumps(settings, sort_keys=True, default=str)
+
+    def complete(self, prompt: str, formatted: bool = False, **kwargs: Any) -> CompletionResponse:
+        llm_string = self._llm_string("complete", kwargs)
+        cached = self._response_cache.lookup(llm_string, prompt)
+        if cached is not None:
+            return CompletionResponse(text=cached)
+        response = super().complete(prompt, formatted=formatted, **kwargs)
+        self._response_cache.update(llm_string, prompt, response.text)
+        return response
+
+    def chat(self, messages: Sequence[ChatMessage], **kwargs: Any) -> ChatResponse:
+        llm_string = self._llm_string("chat", kwargs)
+        turns = [[m.role.value, m.content] for m in messages]
+        prompt = json.dumps(turns)
+        # Semantic tier: compare the last user message, within an identical rest of the chat
+        embed_text = None
+        users = [i for i, m in enumerate(messages) if m.role == MessageRole.USER]
+        if users and isinstance(messages[users[-1]].content, str):
+            embed_text = messages[users[-1]].content
+            context = json.dumps(turns[:users[-1]] + turns[users[-1] + 1:])
+            llm_string = semantic_scope(llm_string, context)
+        cached = self._response_cache.lookup(llm_string, prompt, embed_text=embed_text)
+        if cached is not None:
+            return ChatResponse(message=ChatMessage(role=MessageRole.ASSISTANT, content=cached))
+        response = super().chat(messages, **kwargs)
+        self._response_cache.update(llm_string, prompt, response.message.content or "",
+                                    embed_text=embed_text)
+        return response
@@ -0,0 +1,193 @@
+"""
+Metadata Pre-Filter Index
+Shared helper used by the Unit 6 vector store and hybrid retrieval examples
+
+Keeps postings (row lists) per metadata field value, so a query with
+metadata filters is narrowed to the matching rows before any vector or
+BM25 scoring happens, instead of scoring everything and filtering after.
+Filters are LlamaIndex MetadataFilters; parse_filters() builds them from
+a small expression language for query-time use.
+
+Usage:
+    filters = parse_filters("category == 'landmark' and year >= 1900")
+    query_engine = index.as_query_engine(similarity_top_k=2, filters=filters)
+"""
+
+import ast
+from typing import Any, Dict, List, Optional, Sequence
+
+import numpy as np
+from llama_index.core.schema import BaseNode
+from llama_index.core.vector_stores.types import (
+    FilterCondition,
+    FilterOperator,
+    MetadataFilter,
+    MetadataFilters
+)
+
+_SCALAR_TYPES = (str, int, float, bool)
+
+
+def _indexable_values(value: Any) -> List[Any]:
+    """Values a metadata entry is indexed under (each element of a list)."""
+    if isinstance(value, _SCALAR_TYPES):
+        return [value]
+    if isinstance(value, (list, tuple)):
+        return [item for item in value if isinstance(item, _SCALAR_TYPES)]
+    return []
+
+
+# ============================================================================
+# Postings Index
+# ============================================================================
+
+class MetadataIndex:
+    """
+    Field -> value -> rows postings over node metadata.
+
+    Rows are appended in increasing order, so every posting list stays
+    sorted. Deleted rows are not removed here: callers intersect the
+    result with their own live-row mask. List-valued fields are indexed
+    per element, which is what CONTAINS / ANY / ALL match against.
+    """
+
+    def __init__(self):
+        self.postings: Dict[str, Dict[Any, List[int]]] = {}
+        self.size = 0
+
+    def add(self, nodes: Sequence[Optional[BaseNode]]) -> None:
+        """Index nodes as the next rows (None entries take a row but no postings)."""
+        for node in nodes:
+            if node is not None:
+                for key, value in node.metadata.items():
+                    field = self.postings.setdefault(key, {})
+                    for item in _indexable_values(value):
+                        field.setdefault(item, []).append(self.size)
+            self.size += 1
+
+    def _rows_mask(self, rows: Sequence[int], size: int) -> np.ndarray:
+        mask = np.zeros(size, dtype=bool)
+        if rows:
+            mask[np.asarray(rows, dtype=np.int64)] = True
+        return mask
+
+    def _values_mask(self, key: str, values: Sequence[Any], size: int) -> np.ndarray:
+        field = self.postings.get(key, {})
+        return self._rows_mask([row for value in values for row in field.get(value, [])], size)
+
+    def _key_mask(self, key: str, size: int) -> np.ndarray:
+        return self._rows_mask([row for rows in self.postings.get(key, {}).values() for row in rows], size)
+
+    def _range_mask(self, key: str, accept, size: int) -> np.ndarray:
+        matching = []
+        for value in self.postings.get(key, {}):
+            try:
+                if not isinstance(value, bool) and accept(value):
+                    matching.append(value)
+            except TypeError:
+                continue  # Value of another type (e.g. str vs int) never matches
+        return self._values_mask(key, matching, size)
+
+    def _filter_mask(self, f: MetadataFilter, size: int) -> np.ndarray:
+        key, value = f.key, f.value
+        op = getattr(f.operator, "value", f.operator)
+        values = list(value) if isinstance(value, (list, tuple)) else [value]
+        if op in ("==", "contains"):
+            return self._values_mask(key, [value], size)
+        if op in ("in", "any"):
+            return self._values_mask(key, values, size)
+        if op == "!=":
+            return self._key_mask(key, size) & ~self._values_mask(key, [value], size)
+        if op == "nin":
+            return self._key_mask(key, size) & ~self._values_mask(key, values, size)
+        if op == "all":
+            mask = self._key_mask(key, size)
+            for item in values:
+                mask &= self._values_mask(key, [item], size)
+            return mask
+        if op == "is_empty":
+            return ~self._key_mask(key, size)
+        comparisons = {
+            ">": lambda v: v > value, ">=": lambda v: v >= value,
+            "<": lambda v: v < value, "<=": lambda v: v <= value,
+        }
+        if op in comparisons:
+            return self._range_mask(key, comparisons[op], size)
+        raise ValueError(f"Unsupported metadata filter operator: {op}")
+
+    def mask(self, filters: MetadataFilters, size: Optional[int] = None) -> np.ndarray:
+        """Boolean mask over rows [0, size) of the rows matching filters."""
+        size = self.size if size is None else size
+        condition = getattr(filters.condition, "value", filters.condition) or "and"
+        masks = [self.mask(f, size) if isinstance(f, MetadataFilters) else self._filter_mask(f, size)
+                 for f in filters.filters]
+        if not masks:
+            return np.ones(size, dtype=bool)
+        if condition == "and":
+            return np.logical_and.reduce(masks)
+        if condition == "or":
+            return np.logical_or.reduce(masks)
+        if condition == "not":
+            return ~np.logical_or.reduce(masks)
+        raise ValueError(f"Unsupported filter condition: {condition}")
+
+    def to_dict(self) -> dict:
+        """JSON-safe form (values keep their type; dict keys would not)."""
+        return {"size": self.size,
+                "postings": {key: [[value, rows] for value, rows in field.items()]
+                             for key, field in self.postings.items()}}
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "MetadataIndex":
+        index = cls()
+        index.size = data["size"]
+        index.postings = {key: {value: rows for value, rows in field}
+                          for key, field in data["postings"].items()}
+        return index
+
+
+# ============================================================================
+# Filter Expressions
+# ============================================================================
+
+_COMPARE_OPERATORS = {
+    ast.Eq: FilterOperator.EQ, ast.NotEq: FilterOperator.NE,
+    ast.Gt: FilterOperator.GT, ast.GtE: FilterOperator.GTE,
+    ast.Lt: FilterOperator.LT, ast.LtE: FilterOperator.LTE,
+    ast.In: FilterOperator.IN, ast.NotIn: FilterOperator.NIN,
+}
+
+
+def _parse_node(node: ast.AST, expression: str):
+    if isinstance(node, ast.BoolOp):
+        condition = FilterCondition.AND if isinstance(node.op, ast.And) else FilterCondition.OR
+        return MetadataFilters(filters=[_parse_node(value, expression) for value in node.values],
+                               condition=condition)
+    if isinstance(node, ast.Compare) and len(node.ops) == 1:
+        left, op, right = node.left, type(node.ops[0]), node.comparators[0]
+        # "'tag' in tags" tests membership in a list-valued field
+        if op is ast.In and isinstance(right, ast.Name) and not isinstance(left, ast.Name):
+            return MetadataFilter(key=right.id, value=ast.literal_eval(left),
+                                  operator=FilterOperator.CONTAINS)
+        if isinstance(left, ast.Name) and op in _COMPARE_OPERATORS:
+            value = ast.literal_eval(right)
+            if isinstance(value, tuple):
+                value = list(value)
+            return MetadataFilter(key=left.id, value=value, operator=_COMPARE_OPERATORS[op])
+    raise ValueError(f"Cannot parse filter expression {expression!r} near: {ast.unparse(node)}")
+
+
+def parse_filters(expression: str) -> MetadataFilters:
+    """
+    Build MetadataFilters from an expression such as
+    "category == 'landmark' and (year >= 1900 or 'unesco' in tags)".
+
+    Supports ==, !=, <, <=, >, >=, in / not in [..], "'x' in field",
+    and / or with parentheses. Values are Python literals.
+    """
+    try:
+        tree = ast.parse(expression.strip(), mode="eval").body
+    except SyntaxError as e:
+        raise ValueError(f"Invalid filter expression {expression!r}: {e.msg}") from e
+    filters = _parse_node(tree, expression)
+    return filters if isinstance(filters, MetadataFilters) else MetadataFilters(filters=[filters])
@@ -0,0 +1,549 @@
+"""
+NumPy Vector Store for LlamaIndex
+Shared helper used by the Unit 6 RAG examples
+
+Keeps every embedding in one contiguous float32 matrix with L2-normalized
+rows, so cosine similarity for a query is a single matrix-vector product
+and the top k come from np.argpartition instead of sorting every score.
+Several queries at once become one matrix-matrix product. For indexes up
+to a few hundred thousand nodes this is orders of magnitude faster than
+scoring nodes one by one in Python.
+
+persist() writes the matrix as a .npy file (float32 or float16) next to a
+SQLite table of nodes. from_persist_dir() memory-maps the matrix and reads
+nodes only when a query returns them, so loading is near-instant and every
+worker process serving the same directory shares one page-cached copy.
+
+Usage:
+    store = NumpyVectorStore()
+    storage_context = StorageContext.from_defaults(vector_store=store)
+    index = VectorStoreIndex.from_documents(documents, storage_context=storage_context)
+
+    results = store.query_batch(query_embeddings, similarity_top_k=5)
+    store.add(nodes, embeddings=vectors)  # (len(nodes), dim) array, no per-node lists
+
+    store.persist("./index", dtype="float16")
+    index = VectorStoreIndex.from_vector_store(NumpyVectorStore.from_persist_dir("./index"))
+"""
+
+import json
+import os
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence
+
+import numpy as np
+from llama_index.core.schema import BaseNode
+from llama_index.core.vector_stores.types import (
+    BasePydanticVectorStore,
+    MetadataFilters,
+    VectorStoreQuery,
+    VectorStoreQueryMode,
+    VectorStoreQueryResult
+)
+from llama_index.core.vector_stores.utils import metadata_dict_to_node, node_to_metadata_dict
+from pydantic import PrivateAttr
+
+import config
+from metadata_index import MetadataIndex
+
+_MIN_CAPACITY = 1024
+_FORMAT_VERSION = 1
+_SQL_BATCH = 500  # Stay under SQLite's bound-parameter limit
+MATRIX_FILE = "embeddings.npy"
+NODES_FILE = "nodes.sqlite"
+METADATA_FILE = "metadata.json"
+MANIFEST_FILE = "store.json"
+
+
+def normalize_rows(vectors: np.ndarray) -> np.ndarray:
+    """L2-normalize each row in place (zero rows are left as zeros)."""
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    vectors /= norms
+    return vectors
+
+
+def top_k_rows(scores: np.ndarray, k: int) -> np.ndarray:
+    """
+    Column indices of the k highest scores in each row, best first.
+
+    argpartition finds the top k in O(n); only those k are then sorted.
+    """
+    n = scores.shape[1]
+    k = min(k, n)
+    if k <= 0:
+        return np.empty((scores.shape[0], 0), dtype=np.int64)
+    if k < n:
+        candidates = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+    else:
+        candidates = np.broadcast_to(np.arange(n), scores.shape).copy()
+    order = np.argsort(-np.take_along_axis(scores, candidates, axis=1), axis=1)
+    return np.take_along_axis(candidates, order, axis=1)
+
+
+def score_rows(queries: np.ndarray, matrix: np.ndarray,
+               chunk_rows: int = config.VECTOR_SCORE_CHUNK_ROWS) -> np.ndarray:
+    """
+    queries @ matrix.T as float32.
+
+    A float16 matrix is upcast one chunk at a time, so a memory-mapped
+    index is never copied into process memory as a whole.
+    """
+    if matrix.dtype == np.float32:
+        return queries @ matrix.T
+    scores = np.empty((queries.shape[0], matrix.shape[0]), dtype=np.float32)
+    for start in range(0, matrix.shape[0], chunk_rows):
+        block = np.asarray(matrix[start:start + chunk_rows], dtype=np.float32)
+        scores[:, start:start + block.shape[0]] = queries @ block.T
+    return scores
+
+
+# ============================================================================
+# Node Bookkeeping
+# ============================================================================
+
+class NodeTable:
+    """
+    Row -> node mapping plus the reverse lookups deletes need.
+
+    Also used by faiss_vector_store.py, whose rows are FAISS ids.
+    Deleted rows hold None so later rows keep their position.
+    """
+
+    def __init__(self):
+        self.nodes: List[Optional[BaseNode]] = []
+        self.row_by_id: Dict[str, int] = {}
+        self.rows_by_ref_doc: Dict[str, List[int]] = {}
+
+    def append(self, nodes: Sequence[Optional[BaseNode]]) -> None:
+        for node in nodes:
+            row = len(self.nodes)
+            self.nodes.append(node)
+            if node is None:
+                continue
+            self.row_by_id[node.node_id] = row
+            if node.ref_doc_id is not None:
+                self.rows_by_ref_doc.setdefault(node.ref_doc_id, []).append(row)
+
+    def get(self, row: int) -> BaseNode:
+        return self.nodes[row]
+
+    def get_many(self, rows: Sequence[int]) -> List[Optional[BaseNode]]:
+        return [self.nodes[row] for row in rows]
+
+    def rows_for_node_ids(self, node_ids: Sequence[str]) -> List[int]:
+        return [self.row_by_id[i] for i in node_ids if i in self.row_by_id]
+
+    def rows_for_ref_docs(self, ref_doc_ids: Sequence[str]) -> List[int]:
+        return [row for ref in ref_doc_ids for row in self.rows_by_ref_doc.get(ref, [])]
+
+    def remove(self, rows: Sequence[int]) -> None:
+        for row in rows:
+            node = self.nodes[row]
+            if node is None:
+                continue
+            self.row_by_id.pop(node.node_id, None)
+            if node.ref_doc_id in self.rows_by_ref_doc:
+                self.rows_by_ref_doc[node.ref_doc_id].remove(row)
+                if not self.rows_by_ref_doc[node.ref_doc_id]:
+                    del self.rows_by_ref_doc[node.ref_doc_id]
+            self.nodes[row] = None
+
+
+class SQLiteNodeTable:
+    """
+    Read-only NodeTable over the nodes.sqlite file of a persisted store.
+
+    Nodes are parsed only when a query returns them, so opening a large
+    index costs nothing up front. Deletes are recorded in memory; the
+    file is never written. Each process and thread opens its own
+    read-only connection.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.removed: set = set()
+        self._local = threading.local()
+
+    def _connection(self) -> sqlite3.Connection:
+        if getattr(self._local, "pid", None) != os.getpid():
+            uri = Path(self.path).resolve().as_uri() + "?mode=ro"
+            self._local.connection = sqlite3.connect(uri, uri=True)
+            self._local.pid = os.getpid()
+        return self._local.connection
+
+    def _select(self, sql: str, values: Sequence[Any]) -> List[tuple]:
+        """Run sql (with one IN (...) placeholder) over values in batches."""
+        results = []
+        for start in range(0, len(values), _SQL_BATCH):
+            batch = list(values[start:start + _SQL_BATCH])
+            placeholders = ",".join("?" * len(batch))
+            results.extend(self._connection().execute(sql.format(placeholders), batch))
+        return results
+
+    def get(self, row: int) -> Optional[BaseNode]:
+        return self.get_many([row])[0]
+
+    def get_many(self, rows: Sequence[int]) -> List[Optional[BaseNode]]:
+        rows = [int(row) for row in rows]
+        found = dict(self._select("SELECT row, node FROM nodes WHERE row IN ({})", rows))
+        return [None if row in self.removed else metadata_dict_to_node(json.loads(found[row]))
+                for row in rows]
+
+    def rows_for_node_ids(self, node_ids: Sequence[str]) -> List[int]:
+        rows = self._select("SELECT row FROM nodes WHERE node_id IN ({})", node_ids)
+        return [row for (row,) in rows if row not in self.removed]
+
+    def rows_for_ref_docs(self, ref_doc_ids: Sequence[str]) -> List[int]:
+        rows = self._select("SELECT row FROM nodes WHERE ref_doc_id IN ({}) ORDER BY row", ref_doc_ids)
+        return [row for (row,) in rows if row not in self.removed]
+
+    def remove(self, rows: Sequence[int]) -> None:
+        self.removed.update(int(row) for row in rows)
+
+
+def _replace_file(target: str, write) -> None:
+    """Call write(tmp_path), then atomically rename the result to target."""
+    tmp_path = f"{target}.{os.getpid()}.tmp"
+    if os.path.exists(tmp_path):
+        os.remove(tmp_path)
+    write(tmp_path)
+    os.replace(tmp_path, target)
+
+
+def _write_matrix(path: str, matrix: np.ndarray) -> None:
+    with open(path, "wb") as f:  # A file object stops np.save appending ".npy"
+        np.save(f, matrix)
+
+
+def _write_nodes(path: str, nodes: Sequence[BaseNode]) -> None:
+    connection = sqlite3.connect(path)
+    try:
+        connection.execute(
+            "CREATE TABLE nodes (row INTEGER PRIMARY KEY, node_id TEXT NOT NULL, "
+            "ref_doc_id TEXT, node TEXT NOT NULL)"
+        )
+        connection.executemany(
+            "INSERT INTO nodes VALUES (?, ?, ?, ?)",
+            ((row, node.node_id, node.ref_doc_id,
+              json.dumps(node_to_metadata_dict(node, remove_text=False, flat_metadata=False)))
+             for row, node in enumerate(nodes))
+        )
+        connection.execute("CREATE INDEX nodes_node_id ON nodes (node_id)")
+        connection.execute("CREATE INDEX nodes_ref_doc_id ON nodes (ref_doc_id)")
+        connection.commit()
+    finally:
+        connection.close()
+
+
+# ============================================================================
+# Vector Store
+# ============================================================================
+
+class NumpyVectorStore(BasePydanticVectorStore):
+    """
+    In-process vector store scored with vectorized NumPy.
+
+    Stores the nodes themselves (stores_text=True), so an index built on
+    it needs no separate docstore. Deleted rows are masked out and
+    reclaimed by compact(). Metadata filters on a query are resolved
+    from a postings index first, so only matching rows are scored.
+
+    A store opened with from_persist_dir() serves queries straight from
+    the mapped file. Its first add() copies it into process memory
+    (copy-on-write); the files on disk are never modified.
+    """
+
+    stores_text: bool = True
+
+    _matrix: Optional[np.ndarray] = PrivateAttr(default=None)  # (capacity, dim) float32 or mapped file
+    _alive: Optional[np.ndarray] = PrivateAttr(default=None)   # (capacity,) bool
+    _size: int = PrivateAttr(default=0)
+    _deleted: int = PrivateAttr(default=0)
+    _table: Any = PrivateAttr(default_factory=NodeTable)  # NodeTable or SQLiteNodeTable
+    _metadata: Optional[MetadataIndex] = PrivateAttr(default_factory=MetadataIndex)
+    _metadata_path: Optional[str] = PrivateAttr(default=None)
+    _lock: Any = PrivateAttr(default_factory=threading.RLock)
+
+    @classmethod
+    def class_name(cls) -> str:
+        return "NumpyVectorStore"
+
+    @property
+    def client(self) -> None:
+        return None
+
+    @property
+    def num_vectors(self) -> int:
+        """Live (not deleted) vectors in the store."""
+        return self._size - self._deleted
+
+    @property
+    def dim(self) -> Optional[int]:
+        return None if self._matrix is None else self._matrix.shape[1]
+
+    # ------------------------------------------------------------------
+    # Writes
+    # ------------------------------------------------------------------
+
+    def _metadata_index(self) -> MetadataIndex:
+        """Metadata postings; a store opened from disk loads them on first use."""
+        if self._metadata is None:
+            if self._metadata_path and os.path.exists(self._metadata_path):
+                with open(self._metadata_path) as f:
+                    self._metadata = MetadataIndex.from_dict(json.load(f))
+            else:
+                self._metadata = MetadataIndex()
+                self._metadata.add(self._table.get_many(range(self._size)))
+        return self._metadata
+
+    def _materialize(self) -> None:
+        """Copy a loaded store's matrix and nodes into memory so it can grow."""
+        if not isinstance(self._table, SQLiteNodeTable):
+            return
+        nodes = self._table.get_many(range(self._size))
+        self._matrix = np.array(self._matrix[:self._size], dtype=np.float32)
+        self._alive = self._alive[:self._size].copy()
+        self._table = NodeTable()
+        self._table.append(nodes)
+
+    def _reserve(self, extra: int, dim: int) -> None:
+        """Grow the matrix geometrically so appends are amortized O(1) per row."""
+        if self._matrix is None:
+            capacity = max(_MIN_CAPACITY, extra)
+            self._matrix = np.zeros((capacity, dim), dtype=np.float32)
+            self._alive = np.zeros(capacity, dtype=bool)
+            return
+        if self._matrix.shape[1] != dim:
+            raise ValueError(f"Embedding dimension {dim} does not match store dimension {self._matrix.shape[1]}")
+        needed = self._size + extra
+        if needed <= self._matrix.shape[0]:
+            return
+        capacity = max(needed, 2 * self._matrix.shape[0])
+        matrix = np.zeros((capacity, dim), dtype=np.float32)
+        matrix[:self._size] = self._matrix[:self._size]
+        alive = np.zeros(capacity, dtype=bool)
+        alive[:self._size] = self._alive[:self._size]
+        self._matrix, self._alive = matrix, alive
+
+    def add(self, nodes: Sequence[BaseNode], embeddings: Optional[np.ndarray] = None,
+            **add_kwargs: Any) -> List[str]:
+        """
+        Append nodes, which must carry embeddings unless embeddings (one row
+        per node) is given; an array avoids building a Python list per node.
+        """
+        if not nodes:
+            return []
+        if embeddings is None:
+            embeddings = [node.get_embedding() for node in nodes]
+        elif len(embeddings) != len(nodes):
+            raise ValueError(f"Got {len(embeddings)} embeddings for {len(nodes)} nodes")
+        vectors = normalize_rows(np.array(embeddings, dtype=np.float32, ndmin=2))
+        with self._lock:
+            self._materialize()
+            self._reserve(len(nodes), vectors.shape[1])
+            start, end = self._size, self._size + len(nodes)
+            self._matrix[start:end] = vectors
+            self._alive[start:end] = True
+            self._table.append(nodes)
+            self._metadata_index().add(nodes)
+            self._size = end
+        return [node.node_id for node in nodes]
+
+    def _remove_rows(self, rows: Sequence[int]) -> None:
+        rows = [row for row in rows if self._alive[row]]
+        if not rows:
+            return
+        self._alive[rows] = False
+        self._table.remove(rows)
+        self._deleted += len(rows)
+
+    def delete(self, ref_doc_id: str, **delete_kwargs: Any) -> None:
+        """Delete every node that came from ref_doc_id."""
+        with self._lock:
+            self._remove_rows(self._table.rows_for_ref_docs([ref_doc_id]))
+
+    def delete_nodes(self, node_ids: Optional[List[str]] = None,
+                     filters: Optional[MetadataFilters] = None, **delete_kwargs: Any) -> None:
+        """Delete nodes matching node_ids and/or filters (both must match if both are given)."""
+        with self._lock:
+            if filters is None:
+                self._remove_rows(self._table.rows_for_node_ids(node_ids or []))
+                return
+            mask = self._metadata_index().mask(filters, self._size)
+            if node_ids is not None:
+                mask &= self._rows_mask(self._table.rows_for_node_ids(node_ids))
+            self._remove_rows(np.flatnonzero(mask))
+
+    def clear(self) -> None:
+        with self._lock:
+            self._matrix = self._alive = None
+            self._size = self._deleted = 0
+            self._table = NodeTable()
+            self._metadata = MetadataIndex()
+            self._metadata_path = None
+
+    def compact(self) -> None:
+        """Drop deleted rows, shrinking the matrix to the live vectors."""
+        with self._lock:
+            if not self._deleted:
+                return
+            rows = np.flatnonzero(self._alive[:self._size])
+            nodes = self._table.get_many(rows)
+            matrix = np.asarray(self._matrix[rows], dtype=np.float32)
+            self.clear()
+            self._reserve(len(rows), matrix.shape[1])
+            self._matrix[:len(rows)] = matrix
+            self._alive[:len(rows)] = True
+            self._table.append(nodes)
+            self._metadata.add(nodes)
+            self._size = len(rows)
+
+    # ------------------------------------------------------------------
+    # Queries
+    # ------------------------------------------------------------------
+
+    def _candidate_rows(self, query: Optional[VectorStoreQuery]) -> Optional[np.ndarray]:
+        """
+        Rows a query may return, or None for "every live row".
+
+        Restricting candidates here means only that subset is scored.
+        Deleted rows alone do not restrict: the whole matrix is scored and
+        they are masked, which avoids copying it.
+        """
+        alive = self._alive[:self._size]
+        masks = []
+        if query is not None and query.node_ids:
+            masks.append(self._rows_mask(self._table.rows_for_node_ids(query.node_ids)))
+        if query is not None and query.doc_ids:
+            masks.append(self._rows_mask(self._table.rows_for_ref_docs(query.doc_ids)))
+        if query is not None and query.filters is not None:
+            masks.append(self._metadata_index().mask(query.filters, self._size))
+        if not masks:
+            return None
+        return np.flatnonzero(np.logical_and.reduce(masks) & alive)
+
+    def _rows_mask(self, rows: Sequence[int]) -> np.ndarray:
+        mask = np.zeros(self._size, dtype=bool)
+        mask[np.asarray(rows, dtype=np.int64)] = True
+        return mask
+
+    def _search(self, embeddings: Sequence[Sequence[float]], similarity_top_k: int,
+                query: Optional[VectorStoreQuery] = None) -> List[VectorStoreQueryResult]:
+        if len(embeddings) == 0:
+            return []
+        # Take a consistent snapshot, then score outside the lock: NumPy
+        # releases the GIL, so concurrent queries run in parallel
+        with self._lock:
+            if self._matrix is None or self.num_vectors == 0:
+                return [VectorStoreQueryResult(nodes=[], similarities=[], ids=[]) for _ in embeddings]
+            rows = self._candidate_rows(query)
+            if rows is None:
+                matrix = self._matrix[:self._size]
+                dead = np.flatnonzero(~self._alive[:self._size]) if self._deleted else None
+                similarity_top_k = min(similarity_top_k, self.num_vectors)
+            else:
+                matrix, dead = self._matrix[rows], None
+            table = self._table
+
+        queries = normalize_rows(np.array(embeddings, dtype=np.float32, ndmin=2))
+        scores = score_rows(queries, matrix)
+        if dead is not None:
+            scores[:, dead] = -np.inf
+        top = top_k_rows(scores, similarity_top_k)
+
+        # Resolve nodes under the lock: rows deleted while we were scoring
+        # now read as None and are dropped from the results
+        with self._lock:
+            hit_nodes = [table.get_many(columns if rows is None else rows[columns]) for columns in top]
+
+        results = []
+        for query_scores, columns, nodes in zip(scores, top, hit_nodes):
+            kept = [(node, float(score)) for node, score in zip(nodes, query_scores[columns])
+                    if node is not None]
+            results.append(VectorStoreQueryResult(
+                nodes=[node for node, _ in kept],
+                similarities=[score for _, score in kept],
+                ids=[node.node_id for node, _ in kept]
+            ))
+        return results
+
+    def query(self, query: VectorStoreQuery, **kwargs: Any) -> VectorStoreQueryResult:
+        """Top similarity_top_k nodes by cosine similarity (dense mode only)."""
+        if query.mode != VectorStoreQueryMode.DEFAULT:
+            raise ValueError(f"NumpyVectorStore supports only the default query mode, not {query.mode}")
+        if query.query_embedding is None:
+            raise ValueError("NumpyVectorStore needs a query embedding")
+        return self._search([query.query_embedding], query.similarity_top_k, query)[0]
+
+    def query_batch(self, query_embeddings: Sequence[Sequence[float]],
+                    similarity_top_k: int = 2) -> List[VectorStoreQueryResult]:
+        """Answer many queries with one matrix-matrix product; results in input order."""
+        return self._search(query_embeddings, similarity_top_k)
+
+    # ------------------------------------------------------------------
+    # Persistence
+    # ------------------------------------------------------------------
+
+    def persist(self, persist_path: str, fs=None, dtype: str = config.VECTOR_STORE_DTYPE) -> None:
+        """
+        Write the live vectors to a directory: embeddings.npy, nodes.sqlite,
+        metadata.json (filter postings) and store.json.
+
+        dtype is "float32" or "float16" (half the size, scores differ by
+        ~1e-3). Files are written under temporary names and renamed into
+        place, so processes that have the old files mapped keep working.
+        """
+        if np.dtype(dtype) not in (np.float32, np.float16):
+            raise ValueError(f"dtype must be float32 or float16, not {dtype}")
+        os.makedirs(persist_path, exist_ok=True)
+        with self._lock:
+            rows = np.flatnonzero(self._alive[:self._size]) if self._matrix is not None else []
+            matrix = np.empty((0, 0), dtype=dtype) if self._matrix is None else \
+                np.asarray(self._matrix[rows], dtype=dtype)
+            nodes = self._table.get_many(rows)
+
+        manifest = {"format_version": _FORMAT_VERSION, "count": matrix.shape[0],
+                    "dim": matrix.shape[1], "dtype": np.dtype(dtype).name}
+        # The manifest goes last: readers check the other files against it
+        _replace_file(os.path.join(persist_path, MATRIX_FILE), lambda path: _write_matrix(path, matrix))
+        _replace_file(os.path.join(persist_path, NODES_FILE), lambda path: _write_nodes(path, nodes))
+        metadata = MetadataIndex()
+        metadata.add(nodes)
+        _replace_file(os.path.join(persist_path, METADATA_FILE),
+                      lambda path: Path(path).write_text(json.dumps(metadata.to_dict())))
+        _replace_file(os.path.join(persist_path, MANIFEST_FILE),
+                      lambda path: Path(path).write_text(json.dumps(manifest)))
+
+    @classmethod
+    def from_persist_dir(cls, persist_dir: str, mmap: bool = True) -> "NumpyVectorStore":
+        """
+        Open a persisted store without parsing its nodes.
+
+        With mmap=True the matrix is memory-mapped read-only: only pages
+        touched by queries are read, and they live in the shared page
+        cache rather than each process's private memory. With mmap=False
+        the matrix is read into memory as float32.
+        """
+        with open(os.path.join(persist_dir, MANIFEST_FILE)) as f:
+            manifest = json.load(f)
+        if manifest.get("format_version") != _FORMAT_VERSION:
+            raise ValueError(f"Unsupported store format in {persist_dir}: {manifest.get('format_version')}")
+
+        store = cls()
+        count = manifest["count"]
+        if count == 0:
+            return store
+        matrix = np.load(os.path.join(persist_dir, MATRIX_FILE), mmap_mode="r" if mmap else None)
+        if matrix.shape != (count, manifest["dim"]):
+            raise ValueError(f"{MATRIX_FILE} in {persist_dir} does not match {MANIFEST_FILE} "
+                             "(was it rewritten while loading?)")
+        store._matrix = matrix if mmap else matrix.astype(np.float32)
+        store._alive = np.ones(count, dtype=bool)
+        store._size = count
+        store._table = SQLiteNodeTable(os.path.join(persist_dir, NODES_FILE))
+        store._metadata = None
+        store._metadata_path = os.path.join(persist_dir, METADATA_FILE)
+        return store
@@ -0,0 +1,155 @@
+"""
+Parallel Map-Reduce Response Synthesis for LlamaIndex
+Shared helper used by the Unit 6 RAG examples
+
+The "compact" and "refine" response modes walk through the retrieved
+chunks one LLM call after another, so latency grows with similarity_top_k.
+MapReduceSynthesizer answers each group of chunks concurrently (map) and
+combines the partial answers in one final call (reduce), so synthesis
+costs roughly two LLM calls regardless of top_k.
+
+It is a regular response synthesizer: query engines return the same
+Response (with source_nodes) as in compact mode, and streaming works.
+
+Usage:
+    query_engine = index.as_query_engine(
+        similarity_top_k=10,
+        response_synthesizer=MapReduceSynthesizer(max_concurrency=4)
+    )
+"""
+
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, List, Optional, Sequence
+
+from llama_index.core.prompts import BasePromptTemplate, PromptTemplate
+from llama_index.core.prompts.default_prompt_selectors import DEFAULT_TEXT_QA_PROMPT_SEL
+from llama_index.core.response_synthesizers import BaseSynthesizer
+from llama_index.core.types import RESPONSE_TEXT_TYPE
+
+import config
+
+DEFAULT_REDUCE_PROMPT = PromptTemplate(
+    "Partial answers to the same query, each written from a different part of the context, are below.\n"
+    "---------------------\n"
+    "{context_str}\n"
+    "---------------------\n"
+    "Combine them into one consistent answer to the query. Ignore partial answers that say the "
+    "context does not contain the information, and do not add facts that are not in them.\n"
+    "Query: {query_str}\n"
+    "Answer: "
+)
+
+
+class MapReduceSynthesizer(BaseSynthesizer):
+    """
+    Answer per group of chunks concurrently, then reduce once.
+
+    Chunks are grouped chunks_per_map at a time (groups that overflow the
+    context window are split further). Input that fits one group is
+    answered with a single text-QA call, exactly like compact mode. If
+    the partial answers themselves overflow the context window they are
+    reduced in concurrent rounds until one call remains.
+
+    Args:
+        text_qa_template: prompt for the map calls (defaults to compact's)
+        reduce_template: prompt combining partial answers ({context_str}, {query_str})
+        chunks_per_map: chunks answered together per map call
+        max_concurrency: LLM calls in flight at once
+    """
+
+    def __init__(self, llm=None, text_qa_template: Optional[BasePromptTemplate] = None,
+                 reduce_template: Optional[BasePromptTemplate] = None,
+                 chunks_per_map: int = config.SYNTHESIS_CHUNKS_PER_MAP,
+                 max_concurrency: int = config.SYNTHESIS_MAX_CONCURRENCY, **kwargs):
+        super().__init__(llm=llm, **kwargs)
+        self._text_qa_template = text_qa_template or DEFAULT_TEXT_QA_PROMPT_SEL
+        self._reduce_template = reduce_template or DEFAULT_REDUCE_PROMPT
+        self._chunks_per_map = chunks_per_map
+        self._max_concurrency = max_concurrency
+
+    def _get_prompts(self) -> dict:
+        return {"text_qa_template": self._text_qa_template, "reduce_template": self._reduce_template}
+
+    def _update_prompts(self, prompts: dict) -> None:
+        if "text_qa_template" in prompts:
+            self._text_qa_template = prompts["text_qa_template"]
+        if "reduce_template" in prompts:
+            self._reduce_template = prompts["reduce_template"]
+
+    # ------------------------------------------------------------------
+    # Packing
+    # ------------------------------------------------------------------
+
+    def _map_inputs(self, text_chunks: Sequence[str]) -> List[str]:
+        """Groups of chunks_per_map chunks, each repacked to fit the context window."""
+        groups = []
+        for start in range(0, len(text_chunks), self._chunks_per_map):
+            group = list(text_chunks[start:start + self._chunks_per_map])
+            groups.extend(self._prompt_helper.repack(self._text_qa_template, group, llm=self._llm))
+        return groups
+
+    def _reduce_inputs(self, answers: Sequence[str]) -> List[str]:
+        numbered = [f"Partial answer {i}:\n{answer}" for i, answer in enumerate(answers, 1)]
+        return self._prompt_helper.repack(self._reduce_template, numbered, llm=self._llm)
+
+    # ------------------------------------------------------------------
+    # Sync
+    # ------------------------------------------------------------------
+
+    def _final(self, template: BasePromptTemplate, context: str, query_str: str,
+               **response_kwargs: Any) -> RESPONSE_TEXT_TYPE:
+        if self._streaming:
+            return self._llm.stream(template, context_str=context, query_str=query_str, **response_kwargs)
+        return self._llm.predict(template, context_str=context, query_str=query_str, **response_kwargs)
+
+    def get_response(self, query_str: str, text_chunks: Sequence[str],
+                     **response_kwargs: Any) -> RESPONSE_TEXT_TYPE:
+        groups = self._map_inputs(text_chunks)
+        if len(groups) <= 1:
+            return self._final(self._text_qa_template, groups[0] if groups else "", query_str,
+                               **response_kwargs)
+
+        def call(template: BasePromptTemplate, context: str) -> str:
+            return self._llm.predict(template, context_str=context, query_str=query_str, **response_kwargs)
+
+        with ThreadPoolExecutor(max_workers=min(self._max_concurrency, len(groups))) as pool:
+            answers = list(pool.map(lambda group: call(self._text_qa_template, group), groups))
+            packs = self._reduce_inputs(answers)
+            while len(packs) > 1:
+                answers = list(pool.map(lambda pack: call(self._reduce_template, pack), packs))
+                packs = self._reduce_inputs(answers)
+        return self._final(self._reduce_template, packs[0], query_str, **response_kwargs)
+
+    # ------------------------------------------------------------------
+    # Async
+    # ------------------------------------------------------------------
+
+    async def _afinal(self, template: BasePromptTemplate, context: str, query_str: str,
+                      **response_kwargs: Any) -> RESPONSE_TEXT_TYPE:
+        if self._streaming:
+            return await self._llm.astream(template, context_str=context, query_str=query_str,
+                                           **response_kwargs)
+        return await self._llm.apredict(template, context_str=context, query_str=query_str,
+                                        **response_kwargs)
+
+    async def aget_response(self, query_str: str, text_chunks: Sequence[str],
+                            **response_kwargs: Any) -> RESPONSE_TEXT_TYPE:
+        groups = self._map_inputs(text_chunks)
+        if len(groups) <= 1:
+            return await self._afinal(self._text_qa_template, groups[0] if groups else "", query_str,
+                                      **response_kwargs)
+
+        semaphore = asyncio.Semaphore(self._max_concurrency)
+
+        async def call(template: BasePromptTemplate, context: str) -> str:
+            async with semaphore:
+                return await self._llm.apredict(template, context_str=context, query_str=query_str,
+                                                **response_kwargs)
+
+        answers = await asyncio.gather(*(call(self._text_qa_template, group) for group in groups))
+        packs = self._reduce_inputs(answers)
+        while len(packs) > 1:
+            answers = await asyncio.gather(*(call(self._reduce_template, pack) for pack in packs))
+            packs = self._reduce_inputs(answers)
+        return await self._afinal(self._reduce_template, packs[0], query_str, **response_kwargs)
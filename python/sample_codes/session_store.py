@@ -0,0 +1,273 @@
+"""
+Bounded Session Store for RunnableWithMessageHistory
+Shared helper used by the memory examples in Units 1 and 3
+
+The examples keep chat histories in a plain dict that grows by one entry per
+session_id forever. SessionStore bounds that memory:
+
+- max_sessions / max_bytes: least recently used sessions are evicted
+- idle_ttl: sessions untouched for this many seconds expire
+- spill_dir (optional): evicted sessions are written to disk and restored
+  transparently the next time the session is used
+- history_factory (optional): history class to create per session, e.g. a
+  token-budgeted history from chat_history.py
+
+A history handed out is never silently orphaned: if it is evicted while a
+request still holds it, the request's later writes put it back (or, if the
+session was restored meanwhile, are forwarded to the restored copy).
+
+Usage:
+    store = SessionStore(max_sessions=1000, idle_ttl=3600)
+    conversation = RunnableWithMessageHistory(chain, store.get_session_history, ...)
+    print(store.stats())
+"""
+
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from functools import partial
+from typing import Callable, Optional
+
+from langchain_core.chat_history import InMemoryChatMessageHistory
+from langchain_core.messages import BaseMessage, messages_from_dict, messages_to_dict
+from pydantic import PrivateAttr
+
+import config
+
+_MESSAGE_OVERHEAD_BYTES = 64  # Rough per-message cost beyond the content itself
+
+
+def estimate_message_bytes(message: BaseMessage) -> int:
+    """Approximate memory used by one message (content + fixed overhead)."""
+    content = message.content
+    if not isinstance(content, str):
+        content = json.dumps(content, default=str)
+    return len(content.encode("utf-8")) + _MESSAGE_OVERHEAD_BYTES
+
+
+class TrackedChatMessageHistory(InMemoryChatMessageHistory):
+    """
+    InMemoryChatMessageHistory that keeps a running byte-size estimate.
+
+    Subclasses change size_bytes only through _resize(), which also reports
+    the change to the owning SessionStore.
+    """
+
+    size_bytes: int = 0
+
+    # Set by SessionStore: called as (history, size delta, added message or None)
+    _on_change: Optional[Callable] = PrivateAttr(default=None)
+
+    def _resize(self, delta: int, added: Optional[BaseMessage] = None) -> None:
+        self.size_bytes += delta
+        if self._on_change is not None:
+            self._on_change(self, delta, added)
+
+    def add_message(self, message: BaseMessage) -> None:
+        super().add_message(message)
+        self._resize(estimate_message_bytes(message), added=message)
+
+    def add_messages(self, messages) -> None:
+        for message in messages:
+            self.add_message(message)
+
+    def clear(self) -> None:
+        super().clear()
+        self._resize(-self.size_bytes)
+
+
+class SessionStore:
+    """
+    LRU- and TTL-bounded map of session_id -> chat history.
+
+    Pass store.get_session_history as the factory to RunnableWithMessageHistory.
+    The in-memory byte total is updated as histories grow and shrink, so
+    memory_bytes() and the limit checks never walk all sessions.
+    """
+
+    def __init__(self, max_sessions: int = config.SESSION_MAX_SESSIONS,
+                 max_bytes: int = config.SESSION_MAX_BYTES,
+                 idle_ttl: Optional[float] = config.SESSION_IDLE_TTL,
+                 spill_dir: Optional[str] = None,
+                 history_factory: Callable[[], TrackedChatMessageHistory] = TrackedChatMessageHistory):
+        self.max_sessions = max_sessions
+        self.max_bytes = max_bytes
+        self.idle_ttl = idle_ttl
+        self.spill_dir = spill_dir
+        self.history_factory = history_factory
+        if spill_dir:
+            os.makedirs(spill_dir, exist_ok=True)
+
+        # session_id -> (history, last_access); ordered oldest -> newest access
+        self._sessions: "OrderedDict[str, list]" = OrderedDict()
+        self._memory_bytes = 0
+        self._lock = threading.RLock()
+        self._counters = {"hits": 0, "misses": 0, "evictions": 0,
+                          "expirations": 0, "spills": 0, "restores": 0, "reattached": 0}
+
+    # ------------------------------------------------------------------
+    # Public API
+    # ------------------------------------------------------------------
+
+    def get_session_history(self, session_id: str) -> TrackedChatMessageHistory:
+        """Return the history for session_id, restoring or creating it as needed."""
+        now = time.monotonic()
+        with self._lock:
+            self._expire_idle(now)
+
+            entry = self._sessions.get(session_id)
+            if entry is not None:
+                self._counters["hits"] += 1
+                entry[1] = now
+                self._sessions.move_to_end(session_id)
+                history = entry[0]
+            else:
+                self._counters["misses"] += 1
+                history = self._restore(session_id)
+                if history is None:
+                    history = self.history_factory()
+                history._on_change = partial(self._history_changed, session_id)
+                self._insert(session_id, history, now)
+
+            # Histories grow after being handed out, so enforce limits on every access
+            self._enforce_limits(keep=session_id)
+            return history
+
+    def __contains__(self, session_id: str) -> bool:
+        with self._lock:
+            return session_id in self._sessions
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._sessions)
+
+    def delete(self, session_id: str) -> None:
+        """Forget a session, including any spilled copy."""
+        with self._lock:
+            if session_id in self._sessions:
+                history = self._remove(session_id)
+                history._on_change = None  # Late writes must not bring it back
+            self._discard_spill(session_id)
+
+    def memory_bytes(self) -> int:
+        """Estimated bytes held by in-memory histories."""
+        with self._lock:
+            return self._memory_bytes
+
+    def stats(self) -> dict:
+        """Session count, memory estimate and hit/eviction/spill counters."""
+        with self._lock:
+            return {
+                "sessions": len(self._sessions),
+                "memory_bytes": self.memory_bytes(),
+                "max_sessions": self.max_sessions,
+                "max_bytes": self.max_bytes,
+                **self._counters,
+            }
+
+    # ------------------------------------------------------------------
+    # Bookkeeping
+    # ------------------------------------------------------------------
+
+    def _insert(self, session_id: str, history: TrackedChatMessageHistory, now: float) -> None:
+        self._sessions[session_id] = [history, now]
+        self._memory_bytes += history.size_bytes
+
+    def _remove(self, session_id: str) -> TrackedChatMessageHistory:
+        history, _ = self._sessions.pop(session_id)
+        self._memory_bytes -= history.size_bytes
+        return history
+
+    def _history_changed(self, session_id: str, history: TrackedChatMessageHistory,
+                         delta: int, added: Optional[BaseMessage]) -> None:
+        """Account a size change; re-attach a history written to after eviction."""
+        with self._lock:
+            entry = self._sessions.get(session_id)
+            if entry is not None and entry[0] is history:
+                self._memory_bytes += delta
+                return
+            if added is None:
+                return  # Trimmed after eviction: nothing held here changed
+            if entry is None:
+                # A request still held it when it was evicted. It has every
+                # message the spilled copy has, and more, so it replaces it
+                self._discard_spill(session_id)
+                self._insert(session_id, history, time.monotonic())
+                self._counters["reattached"] += 1
+                self._enforce_limits(keep=session_id)
+                return
+            current = entry[0]
+        # Restored or recreated since: the live copy gets the message too
+        # (outside our lock, as the history may take its own)
+        current.add_message(added)
+
+    # ------------------------------------------------------------------
+    # Eviction
+    # ------------------------------------------------------------------
+
+    def _expire_idle(self, now: float) -> None:
+        """Drop sessions idle longer than idle_ttl (oldest are at the front)."""
+        if self.idle_ttl is None:
+            return
+        while self._sessions:
+            session_id, (history, last_access) = next(iter(self._sessions.items()))
+            if now - last_access <= self.idle_ttl:
+                break
+            self._remove(session_id)
+            self._counters["expirations"] += 1
+
+    def _enforce_limits(self, keep: str) -> None:
+        """Evict LRU sessions (never `keep`) until both limits hold."""
+        for session_id in list(self._sessions):
+            if len(self._sessions) <= self.max_sessions and self._memory_bytes <= self.max_bytes:
+                break
+            if session_id == keep:
+                continue
+            history = self._remove(session_id)
+            self._counters["evictions"] += 1
+            self._spill(session_id, history)
+
+    # ------------------------------------------------------------------
+    # Spill to disk
+    # ------------------------------------------------------------------
+
+    def _spill_path(self, session_id: str) -> Optional[str]:
+        if not self.spill_dir:
+            return None
+        name = hashlib.sha256(session_id.encode("utf-8")).hexdigest()
+        return os.path.join(self.spill_dir, f"{name}.json")
+
+    def _discard_spill(self, session_id: str) -> None:
+        path = self._spill_path(session_id)
+        if path and os.path.exists(path):
+            os.remove(path)
+
+    def _spill(self, session_id: str, history: TrackedChatMessageHistory) -> None:
+        path = self._spill_path(session_id)
+        if not path or not history.messages:
+            return
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "w") as f:
+            json.dump({"session_id": session_id, "messages": messages_to_dict(history.messages)}, f)
+        os.replace(tmp_path, path)
+        self._counters["spills"] += 1
+
+    def _restore(self, session_id: str) -> Optional[TrackedChatMessageHistory]:
+        path = self._spill_path(session_id)
+        if not path or not os.path.exists(path):
+            return None
+        # A spilled session that has been idle too long has expired as well
+        if self.idle_ttl is not None and time.time() - os.path.getmtime(path) > self.idle_ttl:
+            os.remove(path)
+            self._counters["expirations"] += 1
+            return None
+        with open(path) as f:
+            data = json.load(f)
+        os.remove(path)
+        history = self.history_factory()
+        history.add_messages(messages_from_dict(data["messages"]))
+        self._counters["restores"] += 1
+        return history
@@ -0,0 +1,209 @@
+"""
+Streaming Instrumentation
+Shared helper used by the streaming examples in Units 3 and 6
+
+Wraps any token stream (LangChain chain.stream(), LlamaIndex response_gen,
+...) without changing what it yields, and records per stream:
+time-to-first-token (TTFT), inter-token latency distribution, total tokens
+and tokens/sec. Each stream emits structured events as it runs, and the
+collector aggregates all streams into p50/p95/p99 summaries.
+
+Usage:
+    metrics = StreamMetrics(on_event=print)
+    for chunk in metrics.track(chain.stream(inputs), name="story"):
+        print(chunk.content, end="")
+    print_summary(metrics.summary())
+"""
+
+import threading
+import time
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional
+
+from benchmark import percentile
+
+# ============================================================================
+# Chunk Helpers
+# ============================================================================
+
+def chunk_text(chunk: Any) -> str:
+    """Text carried by one streamed chunk (str, message chunk or LlamaIndex delta)."""
+    if isinstance(chunk, str):
+        return chunk
+    content = getattr(chunk, "content", None)
+    if isinstance(content, str):
+        return content
+    delta = getattr(chunk, "delta", None)
+    if isinstance(delta, str):
+        return delta
+    return ""
+
+
+def _usage_tokens(chunk: Any) -> Optional[int]:
+    """Output token count reported by the server on a chunk, if any."""
+    usage = getattr(chunk, "usage_metadata", None)
+    if usage and usage.get("output_tokens"):
+        return usage["output_tokens"]
+    return None
+
+
+# ============================================================================
+# Stream Collector
+# ============================================================================
+
+class StreamMetrics:
+    """
+    Collects timing for every stream passed through track().
+
+    Args:
+        on_event: called with a dict for each event:
+            stream_start, first_token, stream_end (carries the stream's
+            metrics) and stream_error
+        keep_gaps: keep raw inter-token gaps per stream (needed for the
+            pooled inter-token percentiles in summary())
+    """
+
+    def __init__(self, on_event: Optional[Callable[[dict], None]] = None,
+                 keep_gaps: bool = True):
+        self.on_event = on_event
+        self.keep_gaps = keep_gaps
+        self.streams: List[dict] = []
+        self._lock = threading.Lock()
+
+    def _emit(self, event: str, record: dict, **fields) -> None:
+        if self.on_event is not None:
+            self.on_event({"event": event, "stream": record["name"],
+                           "timestamp": time.time(), **fields})
+
+    def track(self, stream: Iterable[Any], name: str = "stream",
+              start: Optional[float] = None) -> Iterator[Any]:
+        """
+        Yield every chunk of stream unchanged while timing it.
+
+        start is a time.perf_counter() value to measure TTFT from; pass it
+        when work before the stream (e.g. retrieval) belongs to the
+        user-perceived wait. It defaults to the moment iteration begins.
+
+        Stopping early (break, or closing the generator) is a normal finish:
+        the stream is recorded as ok with truncated=True.
+        """
+        record = {"name": name, "ok": False, "truncated": False, "error": None, "ttft": None,
+                  "latency": None, "tokens": 0, "chunks": 0, "characters": 0,
+                  "tokens_per_second": None, "itl_mean": None, "itl_p50": None,
+                  "itl_p95": None, "itl_p99": None, "itl_max": None, "gaps": []}
+        gaps = []
+        usage_tokens = None
+        last = None
+
+        if start is None:
+            start = time.perf_counter()
+        self._emit("stream_start", record)
+        try:
+            for chunk in stream:
+                now = time.perf_counter()
+                text = chunk_text(chunk)
+                if text:
+                    if last is None:
+                        record["ttft"] = now - start
+                        self._emit("first_token", record, ttft=record["ttft"])
+                    else:
+                        gaps.append(now - last)
+                    last = now
+                    record["chunks"] += 1
+                    record["characters"] += len(text)
+                usage_tokens = _usage_tokens(chunk) or usage_tokens
+                yield chunk
+            record["ok"] = True
+        except GeneratorExit:
+            # Consumer stopped reading; stop the underlying stream too
+            record["ok"] = record["truncated"] = True
+            close = getattr(stream, "close", None)
+            if close is not None:
+                close()
+            raise
+        except Exception as e:
+            record["error"] = f"{type(e).__name__}: {e}"
+            self._emit("stream_error", record, error=record["error"])
+            raise
+        finally:
+            record["latency"] = time.perf_counter() - start
+            # Prefer the server's token count; fall back to chunks (~1 token each)
+            record["tokens"] = usage_tokens or record["chunks"]
+            # The first token closes the TTFT window, so the rate counts the ones after it
+            if (record["ttft"] is not None and record["tokens"] > 1
+                    and record["latency"] > record["ttft"]):
+                generation_time = record["latency"] - record["ttft"]
+                record["tokens_per_second"] = (record["tokens"] - 1) / generation_time
+            if gaps:
+                record["itl_mean"] = sum(gaps) / len(gaps)
+                record["itl_p50"] = percentile(gaps, 50)
+                record["itl_p95"] = percentile(gaps, 95)
+                record["itl_p99"] = percentile(gaps, 99)
+                record["itl_max"] = max(gaps)
+            if self.keep_gaps:
+                record["gaps"] = gaps
+
+            with self._lock:
+                self.streams.append(record)
+            if record["ok"]:
+                self._emit("stream_end", record, **{k: v for k, v in record.items()
+                                                     if k not in ("name", "gaps")})
+
+    def summary(self) -> Dict[str, Any]:
+        """Aggregate over all finished streams."""
+        with self._lock:
+            streams = list(self.streams)
+        ok = [s for s in streams if s["ok"]]
+        ttfts = [s["ttft"] for s in ok if s["ttft"] is not None]
+        latencies = [s["latency"] for s in ok]
+        gaps = [gap for s in ok for gap in s["gaps"]]
+        generated = [s for s in ok if s["ttft"] is not None and s["tokens"] > 1]
+        generation_time = sum(s["latency"] - s["ttft"] for s in generated)
+        tokens = sum(s["tokens"] - 1 for s in generated)
+
+        return {
+            "streams": len(streams),
+            "errors": len(streams) - len(ok),
+            "ttft_p50": percentile(ttfts, 50),
+            "ttft_p95": percentile(ttfts, 95),
+            "ttft_p99": percentile(ttfts, 99),
+            "latency_p50": percentile(latencies, 50),
+            "latency_p95": percentile(latencies, 95),
+            "itl_p50": percentile(gaps, 50),
+            "itl_p95": percentile(gaps, 95),
+            "itl_p99": percentile(gaps, 99),
+            "tokens": sum(s["tokens"] for s in ok),
+            "tokens_per_second": tokens / generation_time if generation_time > 0 else None,
+        }
+
+    def reset(self) -> None:
+        with self._lock:
+            self.streams.clear()
+
+
+# ============================================================================
+# Reporting
+# ============================================================================
+
+def _ms(value: Optional[float]) -> str:
+    return "-" if value is None else f"{value * 1000:.0f} ms"
+
+
+def print_stream_stats(record: dict) -> None:
+    """One-line report for a single stream."""
+    rate = record["tokens_per_second"]
+    print(f"[{record['name']}] TTFT {_ms(record['ttft'])}, total {_ms(record['latency'])}, "
+          f"{record['tokens']} tokens, "
+          f"{'-' if rate is None else f'{rate:.1f}'} tok/s, "
+          f"inter-token p50 {_ms(record['itl_p50'])} / p95 {_ms(record['itl_p95'])}")
+
+
+def print_summary(summary: Dict[str, Any]) -> None:
+    """Multi-line report of StreamMetrics.summary()."""
+    rate = summary["tokens_per_second"]
+    print(f"Streams: {summary['streams']} ({summary['errors']} errors), {summary['tokens']} tokens")
+    print(f"  TTFT        p50 {_ms(summary['ttft_p50'])}  p95 {_ms(summary['ttft_p95'])}  "
+          f"p99 {_ms(summary['ttft_p99'])}")
+    print(f"  Inter-token p50 {_ms(summary['itl_p50'])}  p95 {_ms(summary['itl_p95'])}  "
+          f"p99 {_ms(summary['itl_p99'])}")
+    print(f"  Latency     p50 {_ms(summary['latency_p50'])}  p95 {_ms(summary['latency_p95'])}")
+    print(f"  Throughput  {'-' if rate is None else f'{rate:.1f}'} tokens/sec")
@@ -28,7 +28,7 @@ def example_1_basic_ollama():
     print("=" * 60)
     
     # Initialize Ollama with primary model from config
-    llm = ChatOllama(model=config.PRIMARY_LLM_MODEL, temperature=config.CREATIVE_TEMPERATURE)
+    llm = ChatOllama(model=config.PRIMARY_LLM_MODEL, temperature=config.CREATIVE_TEMPERATURE, base_url=config.OLLAMA_BASE_URL)
     
     # Simple query
     prompt = "Explain what an AI agent is in one sentence."
@@ -94,7 +94,7 @@ def example_2_tools():
 
 from langchain_core.prompts import ChatPromptTemplate, MessagesPlaceholder
 from langchain_core.runnables.history import RunnableWithMessageHistory
-from langchain_core.chat_history import InMemoryChatMessageHistory
+from session_store import SessionStore
 
 def example_3_memory():
     """
@@ -104,7 +104,7 @@ def example_3_memory():
     print("Example 3: Memory System")
     print("=" * 60)
     
-    llm = ChatOllama(model=config.PRIMARY_LLM_MODEL, temperature=config.CREATIVE_TEMPERATURE)
+    llm = ChatOllama(model=config.PRIMARY_LLM_MODEL, temperature=config.CREATIVE_TEMPERATURE, base_url=config.OLLAMA_BASE_URL)
     
     # Create a conversation chain with modern memory pattern
     prompt = ChatPromptTemplate.from_messages([
@@ -115,13 +115,9 @@ def example_3_memory():
     
     chain = prompt | llm
     
-    # Session storage
-    store = {}
-    
-    def get_session_history(session_id: str):
-        if session_id not in store:
-            store[session_id] = InMemoryChatMessageHistory()
-        return store[session_id]
+    # Session storage: bounded by session count, bytes and idle time
+    store = SessionStore()
+    get_session_history = store.get_session_history
     
     # Wrap with message history
     conversation = RunnableWithMessageHistory(
@@ -145,7 +141,7 @@ def example_3_memory():
     
     # Show the conversation history
     print("\n--- Conversation History ---")
-    history = store["demo_session"]
+    history = store.get_session_history("demo_session")
     for msg in history.messages:
         print(f"{msg.type}: {msg.content}")
     print("\n")
@@ -163,7 +159,7 @@ def example_4_agent_loop():
     print("Example 4: Agent Reasoning Loop")
     print("=" * 60)
     
-    llm = ChatOllama(model=config.PRIMARY_LLM_MODEL, temperature=config.PRECISE_TEMPERATURE)
+    llm = ChatOllama(model=config.PRIMARY_LLM_MODEL, temperature=config.PRECISE_TEMPERATURE, base_url=config.OLLAMA_BASE_URL)
     
     # Simulate an agent solving a problem
     task = "What is 25 * 4?"
@@ -205,7 +201,7 @@ def example_5_use_cases():
     print("Example 5: Agent Use Case Patterns")
     print("=" * 60)
     
-    llm = ChatOllama(model=config.PRIMARY_LLM_MODEL, temperature=config.CREATIVE_TEMPERATURE)
+    llm = ChatOllama(model=config.PRIMARY_LLM_MODEL, temperature=config.CREATIVE_TEMPERATURE, base_url=config.OLLAMA_BASE_URL)
     
     # Use Case 1: Customer Service Agent
     print("\n--- Use Case 1: Customer Service ---")
@@ -264,16 +260,24 @@ def example_6_model_comparison():
     
     prompt = "Explain the concept of 'agent autonomy' in 20 words or less."
     
-    for model_name in models:
-        try:
-            print(f"\n--- {model_name.upper()} ---")
-            llm = ChatOllama(model=model_name, temperature=0.5)
-            response = llm.invoke(prompt)
-            print(f"Response: {response}")
-        except Exception as e:
-            print(f"Error with {model_name}: {e}")
-            print("Make sure to pull the model: ollama pull {model_name}")
+    # Query all models concurrently instead of one after another
+    import benchmark
+    from concurrent.futures import ThreadPoolExecutor
+    
+    with ThreadPoolExecutor(max_workers=len(models)) as pool:
+        samples = list(pool.map(lambda m: benchmark.run_single(m, prompt, 0.5), models))
+    
+    for sample in samples:
+        model_name = sample["model"]
+        print(f"\n--- {model_name.upper()} ---")
+        if sample["ok"]:
+            print(f"Response: {sample['response']}")
+            print(f"Latency: {sample['latency']:.2f}s (first token after {sample['ttft'] or 0:.2f}s)")
+        else:
+            print(f"Error with {model_name}: {sample['error']}")
+            print(f"Make sure to pull the model: ollama pull {model_name}")
     
+    print("\nFor repeated runs with p50/p95/p99 latency, see: python benchmark.py")
     print("\n")
 
 
@@ -289,7 +293,7 @@ def example_7_planning():
     print("Example 7: Agent Planning")
     print("=" * 60)
     
-    llm = ChatOllama(model=config.PRIMARY_LLM_MODEL, temperature=config.PRECISE_TEMPERATURE)
+    llm = ChatOllama(model=config.PRIMARY_LLM_MODEL, temperature=config.PRECISE_TEMPERATURE, base_url=config.OLLAMA_BASE_URL)
     
     complex_task = """Plan a birthday party for 20 people this weekend."""
     
@@ -317,7 +321,7 @@ def example_8_feedback():
     print("Example 8: Feedback and Self-Correction")
     print("=" * 60)
     
-    llm = ChatOllama(model=config.PRIMARY_LLM_MODEL, temperature=config.CREATIVE_TEMPERATURE)
+    llm = ChatOllama(model=config.PRIMARY_LLM_MODEL, temperature=config.CREATIVE_TEMPERATURE, base_url=config.OLLAMA_BASE_URL)
     
     # Initial attempt
     print("\n--- Initial Attempt ---")
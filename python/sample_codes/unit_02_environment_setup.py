@@ -86,7 +86,7 @@ def example_3_test_ollama():
         import requests
         
         # Check if Ollama server is running
-        response = requests.get("http://localhost:11434/api/tags")
+        response = requests.get(f"{config.OLLAMA_BASE_URL}/api/tags")
         
         if response.status_code == 200:
             models = response.json().get('models', [])
@@ -135,7 +135,7 @@ def example_4_langchain_ollama():
         llm = Ollama(
             model=config.ALTERNATIVE_LLM_MODEL,
             temperature=config.CREATIVE_TEMPERATURE,
-            base_url="http://localhost:11434"
+            base_url=config.OLLAMA_BASE_URL
         )
         
         test_prompt = "Say 'Hello! Ollama is working!' in one sentence."
@@ -173,7 +173,7 @@ def example_5_llamaindex_ollama():
         
         print("\nInitializing LlamaIndex with Ollama...")
         
-        llm = Ollama(model=config.ALTERNATIVE_LLM_MODEL, request_timeout=config.DEFAULT_TIMEOUT)
+        llm = Ollama(model=config.ALTERNATIVE_LLM_MODEL, base_url=config.OLLAMA_BASE_URL, request_timeout=config.DEFAULT_TIMEOUT)
         
         messages = [
             ChatMessage(role="system", content="You are a helpful assistant."),
@@ -215,7 +215,7 @@ def example_6_test_embeddings():
         
         embed_model = OllamaEmbedding(
             model_name=config.EMBEDDING_MODEL,
-            base_url="http://localhost:11434"
+            base_url=config.OLLAMA_BASE_URL
         )
         
         test_text = "This is a test sentence for embeddings."
@@ -242,41 +242,39 @@ def example_6_test_embeddings():
 # ============================================================================
 
 def example_7_benchmark():
-    """Benchmark model response time."""
+    """Benchmark model latency, time-to-first-token and throughput."""
     print("=" * 60)
     print("Example 7: Performance Benchmark")
     print("=" * 60)
     
     try:
-        from langchain_community.llms import Ollama
-        import time
+        import benchmark
         
         models_to_test = config.get_comparison_models()
-        prompt = "What is 2+2? Answer in one word."
+        prompts = benchmark.DEFAULT_PROMPTS
         
-        print("\nBenchmarking models with prompt:", prompt)
+        print(f"\nBenchmarking {len(models_to_test)} models on {len(prompts)} prompts")
+        print("(3 repetitions at concurrency 1 and 4, after one warm-up request)")
         print("\n" + "-" * 60)
         
-        for model_name in models_to_test:
-            try:
-                llm = Ollama(model=model_name)
-                
-                start_time = time.time()
-                response = llm.invoke(prompt)
-                end_time = time.time()
-                
-                elapsed = end_time - start_time
-                
-                print(f"\n{model_name.upper()}:")
-                print(f"  ⏱️  Time: {elapsed:.2f}s")
-                print(f"  💬 Response: {response.strip()}")
-                
-            except Exception as e:
-                print(f"\n{model_name.upper()}:")
-                print(f"  ❌ Error: Model not available")
-                print(f"     Pull with: ollama pull {model_name}")
+        samples = benchmark.run_benchmark(
+            models_to_test,
+            prompts,
+            repetitions=3,
+            concurrency_levels=(1, 4),
+            warmup=1
+        )
+        rows = benchmark.summarize(samples)
+        benchmark.print_report(rows)
+        
+        for row in rows:
+            if row["errors"] == row["requests"]:
+                print(f"\n❌ {row['model']}: all requests failed")
+                print(f"   Pull with: ollama pull {row['model']}")
         
-        print("\n" + "-" * 60)
+        print("-" * 60)
+        print("\nFor full runs (cold starts, more concurrency, JSON/CSV output):")
+        print("  python benchmark.py --repetitions 20 --concurrency 1 4 8 --cold 3 --json results.json")
         
     except Exception as e:
         print(f"\n❌ Error: {e}")
@@ -390,7 +388,7 @@ def example_9_complete_verification():
     # Check Ollama
     try:
         import requests
-        response = requests.get("http://localhost:11434/api/tags")
+        response = requests.get(f"{config.OLLAMA_BASE_URL}/api/tags")
         checks["Ollama Running"] = response.status_code == 200
     except:
         pass
@@ -398,7 +396,7 @@ def example_9_complete_verification():
     # Check LangChain
     try:
         from langchain_community.llms import Ollama
-        llm = Ollama(model=config.ALTERNATIVE_LLM_MODEL)
+        llm = Ollama(model=config.ALTERNATIVE_LLM_MODEL, base_url=config.OLLAMA_BASE_URL)
         llm.invoke("test")
         checks["LangChain Integration"] = True
     except:
@@ -407,7 +405,7 @@ def example_9_complete_verification():
     # Check LlamaIndex
     try:
         from llama_index.llms.ollama import Ollama
-        llm = Ollama(model=config.ALTERNATIVE_LLM_MODEL)
+        llm = Ollama(model=config.ALTERNATIVE_LLM_MODEL, base_url=config.OLLAMA_BASE_URL)
         checks["LlamaIndex Integration"] = True
     except:
         pass
@@ -415,7 +413,7 @@ def example_9_complete_verification():
     # Check embeddings
     try:
         from llama_index.embeddings.ollama import OllamaEmbedding
-        embed = OllamaEmbedding(model_name=config.EMBEDDING_MODEL)
+        embed = OllamaEmbedding(model_name=config.EMBEDDING_MODEL, base_url=config.OLLAMA_BASE_URL)
         checks["Embedding Model"] = True
     except:
         pass
@@ -7,15 +7,21 @@ Demonstrates LCEL, modern memory patterns, and chain composition.
 
 from langchain_ollama import ChatOllama
 from langchain_core.prompts import PromptTemplate, ChatPromptTemplate, MessagesPlaceholder
-from langchain_core.messages import trim_messages
+from langchain_core.messages import HumanMessage
 from langchain_core.runnables import RunnablePassthrough, RunnableParallel, RunnableLambda
 from langchain_core.runnables.history import RunnableWithMessageHistory
-from langchain_core.chat_history import InMemoryChatMessageHistory
+from session_store import SessionStore
+from chat_history import (
+    TokenWindowChatMessageHistory,
+    SummarizingChatMessageHistory,
+    SQLiteChatHistoryStore
+)
 from langchain_core.output_parsers import StrOutputParser
+from stream_metrics import StreamMetrics, print_stream_stats, print_summary
 from operator import itemgetter
 import config
 
-llm = ChatOllama(model=config.PRIMARY_LLM_MODEL, temperature=config.CREATIVE_TEMPERATURE)
+llm = ChatOllama(model=config.PRIMARY_LLM_MODEL, temperature=config.CREATIVE_TEMPERATURE, base_url=config.OLLAMA_BASE_URL)
 
 # ============================================================================
 # Example 1: LCEL Basics - Pipe Operator
@@ -54,13 +60,9 @@ def example_2_modern_memory():
     
     chain = prompt | llm
     
-    # Session storage
-    store = {}
-    
-    def get_session_history(session_id: str):
-        if session_id not in store:
-            store[session_id] = InMemoryChatMessageHistory()
-        return store[session_id]
+    # Session storage: bounded by session count, bytes and idle time
+    store = SessionStore()
+    get_session_history = store.get_session_history
     
     # Wrap with history
     conversation = RunnableWithMessageHistory(
@@ -86,11 +88,11 @@ def example_2_modern_memory():
 
 
 # ============================================================================
-# Example 3: Sliding Window Memory (trim_messages)
+# Example 3: Sliding Window Memory (token budget)
 # ============================================================================
 
 def example_3_sliding_window():
-    """Demonstrate sliding window memory with trim_messages."""
+    """Demonstrate sliding window memory bounded by a token budget."""
     print("=" * 60)
     print("Example 3: Sliding Window Memory")
     print("=" * 60)
@@ -101,22 +103,17 @@ def example_3_sliding_window():
         ("human", "{input}")
     ])
     
-    # Create trimmer (keeps last 4 messages = 2 exchanges)
-    trimmer = trim_messages(
-        strategy="last",
-        token_counter=len,  # Simple character count
-        max_tokens=500,
-        include_system=True
-    )
-    
     chain = prompt | llm
     
-    store = {}
-    
-    def get_session_history(session_id: str):
-        if session_id not in store:
-            store[session_id] = InMemoryChatMessageHistory()
-        return store[session_id]
+    # Each session keeps only the newest messages that fit in the budget.
+    # Tokens are counted once per message as it is added, so trimming stays
+    # cheap and the prompt (and latency) stays flat however long the chat runs.
+    # A small budget is used here so the window visibly slides.
+    history_budget = 150
+    store = SessionStore(
+        history_factory=lambda: TokenWindowChatMessageHistory(max_tokens=history_budget)
+    )
+    get_session_history = store.get_session_history
     
     conversation = RunnableWithMessageHistory(
         chain,
@@ -127,7 +124,7 @@ def example_3_sliding_window():
     
     config_dict = {"configurable": {"session_id": "window_session"}}
     
-    print("\n--- Conversation with sliding window ---")
+    print(f"\n--- Conversation with a {history_budget}-token sliding window ---")
     turns = [
         "My favorite color is blue.",
         "I work as a data scientist.",
@@ -140,6 +137,10 @@ def example_3_sliding_window():
         print(f"\nTurn {i}: {turn}")
         response = conversation.invoke({"input": turn}, config=config_dict)
         print(f"AI: {response.content}")
+        
+        history = get_session_history("window_session")
+        print(f"   [window: {len(history.messages)} messages, "
+              f"~{history.total_tokens} tokens, {history.dropped_messages} dropped]")
     
     print("\n")
 
@@ -207,34 +208,80 @@ def example_5_advanced_lcel():
 # Example 6: Few-Shot Prompting (Modern Pattern)
 # ============================================================================
 
+# Few-shot prefix rendered once into message objects and shared by every
+# classification, instead of re-formatting the same six messages per input
+FEW_SHOT_SENTIMENT_PREFIX = ChatPromptTemplate.from_messages([
+    ("system", "You are a sentiment analyzer. Classify text as positive, negative, or neutral."),
+    ("human", "I love this product! → positive"),
+    ("ai", "Understood. Positive sentiment."),
+    ("human", "This is terrible. → negative"),
+    ("ai", "Understood. Negative sentiment."),
+    ("human", "It's okay I guess. → neutral"),
+    ("ai", "Understood. Neutral sentiment."),
+]).format_messages()
+
+
+def build_sentiment_chain():
+    """Few-shot sentiment chain: pre-rendered prefix + one new human message."""
+    def to_messages(inputs):
+        return FEW_SHOT_SENTIMENT_PREFIX + [HumanMessage(content=f"{inputs['text']} →")]
+    
+    return RunnableLambda(to_messages) | llm | StrOutputParser()
+
+
+def classify_sentiments(texts, max_concurrency=config.BATCH_MAX_CONCURRENCY):
+    """
+    Classify many texts with chain.batch(), at most max_concurrency in flight.
+    
+    Results are returned in input order; a failed item yields its exception.
+    """
+    chain = build_sentiment_chain()
+    return chain.batch(
+        [{"text": text} for text in texts],
+        config={"max_concurrency": max_concurrency},
+        return_exceptions=True
+    )
+
+
+def stream_sentiments(texts, max_concurrency=config.BATCH_MAX_CONCURRENCY):
+    """Yield (index, text, label) as each classification completes."""
+    chain = build_sentiment_chain()
+    inputs = [{"text": text} for text in texts]
+    for index, label in chain.batch_as_completed(
+        inputs,
+        config={"max_concurrency": max_concurrency},
+        return_exceptions=True
+    ):
+        yield index, texts[index], label
+
+
+async def astream_sentiments(texts, max_concurrency=config.BATCH_MAX_CONCURRENCY):
+    """Async version of stream_sentiments() built on abatch_as_completed()."""
+    chain = build_sentiment_chain()
+    inputs = [{"text": text} for text in texts]
+    async for index, label in chain.abatch_as_completed(
+        inputs,
+        config={"max_concurrency": max_concurrency},
+        return_exceptions=True
+    ):
+        yield index, texts[index], label
+
+
 def example_6_few_shot():
     """Demonstrate few-shot prompting with LCEL."""
     print("=" * 60)
     print("Example 6: Few-Shot Prompting")
     print("=" * 60)
     
-    prompt = ChatPromptTemplate.from_messages([
-        ("system", "You are a sentiment analyzer. Classify text as positive, negative, or neutral."),
-        ("human", "I love this product! → positive"),
-        ("ai", "Understood. Positive sentiment."),
-        ("human", "This is terrible. → negative"),
-        ("ai", "Understood. Negative sentiment."),
-        ("human", "It's okay I guess. → neutral"),
-        ("ai", "Understood. Neutral sentiment."),
-        ("human", "{text} →")
-    ])
-    
-    chain = prompt | llm | StrOutputParser()
-    
     texts = [
         "This is amazing!",
         "I'm disappointed.",
         "It works as expected."
     ]
     
+    # One batched call instead of a Python loop of chain.invoke()
     print("\n--- Sentiment Analysis ---")
-    for text in texts:
-        result = chain.invoke({"text": text})
+    for text, result in zip(texts, classify_sentiments(texts)):
         print(f"{text} → {result}")
     
     print("\n")
@@ -253,11 +300,22 @@ def example_7_streaming():
     prompt = ChatPromptTemplate.from_template("Write a short story about {topic}")
     chain = prompt | llm
     
-    print("\nStreaming response:")
-    print("-" * 40)
-    for chunk in chain.stream({"topic": "a robot learning to paint"}):
-        print(chunk.content, end="", flush=True)
-    print("\n")
+    # Record TTFT, inter-token latency and tokens/sec for each stream
+    events = []
+    metrics = StreamMetrics(on_event=events.append)
+    
+    for topic in ["a robot learning to paint", "a lighthouse keeper's cat"]:
+        print(f"\nStreaming response ({topic}):")
+        print("-" * 40)
+        for chunk in metrics.track(chain.stream({"topic": topic}), name=topic):
+            print(chunk.content, end="", flush=True)
+        print("\n")
+        print_stream_stats(metrics.streams[-1])
+    
+    print(f"\nEvents emitted: {[event['event'] for event in events]}")
+    print("\n--- Aggregate ---")
+    print_summary(metrics.summary())
+    print()
 
 
 # ============================================================================
@@ -338,40 +396,257 @@ def example_10_multi_session():
     ])
     
     chain = prompt | llm
-    store = {}
     
-    def get_session_history(session_id: str):
-        if session_id not in store:
-            store[session_id] = InMemoryChatMessageHistory()
-        return store[session_id]
+    # Keep only one session in memory; the other is spilled to disk and
+    # restored when that user returns (the spill directory is removed at the end)
+    import tempfile
+    with tempfile.TemporaryDirectory(prefix="sessions-") as spill_dir:
+        store = SessionStore(max_sessions=1, spill_dir=spill_dir)
+        get_session_history = store.get_session_history
+        
+        conversation = RunnableWithMessageHistory(
+            chain,
+            get_session_history,
+            input_messages_key="input",
+            history_messages_key="history"
+        )
+        
+        # User 1
+        print("\n--- User 1 (Alice) ---")
+        config_alice = {"configurable": {"session_id": "alice"}}
+        r1 = conversation.invoke({"input": "My name is Alice."}, config=config_alice)
+        print(f"AI: {r1.content}")
+        
+        # User 2
+        print("\n--- User 2 (Bob) ---")
+        config_bob = {"configurable": {"session_id": "bob"}}
+        r2 = conversation.invoke({"input": "My name is Bob."}, config=config_bob)
+        print(f"AI: {r2.content}")
+        
+        # Check isolation
+        print("\n--- Back to User 1 ---")
+        r3 = conversation.invoke({"input": "What's my name?"}, config=config_alice)
+        print(f"AI: {r3.content}")
+        
+        print("\n--- Back to User 2 ---")
+        r4 = conversation.invoke({"input": "What's my name?"}, config=config_bob)
+        print(f"AI: {r4.content}")
+        
+        print(f"\nSession store: {store.stats()}\n")
+
+
+# ============================================================================
+# Example 11: Caching LLM Responses
+# ============================================================================
+
+def example_11_response_cache():
+    """Serve repeated (and reworded) questions from an on-disk cache."""
+    print("=" * 60)
+    print("Example 11: Caching LLM Responses")
+    print("=" * 60)
+    
+    import time
+    from langchain_core.globals import set_llm_cache
+    from langchain_ollama import OllamaEmbeddings
+    from llm_cache import enable_langchain_cache, get_response_cache
+    
+    # Exact tier always on; the embedding model enables the semantic tier
+    embeddings = OllamaEmbeddings(model=config.EMBEDDING_MODEL, base_url=config.OLLAMA_BASE_URL)
+    cache = get_response_cache(embed_fn=embeddings.embed_query)
+    enable_langchain_cache(cache)
+    
+    # Semantic hits suit questions that are reworded, not labels that a
+    # one-word change ("good" / "not good") can flip
+    prompt = ChatPromptTemplate.from_messages([
+        ("system", "Answer the question in one short sentence."),
+        ("human", "{question}")
+    ])
+    chain = prompt | llm | StrOutputParser()
+    
+    passes = [
+        ("new questions", ["What is the capital of France?", "How many legs does a spider have?"]),
+        ("same questions", ["What is the capital of France?", "How many legs does a spider have?"]),
+        ("paraphrased", ["What's the capital city of France?", "How many legs do spiders have?"]),
+    ]
+    print(f"\n--- Three passes of {len(passes[0][1])} questions ---")
+    for label, questions in passes:
+        print(f"\nPass: {label}")
+        for question in questions:
+            before = cache.stats()
+            start = time.perf_counter()
+            result = chain.invoke({"question": question})
+            elapsed = (time.perf_counter() - start) * 1000
+            after = cache.stats()
+            if after["exact_hits"] > before["exact_hits"]:
+                outcome = "exact hit"
+            elif after["semantic_hits"] > before["semantic_hits"]:
+                outcome = "semantic hit"
+            else:
+                outcome = "miss"
+            print(f"  {question:36s} → {result.strip()[:40]:40s} [{outcome}, {elapsed:.0f} ms]")
+    
+    print(f"\nCache stats: {cache.stats()}")
+    
+    # Turn caching back off so other examples hit the model
+    set_llm_cache(None)
+    print()
+
+
+# ============================================================================
+# Example 12: Batch Classification of a Large Feed
+# ============================================================================
+
+def example_12_batch_classification():
+    """Classify a large feed concurrently, printing results as they complete."""
+    print("=" * 60)
+    print("Example 12: Batch Classification of a Large Feed")
+    print("=" * 60)
+    
+    import time
+    
+    samples = ["Great service, will come back!", "Package arrived broken.",
+               "Delivery was on time.", "Worst purchase ever.", "Pretty decent overall."]
+    feed = [f"{samples[i % len(samples)]} (review #{i})" for i in range(50)]
+    
+    print(f"\n--- Classifying {len(feed)} texts, "
+          f"max_concurrency={config.BATCH_MAX_CONCURRENCY} ---")
+    start = time.perf_counter()
+    counts = {}
+    for done, (index, text, label) in enumerate(stream_sentiments(feed), 1):
+        if isinstance(label, Exception):
+            label = f"error: {label}"
+        key = label.strip().split()[0].strip(".,").lower() if label.strip() else "?"
+        counts[key] = counts.get(key, 0) + 1
+        if done <= 5:
+            print(f"  [{index:3d}] {text} → {label.strip()[:40]}")
+    elapsed = time.perf_counter() - start
+    
+    print(f"\nLabel counts: {counts}")
+    print(f"{len(feed)} texts in {elapsed:.2f}s ({len(feed) / elapsed:.1f} texts/sec)\n")
+
+
+# ============================================================================
+# Example 13: Rolling Summary Memory
+# ============================================================================
+
+def example_13_summarizing_memory():
+    """Condense older turns into a running summary in the background."""
+    print("=" * 60)
+    print("Example 13: Rolling Summary Memory")
+    print("=" * 60)
+    
+    import time
+    
+    prompt = ChatPromptTemplate.from_messages([
+        ("system", "You are a helpful assistant. Keep answers to one sentence."),
+        MessagesPlaceholder(variable_name="history"),
+        ("human", "{input}")
+    ])
+    
+    chain = prompt | llm
+    
+    # Past the threshold, older turns are summarized on a worker thread while
+    # the conversation carries on; the prompt stays bounded but, unlike the
+    # sliding window, early facts survive in the summary. Small limits are
+    # used here so summarization kicks in after a few turns.
+    store = SessionStore(
+        history_factory=lambda: SummarizingChatMessageHistory(
+            summarize_after_tokens=120,
+            keep_recent_tokens=60
+        )
+    )
     
     conversation = RunnableWithMessageHistory(
         chain,
-        get_session_history,
+        store.get_session_history,
         input_messages_key="input",
         history_messages_key="history"
     )
     
-    # User 1
-    print("\n--- User 1 (Alice) ---")
-    config_alice = {"configurable": {"session_id": "alice"}}
-    r1 = conversation.invoke({"input": "My name is Alice."}, config=config_alice)
-    print(f"AI: {r1.content}")
+    config_dict = {"configurable": {"session_id": "summary_session"}}
     
-    # User 2
-    print("\n--- User 2 (Bob) ---")
-    config_bob = {"configurable": {"session_id": "bob"}}
-    r2 = conversation.invoke({"input": "My name is Bob."}, config=config_bob)
-    print(f"AI: {r2.content}")
+    turns = [
+        "My favorite color is blue.",
+        "I work as a data scientist.",
+        "I have a dog named Max.",
+        "I'm planning a trip to Japan in April.",
+        "What's my favorite color, and what's my dog's name?",
+    ]
     
-    # Check isolation
-    print("\n--- Back to User 1 ---")
-    r3 = conversation.invoke({"input": "What's my name?"}, config=config_alice)
-    print(f"AI: {r3.content}")
+    for i, turn in enumerate(turns, 1):
+        print(f"\nTurn {i}: {turn}")
+        start = time.perf_counter()
+        response = conversation.invoke({"input": turn}, config=config_dict)
+        print(f"AI: {response.content}")
+        
+        history = store.get_session_history("summary_session")
+        print(f"   [{time.perf_counter() - start:.2f}s, {len(history.messages)} messages, "
+              f"~{history.total_tokens} tokens, {history.summarized_messages} summarized]")
+    
+    history = store.get_session_history("summary_session")
+    history.wait_for_summary()
+    print(f"\nRunning summary: {history.summary or '(none yet)'}\n")
+
+
+# ============================================================================
+# Example 14: Persistent Chat History
+# ============================================================================
+
+def example_14_persistent_history():
+    """Keep chat histories in SQLite so they survive restarts and are shared across processes."""
+    print("=" * 60)
+    print("Example 14: Persistent Chat History")
+    print("=" * 60)
     
-    print("\n--- Back to User 2 ---")
-    r4 = conversation.invoke({"input": "What's my name?"}, config=config_bob)
-    print(f"AI: {r4.content}\n")
+    import os
+    import tempfile
+    
+    prompt = ChatPromptTemplate.from_messages([
+        ("system", "You are a helpful assistant."),
+        MessagesPlaceholder(variable_name="history"),
+        ("human", "{input}")
+    ])
+    
+    chain = prompt | llm
+    
+    # The directory (and the SQLite file in it) is removed when the example ends
+    with tempfile.TemporaryDirectory(prefix="chat-history-") as history_dir:
+        # Every worker process opens the same file; each request reads only the
+        # last 10 messages, however long the transcript grows
+        db_path = os.path.join(history_dir, "history.sqlite")
+        store = SQLiteChatHistoryStore(db_path, tail_messages=10)
+        
+        conversation = RunnableWithMessageHistory(
+            chain,
+            store.get_session_history,
+            input_messages_key="input",
+            history_messages_key="history"
+        )
+        
+        config_dict = {"configurable": {"session_id": "persistent_session"}}
+        
+        print("\n--- Worker A ---")
+        response = conversation.invoke({"input": "Hi! My name is Carol and I like hiking."},
+                                       config=config_dict)
+        print(f"AI: {response.content}")
+        store.close()
+        
+        # A restarted (or different) worker picks the session up from disk
+        print("\n--- Worker B (fresh store, same file) ---")
+        store_b = SQLiteChatHistoryStore(db_path, tail_messages=10)
+        conversation_b = RunnableWithMessageHistory(
+            chain,
+            store_b.get_session_history,
+            input_messages_key="input",
+            history_messages_key="history"
+        )
+        response = conversation_b.invoke({"input": "What's my name and hobby?"}, config=config_dict)
+        print(f"AI: {response.content}")
+        
+        history = store_b.get_session_history("persistent_session")
+        print(f"\nStored messages: {store_b.count('persistent_session')}")
+        print(f"Last 2 messages: {[m.content[:40] for m in history.tail(2)]}\n")
+        store_b.close()
 
 
 # ============================================================================
@@ -394,6 +669,10 @@ if __name__ == "__main__":
         example_8_custom_runnable()
         example_9_multi_step()
         example_10_multi_session()
+        example_11_response_cache()
+        example_12_batch_classification()
+        example_13_summarizing_memory()
+        example_14_persistent_history()
         
         print("=" * 60)
         print("All examples completed successfully!")
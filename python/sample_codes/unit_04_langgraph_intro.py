@@ -256,8 +256,8 @@ def example_4_loops():
 # Example 5: LangGraph with LLM
 # ============================================================================
 
-from langchain_community.llms import Ollama
 import config
+from graph_utils import graph_node
 
 class AgentState(TypedDict):
     messages: Annotated[list, add_messages]  # add_messages handles message IDs
@@ -265,12 +265,15 @@ class AgentState(TypedDict):
     answer: str
 
 
-def llm_node(state: AgentState) -> AgentState:
+# LLM nodes are async (awaiting ainvoke) so they also serve concurrent runs
+# (Example 7); @graph_node lets app.invoke() run them as well
+@graph_node
+async def llm_node(state: AgentState) -> AgentState:
     """Node that calls LLM."""
-    llm = Ollama(model=config.ALTERNATIVE_LLM_MODEL, temperature=config.CREATIVE_TEMPERATURE)
+    llm = config.get_llm(config.ALTERNATIVE_LLM_MODEL, config.CREATIVE_TEMPERATURE)
     
     question = state["question"]
-    response = llm.invoke(f"Answer this question briefly: {question}")
+    response = await llm.ainvoke(f"Answer this question briefly: {question}")
     
     return {
         "messages": [f"Q: {question}", f"A: {response}"],
@@ -313,6 +316,8 @@ def example_5_llm_graph():
 # Example 6: Multi-Step Reasoning Graph
 # ============================================================================
 
+from graph_utils import get_checkpointer, run_resumable
+
 class ReasoningState(TypedDict):
     task: str
     plan: str
@@ -320,12 +325,13 @@ class ReasoningState(TypedDict):
     result: str
 
 
-def plan_node(state: ReasoningState) -> ReasoningState:
+@graph_node
+async def plan_node(state: ReasoningState) -> ReasoningState:
     """Create a plan for the task."""
-    llm = Ollama(model=config.ALTERNATIVE_LLM_MODEL, temperature=config.PRECISE_TEMPERATURE)
+    llm = config.get_llm(config.ALTERNATIVE_LLM_MODEL, config.PRECISE_TEMPERATURE)
     
     task = state["task"]
-    plan = llm.invoke(f"Create a step-by-step plan to: {task}")
+    plan = await llm.ainvoke(f"Create a step-by-step plan to: {task}")
     
     return {
         "task": task,
@@ -335,11 +341,12 @@ def plan_node(state: ReasoningState) -> ReasoningState:
     }
 
 
-def execute_node(state: ReasoningState) -> ReasoningState:
+@graph_node
+async def execute_node(state: ReasoningState) -> ReasoningState:
     """Execute the plan."""
-    llm = Ollama(model=config.ALTERNATIVE_LLM_MODEL, temperature=config.PRECISE_TEMPERATURE)
+    llm = config.get_llm(config.ALTERNATIVE_LLM_MODEL, config.PRECISE_TEMPERATURE)
     
-    execution = llm.invoke(f"Execute this plan:\n{state['plan']}")
+    execution = await llm.ainvoke(f"Execute this plan:\n{state['plan']}")
     
     return {
         "task": state["task"],
@@ -349,11 +356,12 @@ def execute_node(state: ReasoningState) -> ReasoningState:
     }
 
 
-def summarize_node(state: ReasoningState) -> ReasoningState:
+@graph_node
+async def summarize_node(state: ReasoningState) -> ReasoningState:
     """Summarize the result."""
-    llm = Ollama(model=config.ALTERNATIVE_LLM_MODEL, temperature=config.PRECISE_TEMPERATURE)
+    llm = config.get_llm(config.ALTERNATIVE_LLM_MODEL, config.PRECISE_TEMPERATURE)
     
-    result = llm.invoke(f"Summarize the outcome:\n{state['execution']}")
+    result = await llm.ainvoke(f"Summarize the outcome:\n{state['execution']}")
     
     return {
         "task": state["task"],
@@ -363,12 +371,8 @@ def summarize_node(state: ReasoningState) -> ReasoningState:
     }
 
 
-def example_6_reasoning_graph():
-    """Multi-step reasoning workflow."""
-    print("=" * 60)
-    print("Example 6: Multi-Step Reasoning Graph")
-    print("=" * 60)
-    
+def build_reasoning_graph(checkpointer=None):
+    """Build the plan -> execute -> summarize graph, optionally checkpointed."""
     workflow = StateGraph(ReasoningState)
     
     # Add nodes
@@ -382,17 +386,27 @@ def example_6_reasoning_graph():
     workflow.add_edge("execute", "summarize")
     workflow.add_edge("summarize", END)
     
-    # Compile
-    app = workflow.compile()
+    # Compile (with a checkpointer, every node's output is persisted)
+    return workflow.compile(checkpointer=checkpointer)
+
+
+def example_6_reasoning_graph():
+    """Multi-step reasoning workflow."""
+    print("=" * 60)
+    print("Example 6: Multi-Step Reasoning Graph")
+    print("=" * 60)
     
-    # Run
+    # Run (if a previous run of this thread crashed, it resumes where it
+    # stopped; a completed run deletes its checkpoints)
     print("\n--- Running reasoning workflow ---")
-    result = app.invoke({
-        "task": "Learn Python basics in one week",
-        "plan": "",
-        "execution": "",
-        "result": ""
-    })
+    with get_checkpointer() as checkpointer:
+        app = build_reasoning_graph(checkpointer=checkpointer)
+        result = run_resumable(app, {
+            "task": "Learn Python basics in one week",
+            "plan": "",
+            "execution": "",
+            "result": ""
+        }, thread_id="reasoning-demo", cleanup=True)
     
     print(f"\nTask: {result['task']}")
     print(f"\nPlan:\n{result['plan']}")
@@ -400,6 +414,137 @@ def example_6_reasoning_graph():
     print(f"\nResult:\n{result['result']}\n")
 
 
+# ============================================================================
+# Example 7: Async Nodes and Concurrent Graph Runs
+# ============================================================================
+
+import time
+from graph_utils import run_graphs
+
+
+def example_7_async_graphs():
+    """Run many graph inputs concurrently with async nodes."""
+    print("=" * 60)
+    print("Example 7: Async Nodes and Concurrent Graph Runs")
+    print("=" * 60)
+    
+    # Example 6's graph: its async nodes release the loop while awaiting the LLM
+    app = build_reasoning_graph()
+    
+    tasks = [
+        "Learn Python basics in one week",
+        "Prepare for a job interview",
+        "Plan a weekend hiking trip",
+        "Organize a team offsite",
+        "Start a vegetable garden",
+        "Write a short technical blog post",
+    ]
+    inputs = [{"task": task, "plan": "", "execution": "", "result": ""} for task in tasks]
+    
+    # All runs share the event loop; at most GRAPH_MAX_CONCURRENCY are in flight
+    print(f"\n--- Running {len(inputs)} workflows concurrently ---")
+    start = time.perf_counter()
+    results = run_graphs(app, inputs, max_concurrency=config.GRAPH_MAX_CONCURRENCY)
+    elapsed = time.perf_counter() - start
+    
+    for task, result in zip(tasks, results):
+        if isinstance(result, Exception):
+            print(f"\n{task}: failed ({result})")
+        else:
+            print(f"\n{task}:\n  {result['result'][:150]}...")
+    
+    print(f"\n{len(inputs)} workflows x 3 LLM calls finished in {elapsed:.2f}s\n")
+
+
+# ============================================================================
+# Example 8: Resuming a Failed Run from a Checkpoint
+# ============================================================================
+
+def example_8_resume_after_failure():
+    """Show that a failure in summarize does not repeat the plan and execute calls."""
+    print("=" * 60)
+    print("Example 8: Resuming a Failed Run from a Checkpoint")
+    print("=" * 60)
+    
+    calls = {"plan": 0, "execute": 0, "summarize": 0}
+    
+    def counted(name, fn):
+        def node(state):
+            calls[name] += 1
+            return fn(state)
+        return node
+    
+    def flaky_summarize(state):
+        # Fail the first attempt, as if the worker crashed mid-step
+        if calls["summarize"] == 1:
+            raise RuntimeError("simulated crash in summarize")
+        return summarize_node.invoke(state)
+    
+    workflow = StateGraph(ReasoningState)
+    workflow.add_node("plan", counted("plan", plan_node.invoke))
+    workflow.add_node("execute", counted("execute", execute_node.invoke))
+    workflow.add_node("summarize", counted("summarize", flaky_summarize))
+    workflow.set_entry_point("plan")
+    workflow.add_edge("plan", "execute")
+    workflow.add_edge("execute", "summarize")
+    workflow.add_edge("summarize", END)
+    
+    thread_id = f"resume-demo-{time.time_ns()}"
+    graph_input = {"task": "Plan a study schedule", "plan": "", "execution": "", "result": ""}
+    
+    with get_checkpointer() as checkpointer:
+        app = workflow.compile(checkpointer=checkpointer)
+        
+        print("\n--- First attempt ---")
+        try:
+            run_resumable(app, graph_input, thread_id, cleanup=True)
+        except RuntimeError as e:
+            print(f"Run failed: {e}")
+            print(f"Pending nodes: {app.get_state({'configurable': {'thread_id': thread_id}}).next}")
+        
+        print("\n--- Second attempt (resumes from checkpoint) ---")
+        result = run_resumable(app, graph_input, thread_id, cleanup=True)
+        print(f"Result:\n{result['result'][:200]}...")
+    
+    print(f"\nNode calls: {calls}")
+    print("plan and execute ran once; only summarize was retried.\n")
+
+
+# ============================================================================
+# Example 9: Profiling Nodes
+# ============================================================================
+
+from graph_utils import GraphProfiler
+
+def example_9_profiling():
+    """Find the slowest node: time, LLM tokens and state size per node."""
+    print("=" * 60)
+    print("Example 9: Profiling Nodes")
+    print("=" * 60)
+    
+    profiler = GraphProfiler()
+    app = profiler.attach(build_reasoning_graph())
+    
+    print("\n--- Running reasoning workflow with the profiler attached ---")
+    app.invoke({
+        "task": "Prepare for a job interview",
+        "plan": "",
+        "execution": "",
+        "result": ""
+    })
+    
+    print("\nPer-step records:")
+    for record in profiler.steps:
+        print(f"  step {record['step']}: {record['node']:10s} {record['wall_time']:.2f}s, "
+              f"{record['llm_calls']} LLM call(s), "
+              f"{record['prompt_tokens']}+{record['completion_tokens']} tokens, "
+              f"state {record['state_bytes']} bytes")
+    
+    print("\nProfile:")
+    profiler.print_report()
+    print()
+
+
 # ============================================================================
 # Main execution
 # ============================================================================
@@ -417,6 +562,9 @@ if __name__ == "__main__":
         print("\nThe following examples require Ollama to be running...")
         example_5_llm_graph()
         example_6_reasoning_graph()
+        example_7_async_graphs()
+        example_8_resume_after_failure()
+        example_9_profiling()
         
         print("=" * 60)
         print("All examples completed successfully!")
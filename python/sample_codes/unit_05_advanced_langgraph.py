@@ -9,10 +9,10 @@ tool integration, and human-in-the-loop workflows.
 from typing import TypedDict, Annotated, Literal
 from langgraph.graph import StateGraph, END
 from langgraph.graph.message import add_messages
-from langchain_ollama import ChatOllama
 from langchain_core.tools import tool
 import operator
 import config
+from graph_utils import get_checkpointer, graph_node, run_resumable
 
 # ============================================================================
 # Example 1: Tool Integration in LangGraph
@@ -89,9 +89,12 @@ def calculate_node(state: ToolAgentState) -> ToolAgentState:
     }
 
 
-def answer_node(state: ToolAgentState) -> ToolAgentState:
+# LLM nodes are async (awaiting ainvoke) so they also serve concurrent runs
+# (Example 4); @graph_node lets app.invoke() run them as well
+@graph_node
+async def answer_node(state: ToolAgentState) -> ToolAgentState:
     """Generate final answer using LLM."""
-    llm = ChatOllama(model=config.ALTERNATIVE_LLM_MODEL, temperature=config.CREATIVE_TEMPERATURE)
+    llm = config.get_chat_model(config.ALTERNATIVE_LLM_MODEL, config.CREATIVE_TEMPERATURE)
     
     context = "\n".join(state["messages"])
     prompt = f"""Based on this information:
@@ -101,7 +104,7 @@ Answer the question: {state["question"]}
 
 Provide a clear, concise answer."""
     
-    answer = llm.invoke(prompt)
+    answer = (await llm.ainvoke(prompt)).content
     
     return {
         "messages": [f"Final answer: {answer}"],
@@ -179,15 +182,16 @@ class MultiAgentState(TypedDict):
     final_output: str
 
 
-def researcher_agent(state: MultiAgentState) -> MultiAgentState:
+@graph_node
+async def researcher_agent(state: MultiAgentState) -> MultiAgentState:
     """Research agent gathers information."""
-    llm = ChatOllama(model=config.ALTERNATIVE_LLM_MODEL, temperature=config.PRECISE_TEMPERATURE)
+    llm = config.get_chat_model(config.ALTERNATIVE_LLM_MODEL, config.PRECISE_TEMPERATURE)
     
     prompt = f"""You are a research agent. Research this topic: {state['task']}
     
 Provide 3-4 key facts or insights."""
     
-    research = llm.invoke(prompt)
+    research = (await llm.ainvoke(prompt)).content
     
     return {
         "task": state["task"],
@@ -198,9 +202,10 @@ Provide 3-4 key facts or insights."""
     }
 
 
-def writer_agent(state: MultiAgentState) -> MultiAgentState:
+@graph_node
+async def writer_agent(state: MultiAgentState) -> MultiAgentState:
     """Writer agent creates content."""
-    llm = ChatOllama(model=config.ALTERNATIVE_LLM_MODEL, temperature=config.CREATIVE_TEMPERATURE)
+    llm = config.get_chat_model(config.ALTERNATIVE_LLM_MODEL, config.CREATIVE_TEMPERATURE)
     
     prompt = f"""You are a writer. Based on this research:
 
@@ -208,7 +213,7 @@ def writer_agent(state: MultiAgentState) -> MultiAgentState:
 
 Write a short article about: {state['task']}"""
     
-    article = llm.invoke(prompt)
+    article = (await llm.ainvoke(prompt)).content
     
     return {
         "task": state["task"],
@@ -219,9 +224,10 @@ Write a short article about: {state['task']}"""
     }
 
 
-def editor_agent(state: MultiAgentState) -> MultiAgentState:
+@graph_node
+async def editor_agent(state: MultiAgentState) -> MultiAgentState:
     """Editor agent reviews and improves."""
-    llm = ChatOllama(model=config.ALTERNATIVE_LLM_MODEL, temperature=config.BALANCED_TEMPERATURE)
+    llm = config.get_chat_model(config.ALTERNATIVE_LLM_MODEL, config.BALANCED_TEMPERATURE)
     
     prompt = f"""You are an editor. Review and improve this article:
 
@@ -229,7 +235,7 @@ def editor_agent(state: MultiAgentState) -> MultiAgentState:
 
 Make it more clear and concise."""
     
-    edited = llm.invoke(prompt)
+    edited = (await llm.ainvoke(prompt)).content
     
     return {
         "task": state["task"],
@@ -240,13 +246,8 @@ Make it more clear and concise."""
     }
 
 
-def example_2_multi_agent():
-    """Demonstrate multi-agent collaboration."""
-    print("=" * 60)
-    print("Example 2: Multi-Agent Collaboration")
-    print("=" * 60)
-    
-    # Build workflow
+def build_multi_agent_graph():
+    """Build the researcher -> writer -> editor graph."""
     workflow = StateGraph(MultiAgentState)
     
     # Add agents as nodes
@@ -261,7 +262,17 @@ def example_2_multi_agent():
     workflow.add_edge("editor", END)
     
     # Compile
-    app = workflow.compile()
+    return workflow.compile()
+
+
+def example_2_multi_agent():
+    """Demonstrate multi-agent collaboration."""
+    print("=" * 60)
+    print("Example 2: Multi-Agent Collaboration")
+    print("=" * 60)
+    
+    # Build workflow
+    app = build_multi_agent_graph()
     
     # Run
     print("\n--- Running multi-agent workflow ---")
@@ -296,11 +307,12 @@ class HITLState(TypedDict):
     approved: bool
 
 
-def generate_content(state: HITLState) -> HITLState:
+@graph_node
+async def generate_content(state: HITLState) -> HITLState:
     """Generate initial content."""
-    llm = ChatOllama(model=config.ALTERNATIVE_LLM_MODEL, temperature=config.CREATIVE_TEMPERATURE)
+    llm = config.get_chat_model(config.ALTERNATIVE_LLM_MODEL, config.CREATIVE_TEMPERATURE)
     
-    content = llm.invoke("Write a short introduction to LangGraph")
+    content = (await llm.ainvoke("Write a short introduction to LangGraph")).content
     
     return {
         "content": content,
@@ -325,9 +337,10 @@ def review_checkpoint(state: HITLState) -> Literal["revise", "approve"]:
     return decision
 
 
-def revise_content(state: HITLState) -> HITLState:
+@graph_node
+async def revise_content(state: HITLState) -> HITLState:
     """Revise based on feedback."""
-    llm = ChatOllama(model=config.ALTERNATIVE_LLM_MODEL, temperature=config.CREATIVE_TEMPERATURE)
+    llm = config.get_chat_model(config.ALTERNATIVE_LLM_MODEL, config.CREATIVE_TEMPERATURE)
     
     prompt = f"""Revise this content based on feedback:
 
@@ -336,7 +349,7 @@ Feedback: {state['feedback']}
 
 Provide improved version."""
     
-    revised = llm.invoke(prompt)
+    revised = (await llm.ainvoke(prompt)).content
     
     return {
         "content": revised,
@@ -394,17 +407,18 @@ def example_3_hitl():
     
     workflow.add_edge("approve", END)
     
-    # Compile
-    app = workflow.compile()
-    
-    # Run
+    # Compile with a checkpointer: each node's output is persisted, so a
+    # crashed or interrupted review resumes without regenerating the content
+    # (a completed run deletes its checkpoints)
     print("\n--- Running HITL workflow ---")
-    result = app.invoke({
-        "content": "",
-        "status": "draft",
-        "feedback": "",
-        "approved": False
-    })
+    with get_checkpointer() as checkpointer:
+        app = workflow.compile(checkpointer=checkpointer)
+        result = run_resumable(app, {
+            "content": "",
+            "status": "draft",
+            "feedback": "",
+            "approved": False
+        }, thread_id="hitl-demo", cleanup=True)
     
     print(f"\nFinal Status: {result['status']}")
     print(f"Approved: {result['approved']}")
@@ -412,6 +426,254 @@ def example_3_hitl():
     print()
 
 
+# ============================================================================
+# Example 4: Async Agents and Concurrent Graph Runs
+# ============================================================================
+
+import time
+from graph_utils import run_graphs
+
+
+def example_4_async_agents():
+    """Run the multi-agent workflow for many tasks concurrently."""
+    print("=" * 60)
+    print("Example 4: Async Agents and Concurrent Graph Runs")
+    print("=" * 60)
+    
+    # Example 2's graph: its async agents release the loop while awaiting the LLM
+    app = build_multi_agent_graph()
+    
+    tasks = [
+        "AI agents in software development",
+        "Vector databases for search",
+        "Local LLMs on laptops",
+        "Testing LLM applications",
+    ]
+    inputs = [
+        {"task": task, "researcher_output": "", "writer_output": "",
+         "editor_output": "", "final_output": ""}
+        for task in tasks
+    ]
+    
+    print(f"\n--- Running {len(inputs)} multi-agent workflows concurrently ---")
+    start = time.perf_counter()
+    results = run_graphs(app, inputs, max_concurrency=config.GRAPH_MAX_CONCURRENCY)
+    elapsed = time.perf_counter() - start
+    
+    for task, result in zip(tasks, results):
+        if isinstance(result, Exception):
+            print(f"\n{task}: failed ({result})")
+        else:
+            print(f"\n{task}:\n  {result['final_output'][:150]}...")
+    
+    print(f"\n{len(inputs)} workflows x 3 agents finished in {elapsed:.2f}s\n")
+
+
+# ============================================================================
+# Example 5: Parallel Researchers (Fan-Out / Fan-In)
+# ============================================================================
+
+import threading
+
+try:
+    from langgraph.types import Send
+except ImportError:  # Older langgraph releases
+    from langgraph.constants import Send
+
+
+class ParallelResearchState(TypedDict):
+    task: str
+    subtopics: list
+    research_notes: Annotated[list, operator.add]  # Reducer merges parallel branches
+    researcher_output: str
+    writer_output: str
+    editor_output: str
+    final_output: str
+
+
+@graph_node
+async def sub_researcher_agent(state: dict) -> dict:
+    """Research one subtopic; runs as one of several parallel branches."""
+    llm = config.get_chat_model(config.ALTERNATIVE_LLM_MODEL, config.PRECISE_TEMPERATURE)
+    
+    prompt = f"""You are a research agent. The overall topic is: {state['task']}
+Research this specific aspect: {state['subtopic']}
+
+Provide 2-3 key facts or insights."""
+    
+    research = (await llm.ainvoke(prompt)).content
+    
+    return {"research_notes": [f"## {state['subtopic']}\n{research}"]}
+
+
+def fan_out_research(state: ParallelResearchState) -> list:
+    """Start one sub_researcher branch per subtopic."""
+    return [
+        Send("sub_researcher", {"task": state["task"], "subtopic": subtopic})
+        for subtopic in state["subtopics"]
+    ]
+
+
+def merge_research(state: ParallelResearchState) -> dict:
+    """Fan-in: combine the branch notes into the researcher_output the writer expects."""
+    return {"researcher_output": "\n\n".join(state["research_notes"])}
+
+
+def research_sequentially(state: ParallelResearchState) -> dict:
+    """Linear baseline: research the subtopics one after another in a single node."""
+    notes = []
+    for subtopic in state["subtopics"]:
+        branch = sub_researcher_agent.invoke({"task": state["task"], "subtopic": subtopic})
+        notes += branch["research_notes"]
+    return {"research_notes": notes}
+
+
+class NodeTimer:
+    """Records (node, start, end) spans; wraps nodes without changing them."""
+    
+    def __init__(self):
+        self.spans = []
+        self._lock = threading.Lock()
+    
+    def wrap(self, name, fn):
+        call = fn.invoke if hasattr(fn, "invoke") else fn  # @graph_node nodes are runnables
+        
+        def timed(state):
+            start = time.perf_counter()
+            try:
+                return call(state)
+            finally:
+                with self._lock:
+                    self.spans.append((name, start, time.perf_counter()))
+        return timed
+    
+    def durations(self, name):
+        return [end - start for node, start, end in self.spans if node == name]
+
+
+def build_research_graph(timer: NodeTimer, parallel: bool = True):
+    """Build research -> merge -> writer -> editor, fanning research out if parallel."""
+    workflow = StateGraph(ParallelResearchState)
+    workflow.add_node("merge", timer.wrap("merge", merge_research))
+    workflow.add_node("writer", timer.wrap("writer", writer_agent))
+    workflow.add_node("editor", timer.wrap("editor", editor_agent))
+    
+    if parallel:
+        # START -> N parallel sub_researchers -> merge
+        workflow.add_node("sub_researcher", timer.wrap("sub_researcher", sub_researcher_agent))
+        workflow.set_conditional_entry_point(fan_out_research, ["sub_researcher"])
+    else:
+        # START -> one node researching every subtopic in turn -> merge
+        workflow.add_node("sub_researcher", timer.wrap("sub_researcher", research_sequentially))
+        workflow.set_entry_point("sub_researcher")
+    workflow.add_edge("sub_researcher", "merge")
+    workflow.add_edge("merge", "writer")
+    workflow.add_edge("writer", "editor")
+    workflow.add_edge("editor", END)
+    
+    return workflow.compile()
+
+
+def example_5_parallel_research():
+    """Fan research out over subtopics in parallel, then write and edit."""
+    print("=" * 60)
+    print("Example 5: Parallel Researchers (Fan-Out / Fan-In)")
+    print("=" * 60)
+    
+    task = "AI agents in software development"
+    subtopics = [
+        "code generation and review",
+        "automated testing",
+        "DevOps and incident response",
+        "developer productivity research",
+    ]
+    graph_input = {
+        "task": task,
+        "subtopics": subtopics,
+        "research_notes": [],
+        "researcher_output": "",
+        "writer_output": "",
+        "editor_output": "",
+        "final_output": ""
+    }
+    
+    # Discarded warm-up requests (one per agent's client) so neither timed run
+    # pays for loading the model or opening connections
+    for temperature in (config.PRECISE_TEMPERATURE, config.CREATIVE_TEMPERATURE,
+                        config.BALANCED_TEMPERATURE):
+        config.get_chat_model(config.ALTERNATIVE_LLM_MODEL, temperature).invoke("Hi")
+    
+    timer = NodeTimer()
+    app = build_research_graph(timer, parallel=True)
+    
+    print(f"\n--- Researching {len(subtopics)} subtopics in parallel ---")
+    start = time.perf_counter()
+    result = app.invoke(graph_input)
+    wall_time = time.perf_counter() - start
+    
+    print(f"\n[1] Research Phase ({len(timer.durations('sub_researcher'))} branches):")
+    print(result["researcher_output"][:300] + "...")
+    print(f"\n[2] Editing Phase (Final):")
+    print(result["final_output"])
+    
+    print("\n--- Timing ---")
+    for name, node_start, node_end in sorted(timer.spans, key=lambda span: span[1]):
+        print(f"  {name:15s} {node_start - start:6.2f}s -> {node_end - start:6.2f}s")
+    
+    # Measure the same pipeline with the subtopics researched one at a time
+    print(f"\n--- Researching the same {len(subtopics)} subtopics sequentially ---")
+    linear_timer = NodeTimer()
+    linear_app = build_research_graph(linear_timer, parallel=False)
+    start = time.perf_counter()
+    linear_app.invoke(graph_input)
+    linear_wall_time = time.perf_counter() - start
+    
+    # Fan-out research phase: first branch start to last branch end
+    branch_spans = [span for span in timer.spans if span[0] == "sub_researcher"]
+    research_time = (max(node_end for _, _, node_end in branch_spans)
+                     - min(node_start for _, node_start, _ in branch_spans))
+    linear_research_time = sum(linear_timer.durations("sub_researcher"))
+    
+    print(f"\n  {'':22s} {'fan-out':>8s} {'sequential':>11s}")
+    print(f"  {'Research phase':22s} {research_time:7.2f}s {linear_research_time:10.2f}s")
+    print(f"  {'Wall clock':22s} {wall_time:7.2f}s {linear_wall_time:10.2f}s")
+    print(f"  Saved by fan-out: {linear_wall_time - wall_time:.2f}s "
+          "(writer/editor times vary with their output length)\n")
+
+
+# ============================================================================
+# Example 6: Profiling the Multi-Agent Pipeline
+# ============================================================================
+
+from graph_utils import GraphProfiler
+
+def example_6_profile_agents():
+    """Profile researcher -> writer -> editor to see which agent to optimize."""
+    print("=" * 60)
+    print("Example 6: Profiling the Multi-Agent Pipeline")
+    print("=" * 60)
+    
+    # Callbacks reach every node and LLM call; the agents are unchanged
+    profiler = GraphProfiler()
+    app = build_multi_agent_graph()
+    
+    print("\n--- Running multi-agent workflow with the profiler attached ---")
+    app.invoke({
+        "task": "Vector databases for RAG",
+        "researcher_output": "",
+        "writer_output": "",
+        "editor_output": "",
+        "final_output": ""
+    }, config={"callbacks": [profiler]})
+    
+    print("\nProfile:")
+    profiler.print_report()
+    
+    slowest = max(profiler.summary(), key=lambda row: row["wall_time"])
+    print(f"\nSlowest agent: {slowest['node']} ({slowest['wall_time']:.2f}s, "
+          f"{slowest['completion_tokens']} completion tokens)\n")
+
+
 # ============================================================================
 # Main execution
 # ============================================================================
@@ -432,6 +694,15 @@ if __name__ == "__main__":
         print("\nRunning HITL example...")
         example_3_hitl()
         
+        print("\nRunning async multi-agent example...")
+        example_4_async_agents()
+        
+        print("\nRunning parallel research example...")
+        example_5_parallel_research()
+        
+        print("\nRunning profiling example...")
+        example_6_profile_agents()
+        
         print("\n" + "=" * 60)
         print("All examples completed!")
         print("=" * 60 + "\n")
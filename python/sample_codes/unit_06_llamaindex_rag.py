@@ -11,24 +11,46 @@ from llama_index.core import (
     Document,
     Settings
 )
+from llama_index.core.query_engine import RetrieverQueryEngine
 from llama_index.llms.ollama import Ollama
 from llama_index.embeddings.ollama import OllamaEmbedding
 import os
 import tempfile
 import config
+from embedding_cache import CachedEmbedding, EmbeddingCacheStore, get_embedding_cache
+from hybrid_retrieval import BM25Index, HybridRetriever
+from incremental_index import IncrementalDirectoryIndex
+from ingestion import build_index_parallel
+from parallel_synthesis import MapReduceSynthesizer
+from stream_metrics import StreamMetrics, print_stream_stats, print_summary
 
 # ============================================================================
 # Setup: Configure LlamaIndex to use Ollama
 # ============================================================================
 
+_llamaindex_configured = False
+
 def setup_llamaindex():
-    """Configure LlamaIndex to use local Ollama models."""
+    """Configure LlamaIndex to use local Ollama models (only once per process)."""
+    global _llamaindex_configured
+    if _llamaindex_configured:
+        return
+    
     # Set up LLM
-    Settings.llm = Ollama(model=config.ALTERNATIVE_LLM_MODEL, request_timeout=config.EXTENDED_TIMEOUT)
+    Settings.llm = Ollama(
+        model=config.ALTERNATIVE_LLM_MODEL,
+        base_url=config.OLLAMA_BASE_URL,
+        request_timeout=config.EXTENDED_TIMEOUT
+    )
     
-    # Set up embeddings
-    Settings.embed_model = OllamaEmbedding(model_name=config.EMBEDDING_MODEL)
+    # Set up embeddings behind a persistent cache, so unchanged text is
+    # never re-embedded across examples, runs or processes
+    Settings.embed_model = CachedEmbedding(
+        OllamaEmbedding(model_name=config.EMBEDDING_MODEL, base_url=config.OLLAMA_BASE_URL),
+        get_embedding_cache()
+    )
     
+    _llamaindex_configured = True
     print("✅ LlamaIndex configured to use Ollama")
 
 
@@ -125,6 +147,7 @@ def example_3_custom_query_engine():
     print("=" * 60)
     
     setup_llamaindex()
+    import time
     
     # Create more documents
     documents = [
@@ -133,22 +156,53 @@ def example_3_custom_query_engine():
         Document(text="Rust is a systems programming language focused on safety and performance."),
         Document(text="Go is a statically typed language designed for building scalable systems."),
         Document(text="TypeScript is a superset of JavaScript that adds static typing."),
+        Document(text="TS2304 is the TypeScript compiler error 'Cannot find name', raised for undeclared identifiers."),
     ]
     
     index = VectorStoreIndex.from_documents(documents)
     
+    # Build the BM25 keyword index alongside the vector index and persist it
+    with tempfile.TemporaryDirectory() as tmpdir:
+        bm25_path = os.path.join(tmpdir, "bm25.json")
+        BM25Index.from_nodes(index.docstore.docs.values()).persist(bm25_path)
+        bm25_index = BM25Index.load(bm25_path)
+    
     # Create query engine with custom parameters
-    query_engine = index.as_query_engine(
-        similarity_top_k=2,  # Retrieve top 2 most similar chunks
+    retriever = HybridRetriever.from_index(
+        index,
+        bm25_index,
+        similarity_top_k=2  # Retrieve top 2 chunks (BM25 + vector, fused with RRF)
+    )
+    query_engine = RetrieverQueryEngine.from_args(
+        retriever,
         response_mode="compact"  # Compact response mode
     )
     
     question = "Tell me about web development languages"
     print(f"\n--- Question: {question} ---")
-    print(f"Retrieving top 2 similar documents...\n")
+    print(f"Retrieving top 2 documents (hybrid)...\n")
     
     response = query_engine.query(question)
     print(f"Answer: {response}\n")
+    
+    # Exact identifiers are answered from the keyword index (no embedding call)
+    question = "What does TS2304 mean?"
+    print(f"--- Question: {question} ---\n")
+    response = query_engine.query(question)
+    print(f"Answer: {response}")
+    print(f"Retrieval paths used: {retriever.mode_counts}\n")
+    
+    # Map-reduce synthesis: answer groups of chunks concurrently, then combine once
+    map_reduce_engine = index.as_query_engine(
+        similarity_top_k=6,
+        response_synthesizer=MapReduceSynthesizer(chunks_per_map=2)
+    )
+    question = "Compare the statically typed languages"
+    print(f"--- Question: {question} (map-reduce over top 6) ---\n")
+    start = time.perf_counter()
+    response = map_reduce_engine.query(question)
+    print(f"Answer: {response}")
+    print(f"Synthesized from {len(response.source_nodes)} chunks in {time.perf_counter() - start:.2f}s\n")
 
 
 # ============================================================================
@@ -216,6 +270,9 @@ def example_5_source_nodes():
     print("=" * 60)
     
     setup_llamaindex()
+    from llama_index.core import StorageContext
+    from metadata_index import parse_filters
+    from numpy_vector_store import NumpyVectorStore
     
     # Create documents with metadata
     documents = [
@@ -233,8 +290,13 @@ def example_5_source_nodes():
         ),
     ]
     
-    index = VectorStoreIndex.from_documents(documents)
-    query_engine = index.as_query_engine(similarity_top_k=2)
+    # NumpyVectorStore indexes metadata so filters narrow candidates before scoring
+    index = VectorStoreIndex.from_documents(
+        documents,
+        storage_context=StorageContext.from_defaults(vector_store=NumpyVectorStore()),
+        store_nodes_override=True  # Also keep nodes in the docstore for the BM25 index
+    )
+    query_engine = RetrieverQueryEngine.from_args(HybridRetriever.from_index(index, similarity_top_k=2))
     
     question = "Tell me about landmarks"
     print(f"\n--- Question: {question} ---\n")
@@ -250,6 +312,17 @@ def example_5_source_nodes():
         print(f"  Metadata: {node.metadata}")
         print(f"  Score: {node.score:.4f}")
     
+    # Query-time metadata filters: only matching nodes are scored
+    filters = parse_filters("category == 'landmark' and source != 'history.txt'")
+    filtered_engine = RetrieverQueryEngine.from_args(
+        HybridRetriever.from_index(index, similarity_top_k=2, filters=filters)
+    )
+    question = "Where is it located?"
+    print(f"\n--- Question: {question} (filters: category == 'landmark' and source != 'history.txt') ---\n")
+    response = filtered_engine.query(question)
+    print(f"Answer: {response}")
+    print(f"Sources: {[node.metadata['source'] for node in response.source_nodes]}")
+    
     print()
 
 
@@ -285,10 +358,14 @@ def example_6_index_types():
     list_response = list_index.as_query_engine().query("What is AI?")
     print(f"Response: {list_response}\n")
     
-    # Tree Index (hierarchical)
+    # Tree Index (hierarchical): summaries are built concurrently, and the
+    # query answers over all leaves with parallel map-reduce synthesis
     print("\n--- Tree Index ---")
-    tree_index = TreeIndex.from_documents(documents)
-    tree_response = tree_index.as_query_engine().query("What is AI?")
+    tree_index = TreeIndex.from_documents(documents, use_async=True)
+    tree_response = tree_index.as_query_engine(
+        retriever_mode="all_leaf",
+        response_synthesizer=MapReduceSynthesizer()
+    ).query("What is AI?")
     print(f"Response: {tree_response}\n")
 
 
@@ -302,6 +379,8 @@ def example_7_streaming():
     print("Example 7: Streaming Responses")
     print("=" * 60)
     
+    import time
+    
     setup_llamaindex()
     
     documents = [
@@ -315,17 +394,531 @@ This is especially useful for long-form content generation.
     index = VectorStoreIndex.from_documents(documents)
     query_engine = index.as_query_engine(streaming=True)
     
-    question = "Explain streaming responses"
-    print(f"\n--- Question: {question} ---")
-    print("Answer (streaming): ", end="", flush=True)
+    metrics = StreamMetrics()
     
-    response = query_engine.query(question)
+    for question in ["Explain streaming responses", "Why does streaming help long answers?"]:
+        print(f"\n--- Question: {question} ---")
+        print("Answer (streaming): ", end="", flush=True)
+        
+        # TTFT is measured from the query so retrieval counts toward the wait
+        start = time.perf_counter()
+        response = query_engine.query(question)
+        
+        # Stream the response
+        for text in metrics.track(response.response_gen, name=question, start=start):
+            print(text, end="", flush=True)
+        
+        print("\n")
+        print_stream_stats(metrics.streams[-1])
     
-    # Stream the response
-    for text in response.response_gen:
-        print(text, end="", flush=True)
+    print("\n--- Aggregate ---")
+    print_summary(metrics.summary())
+    print()
+
+
+# ============================================================================
+# Example 8: Persistent Embedding Cache
+# ============================================================================
+
+def example_8_embedding_cache():
+    """Show that re-indexing unchanged documents is served from the cache."""
+    print("=" * 60)
+    print("Example 8: Persistent Embedding Cache")
+    print("=" * 60)
     
-    print("\n")
+    setup_llamaindex()
+    cache = Settings.embed_model.store
+    
+    documents = [
+        Document(text="Embeddings map text to vectors that capture meaning."),
+        Document(text="A vector index stores embeddings for similarity search."),
+        Document(text="Caching embeddings avoids paying for the same text twice."),
+    ]
+    
+    for attempt in ("first", "second"):
+        before = cache.stats()
+        VectorStoreIndex.from_documents(documents)
+        after = cache.stats()
+        print(f"\n--- Indexing ({attempt} time) ---")
+        print(f"  Cache hits:   {after['hits'] - before['hits']}")
+        print(f"  Cache misses: {after['misses'] - before['misses']}")
+    
+    stats = cache.stats()
+    print(f"\nCache size: {stats['entries']}/{stats['max_entries']} entries "
+          f"(hit rate {stats['hit_rate']:.0%})\n")
+
+
+# ============================================================================
+# Example 9: Incremental Directory Indexing
+# ============================================================================
+
+def example_9_incremental_index():
+    """Persist a directory index and refresh only the files that changed."""
+    print("=" * 60)
+    print("Example 9: Incremental Directory Indexing")
+    print("=" * 60)
+    
+    setup_llamaindex()
+    
+    with tempfile.TemporaryDirectory() as tmpdir:
+        docs_dir = os.path.join(tmpdir, "docs")
+        storage_dir = os.path.join(tmpdir, "storage")
+        os.makedirs(docs_dir)
+        
+        def write(name, text):
+            with open(os.path.join(docs_dir, name), "w") as f:
+                f.write(text)
+        
+        write("agents.txt", "AI agents perceive, decide and act to achieve goals.")
+        write("rag.txt", "RAG retrieves relevant context before generating an answer.")
+        write("tools.txt", "Agents call tools such as search engines and calculators.")
+        
+        # First run: everything is new
+        print("\n--- Cold build ---")
+        stats = IncrementalDirectoryIndex(docs_dir, storage_dir).refresh()
+        print(f"  {stats}")
+        
+        # Edit one file, add one, delete one
+        write("rag.txt", "RAG grounds answers in documents retrieved from a knowledge base.")
+        write("memory.txt", "Agent memory stores previous turns of a conversation.")
+        os.remove(os.path.join(docs_dir, "tools.txt"))
+        
+        # Second run (fresh object, as in a new process): only the diff is processed
+        print("\n--- Incremental refresh ---")
+        indexer = IncrementalDirectoryIndex(docs_dir, storage_dir)
+        stats = indexer.refresh()
+        print(f"  {stats}")
+        
+        question = "What does RAG ground its answers in?"
+        print(f"\n--- Querying: {question} ---")
+        response = indexer.index.as_query_engine().query(question)
+        print(f"Answer: {response}\n")
+
+
+# ============================================================================
+# Example 10: Parallel, Batched Ingestion
+# ============================================================================
+
+def example_10_parallel_ingestion():
+    """Compare serial from_documents() with the parallel ingestion pipeline."""
+    print("=" * 60)
+    print("Example 10: Parallel, Batched Ingestion")
+    print("=" * 60)
+    
+    setup_llamaindex()
+    import time
+    
+    topics = ["agents", "memory", "tools", "planning", "retrieval", "evaluation"]
+    
+    with tempfile.TemporaryDirectory() as tmpdir, tempfile.TemporaryDirectory() as cache_dir:
+        for i in range(30):
+            topic = topics[i % len(topics)]
+            with open(os.path.join(tmpdir, f"note_{i:03d}.txt"), "w") as f:
+                f.write(f"Note {i} about {topic}. " * 50)
+        
+        # Each run embeds through its own empty, throwaway cache, so neither
+        # is served from vectors computed earlier (and the shared cache is untouched)
+        stores = [EmbeddingCacheStore(os.path.join(cache_dir, f"{name}.sqlite"))
+                  for name in ("serial", "parallel")]
+        serial_model, parallel_model = [
+            CachedEmbedding(
+                OllamaEmbedding(model_name=config.EMBEDDING_MODEL, base_url=config.OLLAMA_BASE_URL),
+                store
+            )
+            for store in stores
+        ]
+        
+        # Serial baseline: read, split and embed one after another
+        start = time.perf_counter()
+        documents = SimpleDirectoryReader(tmpdir).load_data()
+        VectorStoreIndex.from_documents(documents, embed_model=serial_model)
+        serial_time = time.perf_counter() - start
+        
+        # Parallel pipeline: process pool for parsing, batched async embedding
+        index, stats = build_index_parallel(
+            tmpdir,
+            parse_workers=config.INGEST_PARSE_WORKERS,
+            embed_concurrency=config.INGEST_EMBED_CONCURRENCY,
+            embed_batch_size=config.INGEST_EMBED_BATCH_SIZE,
+            embed_model=parallel_model
+        )
+        for store in stores:
+            store.close()
+        
+        print(f"\nSerial:   {len(documents) / serial_time:.1f} docs/sec ({serial_time:.2f}s)")
+        print(f"Parallel: {stats['docs_per_second']:.1f} docs/sec ({stats['seconds']:.2f}s)")
+        print(f"  {stats['nodes']} nodes, {stats['parse_workers']} parse workers, "
+              f"{stats['embed_concurrency']} x {stats['embed_batch_size']} embedding batches")
+        
+        response = index.as_query_engine().query("What are the notes about?")
+        print(f"\nAnswer: {response}\n")
+
+
+# ============================================================================
+# Example 11: Cached LLM Responses in a Query Engine
+# ============================================================================
+
+def example_11_cached_llm():
+    """Repeat a RAG query with a response-cached Ollama LLM."""
+    print("=" * 60)
+    print("Example 11: Cached LLM Responses in a Query Engine")
+    print("=" * 60)
+    
+    setup_llamaindex()
+    import time
+    from llm_cache import CachedOllama, get_response_cache
+    
+    cached_llm = CachedOllama(
+        model=config.ALTERNATIVE_LLM_MODEL,
+        base_url=config.OLLAMA_BASE_URL,
+        request_timeout=config.EXTENDED_TIMEOUT,
+        response_cache=get_response_cache()
+    )
+    
+    documents = [
+        Document(text="Response caching returns stored answers for repeated prompts."),
+        Document(text="A cache hit skips model inference entirely."),
+    ]
+    index = VectorStoreIndex.from_documents(documents)
+    query_engine = index.as_query_engine(llm=cached_llm)
+    
+    question = "What does a cache hit skip?"
+    for attempt in ("first", "second"):
+        start = time.perf_counter()
+        response = query_engine.query(question)
+        elapsed = time.perf_counter() - start
+        print(f"\n--- Query ({attempt} time): {elapsed * 1000:.0f} ms ---")
+        print(f"Answer: {response}")
+    
+    print(f"\nCache stats: {cached_llm.response_cache.stats()}\n")
+
+
+# ============================================================================
+# Example 12: Vectorized NumPy Vector Store
+# ============================================================================
+
+def example_12_numpy_vector_store():
+    """Score every node with one matrix product instead of one at a time."""
+    print("=" * 60)
+    print("Example 12: Vectorized NumPy Vector Store")
+    print("=" * 60)
+    
+    setup_llamaindex()
+    import time
+    import numpy as np
+    from llama_index.core import StorageContext
+    from llama_index.core.indices.query.embedding_utils import get_top_k_embeddings
+    from llama_index.core.schema import TextNode
+    from numpy_vector_store import NumpyVectorStore
+    
+    # Drop-in replacement for the default in-memory vector store
+    documents = [
+        Document(text="Python is a high-level programming language known for its simplicity."),
+        Document(text="JavaScript is primarily used for web development and runs in browsers."),
+        Document(text="Rust is a systems programming language focused on safety and performance."),
+    ]
+    store = NumpyVectorStore()
+    index = VectorStoreIndex.from_documents(
+        documents,
+        storage_context=StorageContext.from_defaults(vector_store=store)
+    )
+    question = "Which language is used in browsers?"
+    response = index.as_query_engine(similarity_top_k=1).query(question)
+    print(f"\nQuestion: {question}")
+    print(f"Answer: {response}")
+    
+    # Retrieval speed on a synthetic index (random vectors, no embedding calls)
+    num_nodes, dim, top_k = 10_000, 384, 5
+    rng = np.random.default_rng(0)
+    vectors = rng.standard_normal((num_nodes, dim), dtype=np.float32)
+    queries = rng.standard_normal((32, dim), dtype=np.float32)
+    
+    big_store = NumpyVectorStore()
+    big_store.add([TextNode(text=f"node {i}") for i in range(num_nodes)], embeddings=vectors)
+    
+    # The per-node baseline needs Python lists; the NumPy store never does
+    embedding_list = vectors.tolist()
+    start = time.perf_counter()
+    get_top_k_embeddings(queries[0].tolist(), embedding_list, similarity_top_k=top_k)
+    python_time = time.perf_counter() - start
+    
+    start = time.perf_counter()
+    big_store.query_batch(queries[:1], similarity_top_k=top_k)
+    single_time = time.perf_counter() - start
+    
+    start = time.perf_counter()
+    big_store.query_batch(queries, similarity_top_k=top_k)
+    batch_time = time.perf_counter() - start
+    
+    print(f"\n--- Top-{top_k} over {num_nodes:,} x {dim} vectors ---")
+    print(f"Per-node Python scoring: {python_time * 1000:8.1f} ms/query")
+    print(f"NumPy, single query:     {single_time * 1000:8.1f} ms/query")
+    print(f"NumPy, batch of {len(queries)}:     {batch_time / len(queries) * 1000:8.1f} ms/query\n")
+
+
+# ============================================================================
+# Example 13: FAISS Vector Store (Flat, IVF-PQ, HNSW)
+# ============================================================================
+
+def example_13_faiss_vector_store():
+    """Use a persisted FAISS index and measure recall vs. latency of ANN settings."""
+    print("=" * 60)
+    print("Example 13: FAISS Vector Store")
+    print("=" * 60)
+    
+    setup_llamaindex()
+    import numpy as np
+    from llama_index.core import StorageContext
+    from faiss_vector_store import FaissVectorStore, recall_latency_report, print_recall_report
+    
+    documents = [
+        Document(text="FAISS is a library for efficient similarity search of dense vectors."),
+        Document(text="HNSW builds a navigable graph for approximate nearest neighbour search."),
+        Document(text="IVF-PQ clusters vectors into lists and compresses them with product quantization."),
+    ]
+    
+    # Small corpora use exact search; switch index_type for large ones
+    store = FaissVectorStore(index_type=config.FAISS_INDEX_TYPE)
+    index = VectorStoreIndex.from_documents(
+        documents,
+        storage_context=StorageContext.from_defaults(vector_store=store)
+    )
+    
+    with tempfile.TemporaryDirectory() as tmpdir:
+        store.persist(tmpdir)
+        reloaded = FaissVectorStore.from_persist_dir(tmpdir)
+    index = VectorStoreIndex.from_vector_store(reloaded)
+    
+    question = "Which method compresses vectors?"
+    response = index.as_query_engine(similarity_top_k=1).query(question)
+    print(f"\nQuestion: {question}")
+    print(f"Answer (from reloaded index): {response}")
+    
+    # Recall vs. latency on clustered synthetic vectors (no embedding calls)
+    num_vectors, dim, k = 50_000, 128, 10
+    rng = np.random.default_rng(0)
+    centers = rng.standard_normal((200, dim), dtype=np.float32)
+    vectors = centers[rng.integers(0, len(centers), num_vectors)] + 0.3 * rng.standard_normal((num_vectors, dim), dtype=np.float32)
+    queries = vectors[rng.choice(num_vectors, 200, replace=False)] + 0.1 * rng.standard_normal((200, dim), dtype=np.float32)
+    
+    print(f"\n--- Recall vs. latency ({num_vectors:,} x {dim} vectors, 200 queries) ---")
+    print_recall_report(recall_latency_report(vectors, queries, k=k), k=k)
+    print()
+
+
+# ============================================================================
+# Example 14: Memory-Mapped Vector Store
+# ============================================================================
+
+def example_14_mmap_vector_store():
+    """Persist an index once and open it instantly (and shared) in every worker."""
+    print("=" * 60)
+    print("Example 14: Memory-Mapped Vector Store")
+    print("=" * 60)
+    
+    setup_llamaindex()
+    import time
+    import numpy as np
+    from llama_index.core import StorageContext
+    from llama_index.core.schema import TextNode
+    from numpy_vector_store import NumpyVectorStore, MATRIX_FILE
+    
+    documents = [
+        Document(text="Memory-mapped files let processes share one page-cached copy of data."),
+        Document(text="Float16 halves the size of stored embeddings with little loss of accuracy."),
+        Document(text="SQLite stores the node text and metadata next to the embedding matrix."),
+    ]
+    store = NumpyVectorStore()
+    VectorStoreIndex.from_documents(documents, storage_context=StorageContext.from_defaults(vector_store=store))
+    
+    with tempfile.TemporaryDirectory() as tmpdir:
+        # Build once (e.g. in an indexing job)...
+        store.persist(tmpdir, dtype="float16")
+        
+        # ...then every worker opens the same files without rebuilding
+        index = VectorStoreIndex.from_vector_store(NumpyVectorStore.from_persist_dir(tmpdir))
+        question = "How can processes share data?"
+        response = index.as_query_engine(similarity_top_k=1).query(question)
+        print(f"\nQuestion: {question}")
+        print(f"Answer (from mapped index): {response}")
+    
+    # Cold start on a synthetic index (random vectors, no embedding calls)
+    num_nodes, dim = 50_000, 384
+    rng = np.random.default_rng(0)
+    vectors = rng.standard_normal((num_nodes, dim), dtype=np.float32)
+    nodes = [TextNode(text=f"node {i}") for i in range(num_nodes)]
+    
+    start = time.perf_counter()
+    big_store = NumpyVectorStore()
+    big_store.add(nodes, embeddings=vectors)
+    build_time = time.perf_counter() - start
+    
+    print(f"\n--- Cold start, {num_nodes:,} x {dim} vectors ---")
+    print(f"Rebuild in memory:     {build_time * 1000:8.1f} ms")
+    with tempfile.TemporaryDirectory() as tmpdir:
+        for dtype in ("float32", "float16"):
+            path = os.path.join(tmpdir, dtype)
+            big_store.persist(path, dtype=dtype)
+            
+            start = time.perf_counter()
+            mapped = NumpyVectorStore.from_persist_dir(path)
+            load_time = time.perf_counter() - start
+            start = time.perf_counter()
+            result = mapped.query_batch(vectors[:1], similarity_top_k=5)[0]
+            query_time = time.perf_counter() - start
+            
+            size_mb = os.path.getsize(os.path.join(path, MATRIX_FILE)) / 1e6
+            print(f"Open {dtype} ({size_mb:5.1f} MB): {load_time * 1000:8.1f} ms, "
+                  f"first query {query_time * 1000:6.1f} ms, top hit {result.nodes[0].text!r}")
+    print()
+
+
+# ============================================================================
+# Example 15: Batch Queries
+# ============================================================================
+
+def example_15_batch_queries():
+    """Answer many questions with one embedding request and concurrent synthesis."""
+    print("=" * 60)
+    print("Example 15: Batch Queries")
+    print("=" * 60)
+    
+    setup_llamaindex()
+    import time
+    from llama_index.core import StorageContext
+    from batch_query import BatchQueryEngine
+    from numpy_vector_store import NumpyVectorStore
+    
+    documents = [
+        Document(text="Python is a high-level programming language known for its simplicity."),
+        Document(text="JavaScript is primarily used for web development and runs in browsers."),
+        Document(text="Rust is a systems programming language focused on safety and performance."),
+        Document(text="Go is a statically typed language designed for building scalable systems."),
+    ]
+    index = VectorStoreIndex.from_documents(
+        documents,
+        storage_context=StorageContext.from_defaults(vector_store=NumpyVectorStore())
+    )
+    questions = [
+        "Which language runs in browsers?",
+        "Which language focuses on memory safety?",
+        "Which language is known for simplicity?",
+        "Which language is statically typed?",
+    ]
+    
+    # Batch first, so its embedding stage is measured on uncached questions:
+    # one embedding request, one vectorized retrieval, concurrent synthesis
+    batch_engine = BatchQueryEngine(index, similarity_top_k=1, max_concurrency=4)
+    responses = batch_engine.query_batch(questions)
+    
+    for question, response in zip(questions, responses):
+        print(f"\nQ: {question}")
+        print(f"A: {response}")
+    
+    # Serial baseline: retrieve and synthesize one question at a time
+    query_engine = index.as_query_engine(similarity_top_k=1)
+    start = time.perf_counter()
+    for question in questions:
+        query_engine.query(question)
+    serial_time = time.perf_counter() - start
+    
+    timings = batch_engine.timings
+    print(f"\n--- {len(questions)} questions ---")
+    print(f"Serial query():   {serial_time:.2f}s")
+    print(f"query_batch():    {timings['total']:.2f}s (embed {timings['embed']:.2f}s, "
+          f"retrieve {timings['retrieve'] * 1000:.1f} ms, synthesize {timings['synthesize']:.2f}s)")
+    # The serial pass reused the batch's query embeddings, so it skipped embedding entirely
+    print(f"Query embedding LRU: {Settings.embed_model.query_cache_stats()}\n")
+
+
+# ============================================================================
+# Example 16: Extractive Answers
+# ============================================================================
+
+def example_16_extractive_answers():
+    """Answer lookup questions with source sentences, calling the LLM only when unsure."""
+    print("=" * 60)
+    print("Example 16: Extractive Answers")
+    print("=" * 60)
+    
+    setup_llamaindex()
+    import time
+    from extractive_synthesis import ExtractiveSynthesizer
+    
+    documents = [
+        Document(text="The Eiffel Tower is located in Paris, France. It was completed in 1889."),
+        Document(text="The Great Wall of China is one of the Seven Wonders. It stretches over 21,000 kilometres."),
+        Document(text="Error code TS2304 means the TypeScript compiler cannot find a name."),
+    ]
+    index = VectorStoreIndex.from_documents(documents)
+    
+    synthesizer = ExtractiveSynthesizer()
+    query_engine = index.as_query_engine(similarity_top_k=2, response_synthesizer=synthesizer)
+    
+    questions = [
+        "Where is the Eiffel Tower located?",    # answered verbatim by one sentence
+        "What does error code TS2304 mean?",     # exact lookup
+        "Which landmark is older, and by how much?",  # needs reasoning -> LLM
+        "Why is the Eiffel Tower located in Paris?",  # asks for an explanation -> LLM
+    ]
+    for question in questions:
+        start = time.perf_counter()
+        response = query_engine.query(question)
+        elapsed = time.perf_counter() - start
+        
+        print(f"\nQ: {question}")
+        print(f"A: {response}")
+        print(f"   [{response.metadata['answer_mode']}, confidence {response.metadata['confidence']:.2f}, "
+              f"{elapsed * 1000:.0f} ms]")
+        for span in response.metadata["spans"]:
+            print(f"   span {span['score']:.2f}: {span['text']!r} (node {span['node_id'][:8]}, "
+                  f"chars {span['start']}-{span['end']})")
+    
+    print(f"\nAnswer paths: {synthesizer.mode_counts}\n")
+
+
+# ============================================================================
+# Example 17: Metadata Pre-Filtering Speed
+# ============================================================================
+
+def example_17_filtered_retrieval():
+    """Measure how metadata filters shrink the set of vectors scored per query."""
+    print("=" * 60)
+    print("Example 17: Metadata Pre-Filtering Speed")
+    print("=" * 60)
+    
+    setup_llamaindex()
+    import time
+    import numpy as np
+    from llama_index.core.schema import TextNode
+    from llama_index.core.vector_stores.types import VectorStoreQuery
+    from metadata_index import parse_filters
+    from numpy_vector_store import NumpyVectorStore
+    
+    # Category-scoped retrieval on a synthetic index (random vectors, no embedding calls)
+    num_nodes, dim, num_categories = 20_000, 384, 100
+    rng = np.random.default_rng(0)
+    vectors = rng.standard_normal((num_nodes, dim), dtype=np.float32)
+    store = NumpyVectorStore()
+    store.add(
+        [TextNode(text=f"node {i}", metadata={"category": f"c{i % num_categories}"}) for i in range(num_nodes)],
+        embeddings=vectors
+    )
+    
+    query = VectorStoreQuery(query_embedding=vectors[0].tolist(), similarity_top_k=5)
+    start = time.perf_counter()
+    store.query(query)
+    full_time = time.perf_counter() - start
+    
+    query.filters = parse_filters("category == 'c7'")
+    start = time.perf_counter()
+    result = store.query(query)
+    filtered_time = time.perf_counter() - start
+    
+    print(f"\n--- Top-5 over {num_nodes:,} x {dim} vectors, {num_categories} categories ---")
+    print(f"All nodes scored:      {full_time * 1000:8.1f} ms")
+    print(f"One category scored:   {filtered_time * 1000:8.1f} ms")
+    print(f"Categories returned:   {sorted({node.metadata['category'] for node in result.nodes})}\n")
 
 
 # ============================================================================
@@ -352,6 +945,16 @@ if __name__ == "__main__":
         example_5_source_nodes()
         example_6_index_types()
         example_7_streaming()
+        example_8_embedding_cache()
+        example_9_incremental_index()
+        example_10_parallel_ingestion()
+        example_11_cached_llm()
+        example_12_numpy_vector_store()
+        example_13_faiss_vector_store()
+        example_14_mmap_vector_store()
+        example_15_batch_queries()
+        example_16_extractive_answers()
+        example_17_filtered_retrieval()
         
         print("=" * 60)
         print("All examples completed successfully!")